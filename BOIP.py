@@ -1,13 +1,22 @@
 import os
+from functools import partial
 
+import backends
 from parsing import Bomip2dkp, Bomip2ap, pyo
-from lexmin import find_lexmin
-from queue import PriorityQueue
+from lexmin import BoxSolver
+from persistent import PersistentBoxSolver
+from boxqueue import BoxQueue
 from shapes.rectangle import Rectangle
 from pathlib import Path
 import logging
-from utils import SelfOrderingDict, dist
-from printer import Writer
+from frontier import Frontier
+from utils import dist
+from printer import StreamWriter
+from tracing import Tracer
+from checkpoint import Checkpoint, restore
+from budget import Budget
+from parallel import explore_parallel
+import time
 
 logging.basicConfig(level=20)
 
@@ -17,71 +26,266 @@ DATASET_PATH = Path(
     os.getenv("DATASET_PATH", default="./BOMIP/Part I- Integer Programs/instances/")
 )
 SOLUTIONS_PATH = Path(os.getenv("SOLUTIONS_PATH", default="./my_solutions"))
+SOLVER = os.getenv("SOLVER", default="gurobi")
+PERSISTENT = os.getenv("PERSISTENT", default="0") == "1"
+PERSISTENT_SOLVER = os.getenv("PERSISTENT_SOLVER", default="gurobi_persistent")
+WARMSTART = os.getenv("WARMSTART", default="0") == "1"
+LEXICOGRAPHIC = os.getenv("LEXICOGRAPHIC", default="0") == "1"
+WORKERS = int(os.getenv("WORKERS", default=1))
+MAX_ITERATIONS = None
 
 
-def main(problem, problem_class, instance):
+def get_solver(name: str, persistent=False) -> pyo.SolverFactory:
+    return backends.get_solver(name, persistent=persistent)
 
+
+def load_model(problem, instance_path):
+    if problem == "2DKP":
+        return Bomip2dkp.from_file(instance_path)
+    elif problem == "AP":
+        return Bomip2ap.from_file(instance_path)
+    raise ValueError("Wrong value for the instance argument.")
+
+
+def make_box_solver(
+    model, persistent=PERSISTENT, warmstart=WARMSTART, lexicographic=LEXICOGRAPHIC
+) -> BoxSolver:
+    if persistent:
+        return PersistentBoxSolver(
+            model,
+            partial(get_solver, PERSISTENT_SOLVER, persistent=True),
+            warmstart=warmstart,
+            lexicographic=lexicographic,
+        )
+    return BoxSolver(
+        model,
+        get_solver(SOLVER),
+        warmstart=warmstart,
+        lexicographic=lexicographic,
+        solver_factory=partial(get_solver, SOLVER),
+    )
+
+
+def process_shape(solver: BoxSolver, searching_rectangle, splitting_direction=0):
+    """
+    Explore a rectangle of the balanced box method.
+
+    :param solver: BoxSolver,
+        solver for the subproblems.
+    :param searching_rectangle: Rectangle,
+        rectangle to explore.
+    :param splitting_direction: int (optional),
+        unused, rectangles are always split horizontally.
+    :return: tuple,
+        list of (Point, connected flag) to set in the frontier and list of (Rectangle, splitting direction) to
+        explore.
+    """
+    points = []
+    rectangles = []
+
+    z1, z2 = searching_rectangle.topleft, searching_rectangle.botright
+
+    _, r_b = searching_rectangle.split_horizontally()
+
+    try:
+        z1_bar = solver.find_lexmin((1, 2), shape=r_b, verbose=False)
+        if dist(z1_bar, z2) > DIFF_EPS:
+            points.append((z1_bar, 0))
+            new_rect = Rectangle(z1_bar, z2)
+            if new_rect.area >= EPS:
+                rectangles.append((new_rect, splitting_direction))
+
+        r_t = Rectangle(z1, (z1_bar[0] - EPS, (z1[1] + z2[1]) / 2))
+        z2_bar = solver.find_lexmin((2, 1), shape=r_t, verbose=False)
+
+        if dist(z2_bar, z1) > DIFF_EPS:
+            points.append((z2_bar, 0))
+            new_rect = Rectangle(z1, z2_bar)
+            if new_rect.area >= EPS:
+                rectangles.append((new_rect, splitting_direction))
+    except ValueError:
+        logging.warning("Solution not found during this iteration")
+
+    return points, rectangles
+
+
+def main(
+    problem,
+    problem_class,
+    instance,
+    persistent=PERSISTENT,
+    warmstart=WARMSTART,
+    workers=WORKERS,
+    time_limit=None,
+    lexicographic=LEXICOGRAPHIC,
+    max_solves=None,
+    min_gain=None,
+    resume=False,
+    checkpoint_interval=None,
+):
+    """
+    Run the balanced box method on an instance and write its frontier in SOLUTIONS_PATH.
+
+    :param time_limit: float (optional),
+        seconds after which the search stops between two iterations, the frontier found so far is written with
+        Status=time limit. The subproblems of the shapes are given the time left as solver time limit.
+    :param lexicographic: bool (optional),
+        solve each lexmin in a single call where the solver allows it, see lexmin.find_lexmin.
+    :param max_solves: int (optional),
+        solver calls after which the search stops between two iterations, as with time_limit.
+    :param min_gain: float (optional),
+        stop when the hypervolume gained per second, relative to the box of the ends of the frontier, drops under
+        it, see budget.Budget.
+    :param resume: bool (optional),
+        go on with the search saved in the checkpoint of the instance, if there is one.
+    :param checkpoint_interval: float (optional),
+        seconds between two checkpoints of the search, CHECKPOINT_INTERVAL by default, see checkpoint.Checkpoint.
+        The state is also saved when the search stops early, and the checkpoint removed once it is complete.
+    :return: dict,
+        time, iterations, number of points found, why the search stopped early if it did, calls per routine and
+        quality of the frontier.
+    """
     problem_sol_path = Path.cwd() / SOLUTIONS_PATH / problem / problem_class
     problem_sol_path.mkdir(parents=True, exist_ok=True)
     instance_sol_path = Path.cwd() / problem_sol_path / instance
 
     instance_path = Path.cwd() / DATASET_PATH / problem / problem_class / instance
+    checkpoint = Checkpoint.for_instance(
+        problem, problem_class, instance, checkpoint_interval
+    )
+    state = checkpoint.load() if resume else None
+    tracer = Tracer.for_instance(
+        problem, problem_class, instance, append=state is not None
+    )
+    writer = StreamWriter("max", instance_sol_path)
 
-    if problem == "2DKP":
-        model = Bomip2dkp.from_file(instance_path)
-    elif problem == "AP":
-        model = Bomip2ap.from_file(instance_path)
+    def snapshot(frontier, elapsed, iterations):
+        writer.print_solution(
+            frontier, tot_time=elapsed, iterations=iterations, status="running"
+        )
+
+    if workers > 1:
+        tic = time.perf_counter()
+        if state is not None:
+            tic -= state["elapsed"]
+        budget = Budget(
+            time_limit, max_solves, MAX_ITERATIONS, min_gain, snapshot=snapshot
+        )
+        budget.tic = tic
+        solutions_dict, iteration, stats, stopped = explore_parallel(
+            __name__,
+            problem,
+            instance_path,
+            workers,
+            persistent=persistent,
+            warmstart=warmstart,
+            lexicographic=lexicographic,
+            budget=budget,
+            tracer=tracer,
+            checkpoint=checkpoint,
+            state=state,
+            writer=writer,
+        )
     else:
-        raise ValueError("Wrong value for the instance argument.")
+        model = load_model(problem, instance_path)
 
-    opt = pyo.SolverFactory(
-        "gurobi",
-        executable=os.getenv(
-            "SOLVER_PATH", default="C:/gurobi950/win64/bin/gurobi.bat"
-        ),
-    )
+        tic = time.perf_counter()
+        budget = Budget(
+            time_limit, max_solves, MAX_ITERATIONS, min_gain, snapshot=snapshot
+        )
+        solver = make_box_solver(model, persistent, warmstart, lexicographic)
+
+        if state is None:
+            stats = solver.stats
+
+            z_T = solver.find_lexmin(
+                (1, 2)
+            )  # (pyo.value(model.objective1), pyo.value(model.objective2))
+            z_B = solver.find_lexmin(
+                (2, 1)
+            )  # (pyo.value(model.objective1), pyo.value(model.objective2))
+
+            tracer.trace(0, None, None, stats.records, time.perf_counter() - tic)
+
+            solutions_dict = Frontier({z_T: 0, z_B: 0})
+            r = Rectangle(z_T, z_B)
+            pq = BoxQueue()
+            pq.push(r)
+            iteration = 1
+        else:
+            solver.stats = stats = state["stats"]
+            solutions_dict, pq = restore(state, solver.solutions)
+            iteration = state["iteration"]
+            tic -= state["elapsed"]
+            budget.tic = tic
+
+        writer.watch(solutions_dict)
+        solver.frontier = solutions_dict
+        # the ends of the frontier are solved without time limit, the subproblems of the shapes with the time left
+        backends.set_deadline(budget.deadline())
+        budget.start(solutions_dict)
+
+        stopped = None
+        while pq:
+            logging.info("Iteration: %s", iteration)
+            iteration_tic = time.perf_counter()
+            mark = len(stats.records)
+            searching_rectangle, _ = pq.pop()
+
+            points, rectangles = process_shape(solver, searching_rectangle)
+            tracer.trace(
+                iteration,
+                searching_rectangle,
+                0,
+                stats.records[mark:],
+                time.perf_counter() - iteration_tic,
+                points,
+                rectangles,
+            )
+            for point, connected in points:
+                dominated = solutions_dict.dominated
+                solutions_dict[point] = connected
+                if solutions_dict.dominated > dominated and point in solutions_dict:
+                    pq.prune(point)
+            for new_rect, _ in rectangles:
+                pq.push(new_rect)
+            iteration += 1
+            stopped = budget.check(solutions_dict, pq, stats, iteration - 1)
+            if stopped is not None or checkpoint.due():
+                checkpoint.save(
+                    solutions_dict,
+                    pq,
+                    iteration,
+                    stats,
+                    solver.solutions,
+                    time.perf_counter() - tic,
+                )
+            if stopped is not None:
+                logging.warning("Search stopped early: %s.", stopped)
+                break
+
+        backends.set_deadline()
+        logging.info(
+            "%s duplicate shapes skipped, %s dominated shapes dropped.",
+            pq.duplicates,
+            pq.pruned,
+        )
+
+    toc = time.perf_counter() - tic
+    if stopped is None:
+        checkpoint.remove()
+    stats.log_summary(logging.getLogger(__name__))
 
-    # model = problem.to_pyomo()
-
-    z_T = find_lexmin(
-        model, (1, 2), opt
-    )  # (pyo.value(model.objective1), pyo.value(model.objective2))
-    z_B = find_lexmin(
-        model, (2, 1), opt
-    )  # (pyo.value(model.objective1), pyo.value(model.objective2))
-
-    solutions_dict = SelfOrderingDict({z_T: 0, z_B: 0})
-    r = Rectangle(z_T, z_B)
-    pq = PriorityQueue()
-    pq.put((-r.area, r))
-
-    iteration = 1
-    while not pq.empty():
-        logging.info(f"Iteration: {iteration}")
-        searching_rectangle = pq.get()[1]
-        z1, z2 = searching_rectangle.topleft, searching_rectangle.botright
-
-        _, r_b = searching_rectangle.split_horizontally()
-
-        try:
-            z1_bar = find_lexmin(model, (1, 2), opt, shape=r_b, verbose=False)
-            if dist(z1_bar, z2) > DIFF_EPS:
-                solutions_dict[z1_bar] = 0
-                new_rect = Rectangle(z1_bar, z2)
-                if new_rect.area >= EPS:
-                    pq.put((-new_rect.area, new_rect))
-
-            r_t = Rectangle(z1, (z1_bar[0] - EPS, (z1[1] + z2[1]) / 2))
-            z2_bar = find_lexmin(model, (2, 1), opt, shape=r_t, verbose=False)
-
-            if dist(z2_bar, z1) > DIFF_EPS:
-                solutions_dict[z2_bar] = 0
-                new_rect = Rectangle(z1, z2_bar)
-                if new_rect.area >= EPS:
-                    pq.put((-new_rect.area, new_rect))
-        except ValueError:
-            logging.warning("Solution not found during this iteration")
-        iteration += 1
-
-    writer = Writer("max", instance_sol_path)
-    writer.print_solution(solutions_dict)
+    writer.compact(tot_time=toc, iterations=iteration, status=stopped)
+    totals = {
+        "time": toc,
+        "iterations": iteration,
+        "points": len(solutions_dict),
+        "stopped": stopped,
+        "calls": {
+            routine: entry["calls"] for routine, entry in stats.summary().items()
+        },
+        **budget.quality(solutions_dict),
+    }
+    tracer.close(stats, **totals)
+    return totals
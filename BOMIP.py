@@ -1,14 +1,22 @@
+import backends
 from parsing import Bomip2C, Bomip2buflp, pyo
-from lexmin import find_lexmin, weighted_sum, line_detector
-from queue import PriorityQueue
+from lexmin import BoxSolver
+from persistent import PersistentBoxSolver
+from boxqueue import BoxQueue
 from shapes.rectangle import Rectangle
 from shapes.triangle import Triangle
 from pathlib import Path
-from utils import SelfOrderingDict, get_logger, dist
-from printer import Writer
+from frontier import Frontier
+from utils import get_logger, dist
+from printer import StreamWriter
+from tracing import Tracer
+from checkpoint import Checkpoint, restore
+from budget import Budget
+from parallel import explore_parallel
 import time
 
 import os
+from functools import partial
 
 logger = get_logger(__name__)
 
@@ -23,166 +31,359 @@ DATASET_PATH = Path(
     )
 )
 SOLUTIONS_PATH = Path(os.getenv("SOLUTIONS_PATH", default="./my_solutions"))
+SOLVER = os.getenv("SOLVER", default="gurobi_direct")
+PERSISTENT = os.getenv("PERSISTENT", default="0") == "1"
+PERSISTENT_SOLVER = os.getenv("PERSISTENT_SOLVER", default="gurobi_persistent")
+WARMSTART = os.getenv("WARMSTART", default="0") == "1"
+LEXICOGRAPHIC = os.getenv("LEXICOGRAPHIC", default="0") == "1"
+WORKERS = int(os.getenv("WORKERS", default=1))
+# Triangles checked at once by the line detector in the serial loop, see BoxSolver.prefetch_line_detectors.
+LD_BATCH = int(os.getenv("LD_BATCH", default=1))
+MAX_ITERATIONS = 1000
 
 
-def main(problem, problem_class, instance):
-    solutions_path = Path("./my_solutions")
-    problem_sol_path = Path.cwd() / solutions_path / problem / problem_class
-    problem_sol_path.mkdir(parents=True, exist_ok=True)
-    instance_sol_path = Path.cwd() / problem_sol_path / instance
+def get_solver(name: str, persistent=False) -> pyo.SolverFactory:
+    return backends.get_solver(
+        name,
+        {"MIPGap": float(os.getenv("MIPGAP", default=1e-4)), "NumericFocus": 3},
+        persistent,
+    )
 
-    instance_path = Path.cwd() / DATASET_PATH / problem / problem_class / instance
 
+def load_model(problem, instance_path):
     if problem == "First problem":
-        model = Bomip2C.from_file(instance_path)
+        return Bomip2C.from_file(instance_path)
     elif problem == "Second problem (BUFLP)":
-        model = Bomip2buflp.from_file(instance_path)
-    else:
-        raise ValueError("Wrong value for the instance argument.")
-    opt = pyo.SolverFactory(
-        "gurobi_direct",
-        executable=os.getenv(
-            "SOLVER_PATH",
-            default="/opt/gurobi951/linux64/bin/gurobi.sh",  # default="C:/gurobi950/win64/bin/gurobi.bat"
-        ),
-    )
-    opt.options["MIPGap"] = os.getenv("MIPGAP", default=1e-4)
-    opt.options["NumericFocus"] = 3
+        return Bomip2buflp.from_file(instance_path)
+    raise ValueError("Wrong value for the instance argument.")
+
 
-    tic = time.perf_counter()
-    z_T = find_lexmin(model, (1, 2), opt)
-    z_B = find_lexmin(model, (2, 1), opt)
+def make_box_solver(
+    model, persistent=PERSISTENT, warmstart=WARMSTART, lexicographic=LEXICOGRAPHIC
+) -> BoxSolver:
+    if persistent:
+        return PersistentBoxSolver(
+            model,
+            partial(get_solver, PERSISTENT_SOLVER, persistent=True),
+            warmstart=warmstart,
+            lexicographic=lexicographic,
+        )
+    return BoxSolver(
+        model,
+        get_solver(SOLVER),
+        warmstart=warmstart,
+        lexicographic=lexicographic,
+        solver_factory=partial(get_solver, SOLVER),
+    )
 
-    logger.debug(f"Found z_T: {z_T} and z_B: {z_B}.")
 
-    splitting_direction = 0  # 0 horizontal, 1 vertical
-    solutions_dict = SelfOrderingDict({z_T: 0, z_B: 0})
-    r = Rectangle(z_T, z_B)
-    pq = PriorityQueue()
-    pq.put((-r.area, r, splitting_direction))
+def process_shape(solver: BoxSolver, searching_shape, splitting_direction):
+    """
+    Explore a shape of the balanced box method.
 
-    iteration = 1
-    while not pq.empty():
-        logger.info(f"Iteration: {iteration}")
+    :param solver: BoxSolver,
+        solver for the subproblems.
+    :param searching_shape: Rectangle or Triangle,
+        shape to explore.
+    :param splitting_direction: int,
+        0 horizontal, 1 vertical.
+    :return: tuple,
+        list of (Point, connected flag) to set in the frontier and list of (Shape, splitting direction) to explore.
+    """
+    points = []
+    shapes = []
 
-        _, searching_shape, splitting_direction = pq.get()
+    z1 = searching_shape.topleft
+    z2 = searching_shape.botright
+    logger.debug(
+        "Searching shape is a %s with splitting direction %s",
+        type(searching_shape).__name__,
+        splitting_direction,
+    )
+    logger.debug("z1: %s, z2: %s", z1, z2)
+    if isinstance(searching_shape, Rectangle):
+        logger.debug("Since it's a Rectangle, we apply the weighted sum method")
+        z_cap = solver.weighted_sum(searching_shape)
+        logger.debug("Found %s z_cap values.", len(z_cap))
+        for k in range(len(z_cap) - 1):
+            triangle = Triangle(z_cap[k], z_cap[k + 1])
+            if triangle.area > EPS_AREA:
+                logger.debug("Adding a triangle with area %s", triangle.area)
+                shapes.append((triangle, splitting_direction))
+            if k != 0:
+                points.append((z_cap[k], 0))
 
-        z1 = searching_shape.topleft
-        z2 = searching_shape.botright
-        logger.debug(
-            f"Searching shape is a {type(searching_shape)} with splitting direction {splitting_direction}"
-        )
-        logger.debug(f"z1: {z1}, z2: {z2}")
-        if isinstance(searching_shape, Rectangle):
-            logger.debug(f"Since it's a Rectangle, we apply the weighted sum method")
-            z_cap = weighted_sum(model, opt=opt, rectangle=searching_shape)
-            logger.debug(f"Found {len(z_cap)} z_cap values.")
-            for k in range(len(z_cap) - 1):
-                triangle = Triangle(z_cap[k], z_cap[k + 1])
-                if triangle not in pq.queue and triangle.area > EPS_AREA:
-                    logger.debug(f"Adding a triangle with area {triangle.area}")
-                    pq.put((-triangle.area, triangle, splitting_direction))
-                if k != 0:
-                    solutions_dict[z_cap[k]] = 0
-            iteration += 1
+        logger.debug("Weighted sum is over, starting again.")
+        return points, shapes
 
-            logger.debug("Weighted sum is over, starting again.")
-            continue
+    logger.debug("Searching a Triangle now. Check if connected.")
+    connected = solver.line_detector(searching_shape)
+    if connected:
+        points.append((z1, 1))
+        logger.debug("It's connected, starting over.")
+        return points, shapes
 
-        logger.debug(f"Searching a Triangle now. Check if connected.")
-        connected = line_detector(model, opt, searching_shape)
-        if connected:
-            solutions_dict[z1] = 1
-            iteration += 1
-            logger.debug("It's connected, starting over.")
-            continue
+    logger.debug("It was not connected, apply splitting.")
+    if splitting_direction == 0:
+        logger.debug("The splitting direction is horizontal.")
+        _, t_b = searching_shape.split_horizontally()
+        try:
+            z1_bar = solver.find_lexmin((1, 2), t_b)
+            logger.debug("Found z1_bar: %s", z1_bar)
+        except ValueError:
+            z1_bar = z2
 
-        logger.debug("It was not connected, apply splitting.")
-        if splitting_direction == 0:
-            logger.debug("The splitting direction is horizontal.")
-            _, t_b = searching_shape.split_horizontally()
+        if abs(z1_bar[1] - t_b.topleft[1]) < EPS_DISTANCE:
+            logger.debug("Since z1_bar is close to %s, z2_bar=z1_bar.", t_b.topleft)
+            z2_bar = z1_bar
+        else:
+            logger.debug("Since z1_bar is far from %s, we compute z2_bar.", t_b.topleft)
+            t_t = Triangle(z1, (z1_bar[0] - EPS_SPLIT, t_b.topleft[1]))
             try:
-                z1_bar = find_lexmin(model, (1, 2), opt, t_b)
-                logger.debug(f"Found z1_bar: {z1_bar}")
+                z2_bar = solver.find_lexmin((2, 1), shape=t_t, verbose=False)
+                logger.debug("Found z2_bar: %s", z2_bar)
             except ValueError:
-                z1_bar = z2
+                z2_bar = z1
+        logger.debug("Finished splitting.")
+    else:
+        logger.debug("Splitting direction is vertical.")
+        t_t, _ = searching_shape.split_vertically()
+        try:
+            z2_bar = solver.find_lexmin((2, 1), t_t)
+            logger.debug("Found z2_bar: %s", z2_bar)
+        except ValueError:
+            z2_bar = z1
 
-            if abs(z1_bar[1] - t_b.topleft[1]) < EPS_DISTANCE:
-                logger.debug(f"Since z1_bar is close to {t_b.topleft}, z2_bar=z1_bar.")
-                z2_bar = z1_bar
-            else:
-                logger.debug(
-                    f"Since z1_bar is far from {t_b.topleft}, we compute z2_bar."
-                )
-                t_t = Triangle(z1, (z1_bar[0] - EPS_SPLIT, t_b.topleft[1]))
-                try:
-                    z2_bar = find_lexmin(model, (2, 1), opt, shape=t_t, verbose=False)
-                    logger.debug(f"Found z2_bar: {z2_bar}")
-                except ValueError:
-                    z2_bar = z1
-            logger.debug("Finished splitting.")
+        if abs(z2_bar[0] - t_t.botright[0]) < EPS_DISTANCE:
+            logger.debug("Since z2_bar is close to %s, z1_bar=z2_bar.", t_t.botright)
+            z1_bar = z2_bar
         else:
-            logger.debug("Splitting direction is vertical.")
-            t_t, _ = searching_shape.split_vertically()
+            logger.debug(
+                "Since z2_bar is far from %s, we compute z1_bar.", t_t.botright
+            )
+            t_b = Triangle((t_t.botright[0], z2_bar[1] - EPS_SPLIT), z2)
+
             try:
-                z2_bar = find_lexmin(model, (2, 1), opt, t_t)
-                logger.debug(f"Found z2_bar: {z2_bar}")
+                z1_bar = solver.find_lexmin((1, 2), shape=t_b, verbose=False)
+                logger.debug("Found z1_bar: %s", z1_bar)
             except ValueError:
-                z2_bar = z1
+                z1_bar = z2
 
-            if abs(z2_bar[0] - t_t.botright[0]) < EPS_DISTANCE:
-                logger.debug(f"Since z2_bar is close to {t_t.botright}, z1_bar=z2_bar.")
-                z1_bar = z2_bar
-            else:
-                logger.debug(
-                    f"Since z2_bar is far from {t_t.botright}, we compute z1_bar."
-                )
-                t_b = Triangle((t_t.botright[0], z2_bar[1] - EPS_SPLIT), z2)
+        logger.debug("Finished splitting.")
 
-                try:
-                    z1_bar = find_lexmin(model, (1, 2), opt, shape=t_b, verbose=False)
-                    logger.debug(f"Found z1_bar: {z1_bar}")
-                except ValueError:
-                    z1_bar = z2
+    new_direction = (splitting_direction + 1) % 2
 
-            logger.debug("Finished splitting.")
+    if dist(z2_bar, z1, "M") > EPS_DISTANCE:
+        # if z2_bar != z1:
+        logger.debug("Since z2_bar is far from z1, we compute the rectangle.")
+        try:
+            rect = Rectangle(z1, z2_bar)
+        except ValueError as e:
+            logger.critical(e)
+            return points, shapes
 
-        new_direction = (splitting_direction + 1) % 2
+        if rect.area > EPS_AREA:
+            logger.debug("Rectangle area is %s, adding it to the PQ.", rect.area)
+            shapes.append((rect, new_direction))
+            points.append((z2_bar, 0))
 
-        if dist(z2_bar, z1, "M") > EPS_DISTANCE:
-            # if z2_bar != z1:
-            logger.debug("Since z2_bar is far from z1, we compute the rectangle.")
-            try:
-                rect = Rectangle(z1, z2_bar)
-            except ValueError as e:
-                iteration += 1
-                logger.critical(e)
-                continue
-
-            if rect.area > EPS_AREA:
-                logger.debug(f"Rectangle area is {rect.area}, adding it to the PQ.")
-                pq.put((-rect.area, rect, new_direction))
-                solutions_dict[z2_bar] = 0
-
-        if dist(z1_bar, z2, "M") > EPS_DISTANCE:
-            # if z1_bar != z2:
-            logger.debug("Since z1_bar is far from z2, we compute the rectangle.")
-            try:
-                rect = Rectangle(z1_bar, z2)
-            except ValueError as e:
-                iteration += 1
-                logger.critical(e)
-                continue
-            if rect.area > EPS_AREA:
-                logger.debug(f"Rectangle area is {rect.area}, adding it to the PQ.")
-                pq.put((-rect.area, rect, new_direction))
-                solutions_dict[z1_bar] = 0
-
-        iteration += 1
-        if iteration > 1000:
-            break
+    if dist(z1_bar, z2, "M") > EPS_DISTANCE:
+        # if z1_bar != z2:
+        logger.debug("Since z1_bar is far from z2, we compute the rectangle.")
+        try:
+            rect = Rectangle(z1_bar, z2)
+        except ValueError as e:
+            logger.critical(e)
+            return points, shapes
+        if rect.area > EPS_AREA:
+            logger.debug("Rectangle area is %s, adding it to the PQ.", rect.area)
+            shapes.append((rect, new_direction))
+            points.append((z1_bar, 0))
+
+    return points, shapes
+
+
+def main(
+    problem,
+    problem_class,
+    instance,
+    persistent=PERSISTENT,
+    warmstart=WARMSTART,
+    workers=WORKERS,
+    time_limit=None,
+    lexicographic=LEXICOGRAPHIC,
+    max_solves=None,
+    min_gain=None,
+    resume=False,
+    checkpoint_interval=None,
+):
+    """
+    Run the balanced box method on an instance and write its frontier in SOLUTIONS_PATH.
+
+    :param time_limit: float (optional),
+        seconds after which the search stops between two iterations, the frontier found so far is written with
+        Status=time limit. The subproblems of the shapes are given the time left as solver time limit.
+    :param lexicographic: bool (optional),
+        solve each lexmin in a single call where the solver allows it, see lexmin.find_lexmin.
+    :param max_solves: int (optional),
+        solver calls after which the search stops between two iterations, as with time_limit.
+    :param min_gain: float (optional),
+        stop when the hypervolume gained per second, relative to the box of the ends of the frontier, drops under
+        it, see budget.Budget.
+    :param resume: bool (optional),
+        go on with the search saved in the checkpoint of the instance, if there is one.
+    :param checkpoint_interval: float (optional),
+        seconds between two checkpoints of the search, CHECKPOINT_INTERVAL by default, see checkpoint.Checkpoint.
+        The state is also saved when the search stops early, and the checkpoint removed once it is complete.
+    :return: dict,
+        time, iterations, number of points found, why the search stopped early if it did, calls per routine and
+        quality of the frontier.
+    """
+    problem_sol_path = Path.cwd() / SOLUTIONS_PATH / problem / problem_class
+    problem_sol_path.mkdir(parents=True, exist_ok=True)
+    instance_sol_path = Path.cwd() / problem_sol_path / instance
+
+    instance_path = Path.cwd() / DATASET_PATH / problem / problem_class / instance
+    checkpoint = Checkpoint.for_instance(
+        problem, problem_class, instance, checkpoint_interval
+    )
+    state = checkpoint.load() if resume else None
+    tracer = Tracer.for_instance(
+        problem, problem_class, instance, append=state is not None
+    )
+    writer = StreamWriter("min", instance_sol_path)
+
+    def snapshot(frontier, elapsed, iterations):
+        writer.print_solution(
+            frontier, tot_time=elapsed, iterations=iterations, status="running"
+        )
+
+    if workers > 1:
+        tic = time.perf_counter()
+        if state is not None:
+            tic -= state["elapsed"]
+        budget = Budget(
+            time_limit, max_solves, MAX_ITERATIONS, min_gain, snapshot=snapshot
+        )
+        budget.tic = tic
+        solutions_dict, iteration, stats, stopped = explore_parallel(
+            __name__,
+            problem,
+            instance_path,
+            workers,
+            persistent=persistent,
+            warmstart=warmstart,
+            lexicographic=lexicographic,
+            budget=budget,
+            tracer=tracer,
+            checkpoint=checkpoint,
+            state=state,
+            writer=writer,
+        )
+    else:
+        model = load_model(problem, instance_path)
+
+        tic = time.perf_counter()
+        budget = Budget(
+            time_limit, max_solves, MAX_ITERATIONS, min_gain, snapshot=snapshot
+        )
+        solver = make_box_solver(model, persistent, warmstart, lexicographic)
+
+        if state is None:
+            stats = solver.stats
+            z_T = solver.find_lexmin((1, 2))
+            z_B = solver.find_lexmin((2, 1))
+
+            logger.debug("Found z_T: %s and z_B: %s.", z_T, z_B)
+            tracer.trace(0, None, None, stats.records, time.perf_counter() - tic)
+
+            splitting_direction = 0  # 0 horizontal, 1 vertical
+            solutions_dict = Frontier({z_T: 0, z_B: 0})
+            r = Rectangle(z_T, z_B)
+            pq = BoxQueue()
+            pq.push(r, splitting_direction)
+            iteration = 1
+        else:
+            solver.stats = stats = state["stats"]
+            solutions_dict, pq = restore(state, solver.solutions)
+            iteration = state["iteration"]
+            tic -= state["elapsed"]
+            budget.tic = tic
+
+        writer.watch(solutions_dict)
+        solver.frontier = solutions_dict
+        # the ends of the frontier are solved without time limit, the subproblems of the shapes with the time left
+        backends.set_deadline(budget.deadline())
+        budget.start(solutions_dict)
+
+        stopped = None
+        while pq:
+            logger.info("Iteration: %s", iteration, extra={"iteration": iteration})
+
+            iteration_tic = time.perf_counter()
+            mark = len(stats.records)
+            searching_shape, splitting_direction = pq.pop()
+            if LD_BATCH > 1 and isinstance(searching_shape, Triangle):
+                solver.prefetch_line_detectors(
+                    [searching_shape] + pq.largest(LD_BATCH - 1, Triangle)
+                )
+            points, shapes = process_shape(solver, searching_shape, splitting_direction)
+            tracer.trace(
+                iteration,
+                searching_shape,
+                splitting_direction,
+                stats.records[mark:],
+                time.perf_counter() - iteration_tic,
+                points,
+                shapes,
+            )
+
+            for point, connected in points:
+                dominated = solutions_dict.dominated
+                solutions_dict[point] = connected
+                if solutions_dict.dominated > dominated and point in solutions_dict:
+                    pq.prune(point)
+            for shape, direction in shapes:
+                pq.push(shape, direction)
+
+            iteration += 1
+            stopped = budget.check(solutions_dict, pq, stats, iteration - 1)
+            if stopped is not None or checkpoint.due():
+                checkpoint.save(
+                    solutions_dict,
+                    pq,
+                    iteration,
+                    stats,
+                    solver.solutions,
+                    time.perf_counter() - tic,
+                )
+            if stopped is not None:
+                logger.warning("Search stopped early: %s.", stopped)
+                break
+
+        backends.set_deadline()
+        solver.close()
+        logger.info(
+            "%s duplicate shapes skipped, %s dominated shapes dropped.",
+            pq.duplicates,
+            pq.pruned,
+        )
 
     toc = time.perf_counter() - tic
+    if stopped is None:
+        checkpoint.remove()
+    stats.log_summary(logger)
 
-    writer = Writer("min", instance_sol_path)
-    writer.print_solution(solutions_dict, tot_time=toc, iterations=iteration)
+    writer.compact(tot_time=toc, iterations=iteration, status=stopped)
+    totals = {
+        "time": toc,
+        "iterations": iteration,
+        "points": len(solutions_dict),
+        "stopped": stopped,
+        "calls": {
+            routine: entry["calls"] for routine, entry in stats.summary().items()
+        },
+        **budget.quality(solutions_dict),
+    }
+    tracer.close(stats, **totals)
+    return totals
@@ -0,0 +1,341 @@
+import os
+import time
+import weakref
+
+import pyomo.environ as pyo
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Backends tried, in order, when the solver is "auto".
+PREFERENCE = ("gurobi_direct", "appsi_highs", "cbc", "glpk")
+PERSISTENT_PREFERENCE = ("gurobi_persistent", "appsi_highs")
+# shortest TimeLimit given to a solve once the deadline is near or past, some backends reject 0
+MIN_TIME_LIMIT = 0.1
+
+# backend of each solver built by get_solver, the APPSI solvers don't have a name
+_backends = weakref.WeakKeyDictionary()
+# availability of the lexicographic twins, and the backends whose two stage lexmins were logged
+_twins_available = {}
+_two_stage_warned = set()
+# wall clock time (time.time) after which the solves of this process stop, see set_deadline
+_deadline = None
+
+
+class Backend:
+    """
+    Capabilities of a solver interface and the names it gives to the options.
+
+    :param name: str,
+        name of the solver in pyo.SolverFactory.
+    :param persistent: bool,
+        keeps the model between solves, sending only the changes.
+    :param mip_start: bool,
+        accepts the values loaded in the variables as MIP start.
+    :param solution_pool: bool,
+        can return more than one solution per solve.
+    :param direct: bool,
+        talks to the solver through its API instead of writing the model to a file.
+    :param hierarchical: bool,
+        optimizes several objectives lexicographically in a single solve.
+    :param lexicographic_twin: str,
+        persistent backend with hierarchical objectives solving the lexmins of this one in a single call, see
+        lexicographic_solver.
+    :param options: dict,
+        Gurobi option name -> name of the same option for this backend. The options missing here are ignored.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        persistent=False,
+        mip_start=False,
+        solution_pool=False,
+        direct=False,
+        hierarchical=False,
+        lexicographic_twin=None,
+        options=None,
+    ):
+        self.name = name
+        self.persistent = persistent
+        self.mip_start = mip_start
+        self.solution_pool = solution_pool
+        self.direct = direct
+        self.hierarchical = hierarchical
+        self.lexicographic_twin = lexicographic_twin
+        self.options = options or {}
+
+    def __repr__(self):
+        return f"Backend({self.name})"
+
+    def available(self) -> bool:
+        try:
+            return bool(pyo.SolverFactory(self.name).available(exception_flag=False))
+        except Exception:
+            return False
+
+    def map_options(self, options: dict) -> dict:
+        """Translate options given with the Gurobi names, dropping the ones this backend doesn't have."""
+        mapped = {}
+        for option, value in options.items():
+            if option in self.options:
+                mapped[self.options[option]] = value
+            else:
+                logger.debug("Option %s is not supported by %s", option, self.name)
+        return mapped
+
+
+GUROBI_OPTIONS = {
+    "MIPGap": "MIPGap",
+    "NumericFocus": "NumericFocus",
+    "TimeLimit": "TimeLimit",
+    "Threads": "Threads",
+}
+
+BACKENDS = {
+    "gurobi": Backend(
+        "gurobi",
+        mip_start=True,
+        solution_pool=True,
+        lexicographic_twin="gurobi_persistent",
+        options=GUROBI_OPTIONS,
+    ),
+    "gurobi_direct": Backend(
+        "gurobi_direct",
+        mip_start=True,
+        solution_pool=True,
+        direct=True,
+        hierarchical=True,
+        lexicographic_twin="gurobi_persistent",
+        options=GUROBI_OPTIONS,
+    ),
+    "gurobi_persistent": Backend(
+        "gurobi_persistent",
+        persistent=True,
+        mip_start=True,
+        solution_pool=True,
+        direct=True,
+        hierarchical=True,
+        options=GUROBI_OPTIONS,
+    ),
+    "appsi_highs": Backend(
+        "appsi_highs",
+        persistent=True,
+        mip_start=True,
+        direct=True,
+        options={
+            "MIPGap": "mip_rel_gap",
+            "TimeLimit": "time_limit",
+            "Threads": "threads",
+        },
+    ),
+    "cbc": Backend(
+        "cbc",
+        mip_start=True,
+        options={"MIPGap": "ratioGap", "TimeLimit": "sec", "Threads": "threads"},
+    ),
+    "glpk": Backend("glpk", options={"MIPGap": "mipgap", "TimeLimit": "tmlim"}),
+}
+
+
+def first_available(names=PREFERENCE):
+    """Name of the first available backend among names, None if there is none."""
+    for name in names:
+        if BACKENDS[name].available():
+            return name
+    return None
+
+
+def get_backend(name: str, persistent=False) -> Backend:
+    """
+    Find the backend called name, "auto" being the first available one of PREFERENCE.
+
+    :param name: str,
+        name of the backend, a key of BACKENDS or "auto".
+    :param persistent: bool (optional),
+        with "auto", choose among PERSISTENT_PREFERENCE.
+    :return: Backend
+    """
+    if name == "auto":
+        preference = PERSISTENT_PREFERENCE if persistent else PREFERENCE
+        name = first_available(preference)
+        if name is None:
+            raise RuntimeError(f"None of the solvers {preference} is available.")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown solver {name}, choose one of {list(BACKENDS)}.")
+    return BACKENDS[name]
+
+
+def get_solver(name: str, options: dict = None, persistent=False) -> pyo.SolverFactory:
+    """
+    Build a solver with its options.
+
+    :param name: str,
+        name of the backend, see get_backend.
+    :param options: dict (optional),
+        options with their Gurobi names, translated for the backend.
+    :param persistent: bool (optional),
+        see get_backend.
+    :return: pyo.SolverFactory
+    """
+    backend = get_backend(name, persistent)
+    kwds = {}
+    # file based interfaces look for the solver executable on the PATH unless told where it is
+    if not backend.direct and os.getenv("SOLVER_PATH"):
+        kwds["executable"] = os.getenv("SOLVER_PATH")
+    opt = pyo.SolverFactory(backend.name, **kwds)
+    for option, value in backend.map_options(options or {}).items():
+        opt.options[option] = value
+    _backends[opt] = backend
+    return opt
+
+
+def backend_of(opt: pyo.SolverFactory) -> Backend:
+    """Backend of a solver, None if it wasn't built by get_solver and its name isn't one of BACKENDS."""
+    backend = _backends.get(opt)
+    return backend if backend is not None else BACKENDS.get(getattr(opt, "name", None))
+
+
+def set_deadline(deadline: float = None):
+    """
+    Limit the solves of this process to the time left until deadline, given to each solve as the TimeLimit option
+    of its backend, see solve.
+
+    :param deadline: float (optional),
+        wall clock time, as time.time(), None to solve without time limit.
+    """
+    global _deadline
+    _deadline = deadline
+
+
+def lexicographic_solver(opt: pyo.SolverFactory):
+    """
+    Solver able to run solve_lexicographic with the options of opt: opt itself if it is a persistent Gurobi solver,
+    a new solver of its lexicographic twin if there is one and it is available (gurobi_persistent for gurobi and
+    gurobi_direct), None otherwise. The lexmins are then solved in two stages, which is logged once per backend.
+    """
+    backend = backend_of(opt)
+    if backend is not None and backend.hierarchical and backend.persistent:
+        return opt
+    twin = None if backend is None else backend.lexicographic_twin
+    if twin is not None:
+        if twin not in _twins_available:
+            _twins_available[twin] = BACKENDS[twin].available()
+        if _twins_available[twin]:
+            lex_opt = pyo.SolverFactory(twin)
+            for option, value in opt.options.items():
+                lex_opt.options[option] = value
+            _backends[lex_opt] = BACKENDS[twin]
+            return lex_opt
+
+    name = getattr(backend, "name", type(opt).__name__)
+    if name not in _two_stage_warned:
+        _two_stage_warned.add(name)
+        logger.warning(
+            "%s has no hierarchical objectives, the lexmins are solved in two stages.",
+            name,
+        )
+    return None
+
+
+def node_count(opt: pyo.SolverFactory, res) -> int:
+    """Branch and bound nodes explored by the last solve, None if the backend doesn't tell."""
+    try:
+        solver_model = getattr(opt, "_solver_model", None)
+        if hasattr(solver_model, "getInfo"):
+            # HiGHS reports -1 for a LP
+            return max(solver_model.getInfo().mip_node_count, 0)
+        if solver_model is not None:
+            return int(solver_model.NodeCount)
+        return int(res.solver.statistics.branch_and_bound.number_of_bounded_subproblems)
+    except Exception:
+        return None
+
+
+def solve(
+    opt: pyo.SolverFactory,
+    model: pyo.ConcreteModel,
+    verbose=False,
+    details=None,
+    **kwds,
+):
+    """
+    Solve the model and load the solution if one was found, the same way for every backend. Once a deadline is set,
+    see set_deadline, the solve is limited to the time left.
+
+    APPSI solvers raise when asked to load a solution that doesn't exist, and don't fill model.solutions, so the
+    solution is loaded only after checking the termination condition.
+
+    :param details: list (optional),
+        if given, a dict with the solve time, the termination condition and the number of nodes is appended.
+    :return: bool,
+        True if the solution is optimal.
+    """
+    if _deadline is not None:
+        backend = backend_of(opt)
+        if backend is not None:
+            time_limit = max(_deadline - time.time(), MIN_TIME_LIMIT)
+            for option, value in backend.map_options({"TimeLimit": time_limit}).items():
+                opt.options[option] = value
+
+    tic = time.perf_counter()
+    res = opt.solve(model, tee=verbose, load_solutions=False, **kwds)
+    termination = res.solver.termination_condition
+    optimal = termination == pyo.TerminationCondition.optimal
+    if optimal:
+        if hasattr(opt, "load_vars"):
+            opt.load_vars()
+        else:
+            model.solutions.load_from(res)
+    if details is not None:
+        details.append(
+            {
+                "solve_time": time.perf_counter() - tic,
+                "outcome": str(termination),
+                "nodes": node_count(opt, res),
+            }
+        )
+    return optimal
+
+
+def solve_lexicographic(
+    opt: pyo.SolverFactory,
+    model: pyo.ConcreteModel,
+    objectives: tuple,
+    verbose=False,
+    details=None,
+    **kwds,
+):
+    """
+    Minimize objectives lexicographically in a single solve, with the hierarchical multi-objective support of
+    Gurobi: each objective has a lower priority than the previous ones, whose optimal values are kept while the
+    solver moves on from the same search.
+
+    :param opt: pyo.SolverFactory,
+        persistent Gurobi solver having model as instance, see lexicographic_solver.
+    :param objectives: tuple,
+        objectives of model, from the most important one.
+    :return: bool,
+        True if the solution is optimal for all the objectives.
+    """
+    grb_model = opt._solver_model
+    for i, objective in enumerate(objectives):
+        expr, _, _ = opt._get_expr_from_pyomo_expr(objective.expr)
+        grb_model.setObjectiveN(
+            expr,
+            index=i,
+            priority=len(objectives) - i,
+            weight=1 if objective.sense == pyo.minimize else -1,
+            abstol=0,
+            reltol=0,
+            name=objective.name,
+        )
+    grb_model.ModelSense = 1
+    try:
+        return solve(opt, model, verbose, details, **kwds)
+    finally:
+        # back to the single objective of the model, for the next solves of the persistent solver
+        grb_model.NumObj = 0
+        for objective in model.component_data_objects(pyo.Objective, active=True):
+            opt.set_objective(objective)
@@ -0,0 +1,233 @@
+import importlib
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import backends
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Search module of each problem, the module's DATASET_PATH holds a directory per problem.
+PROBLEMS = {
+    "2DKP": "BOIP",
+    "AP": "BOIP",
+    "First problem": "BOMIP",
+    "Second problem (BUFLP)": "BOMIP",
+}
+# Reference frontiers of each search module, relative to its DATASET_PATH.
+REFERENCE_DIRS = {
+    "BOIP": ["../nondominated frontiers"],
+    "BOMIP": [
+        "../nondominated frontiers/Before post-processing",
+        "../nondominated frontiers",
+    ],
+}
+# Sense of the objectives in the frontier files of each search module.
+SENSES = {"BOIP": "max", "BOMIP": "min"}
+SUMMARY_COLUMNS = (
+    "problem",
+    "class",
+    "instance",
+    "status",
+    "time",
+    "iterations",
+    "points",
+    "relative_hypervolume",
+)
+
+
+def _natural_key(path: Path):
+    return [int(tok) if tok.isdigit() else tok for tok in re.split(r"(\d+)", path.name)]
+
+
+def discover_instances(
+    problem: str, problem_class: str = None, dataset_path: Path = None
+) -> list:
+    """
+    List the instances of a problem found in the dataset directory of its search module.
+
+    :param problem: str,
+        name of the problem, a key of PROBLEMS.
+    :param problem_class: str (optional),
+        only list the instances of this class.
+    :param dataset_path: Path (optional),
+        directory with a directory per problem, DATASET_PATH of the search module by default.
+    :return: list,
+        (problem, problem_class, instance) sorted naturally (class C20 before C160, 2dat.txt before 10dat.txt).
+    """
+    if dataset_path is None:
+        dataset_path = importlib.import_module(PROBLEMS[problem]).DATASET_PATH
+    problem_path = Path(dataset_path) / problem
+    if not problem_path.is_dir():
+        logger.warning("No instances found for %s in %s.", problem, problem_path)
+        return []
+
+    jobs = []
+    for class_path in sorted(problem_path.iterdir(), key=_natural_key):
+        if not class_path.is_dir():
+            continue
+        if problem_class is not None and class_path.name != problem_class:
+            continue
+        for instance_path in sorted(class_path.glob("*dat.txt"), key=_natural_key):
+            jobs.append((problem, class_path.name, instance_path.name))
+    return jobs
+
+
+def solution_path(problem: str, problem_class: str, instance: str) -> Path:
+    module = importlib.import_module(PROBLEMS[problem])
+    return Path(module.SOLUTIONS_PATH) / problem / problem_class / instance
+
+
+def reference_path(problem: str, problem_class: str, instance: str):
+    """Reference frontier of an instance, None if it isn't in the dataset."""
+    module_name = PROBLEMS[problem]
+    dataset_path = Path(importlib.import_module(module_name).DATASET_PATH)
+    name = instance.replace("dat", "out")
+    for directory in REFERENCE_DIRS[module_name]:
+        path = (dataset_path / directory / problem / problem_class / name).resolve()
+        if path.exists():
+            return path
+    return None
+
+
+def read_footer(path: Path) -> dict:
+    """
+    Read the summary of a solution file written by printer.Writer.
+
+    :return: dict,
+        points, and time, iterations and status when written. Empty if the file doesn't exist.
+    """
+    if not path.exists():
+        return {}
+
+    footer = {"points": 0}
+    with open(path) as sfile:
+        for line in sfile:
+            key, sep, value = line.strip().partition("=")
+            if not sep:
+                footer["points"] += 1 if line.strip() else 0
+            elif key == "Time":
+                footer["time"] = float(value)
+            elif key == "Iterations":
+                footer["iterations"] = int(value)
+            elif key == "Status":
+                footer["status"] = value
+    return footer
+
+
+def is_complete(path: Path) -> bool:
+    """A solution is complete if the search ended and wrote its time, without reaching a time limit."""
+    footer = read_footer(path)
+    return "time" in footer and "status" not in footer
+
+
+def run_instance(problem, problem_class, instance, **kwargs) -> dict:
+    """
+    Run the search module of the problem on an instance, reporting failures in the result.
+
+    The keyword arguments set to None are left to the defaults of the module's main.
+    """
+    module = importlib.import_module(PROBLEMS[problem])
+    kwargs = {key: value for key, value in kwargs.items() if value is not None}
+    row = {"problem": problem, "class": problem_class, "instance": instance}
+    logger.info(
+        "Running problem %s, class %s, instance %s", problem, problem_class, instance
+    )
+    tic = time.perf_counter()
+    try:
+        result = module.main(
+            problem=problem, problem_class=problem_class, instance=instance, **kwargs
+        )
+    except Exception as e:
+        logger.exception("Instance %s/%s/%s failed.", problem, problem_class, instance)
+        row.update(status=f"failed: {e}", time=time.perf_counter() - tic)
+        # the next instances of this process aren't limited by the deadline of this one
+        backends.set_deadline()
+        return row
+
+    row.update(result)
+    row["status"] = row.pop("stopped") or "solved"
+    return row
+
+
+def run_batch(
+    jobs: list,
+    concurrency=1,
+    time_limit=None,
+    resume=True,
+    **kwargs,
+) -> list:
+    """
+    Run the instances with a pool of processes.
+
+    :param jobs: list,
+        (problem, problem_class, instance) to run, see discover_instances.
+    :param concurrency: int (optional),
+        number of instances solved at the same time.
+    :param time_limit: float (optional),
+        seconds given to each instance, see BOIP.main and BOMIP.main.
+    :param resume: bool (optional),
+        skip the instances whose solution file is complete.
+    :param kwargs:
+        passed to the main of the search module (persistent, warmstart, lexicographic, workers,
+        max_solves, min_gain).
+    :return: list,
+        a row of the summary per instance, in the order of jobs.
+    """
+    rows = {}
+    to_run = []
+    for job in jobs:
+        path = solution_path(*job)
+        if resume and is_complete(path):
+            row = dict(zip(("problem", "class", "instance"), job))
+            row.update(read_footer(path), status="skipped")
+            rows[job] = row
+        else:
+            to_run.append(job)
+    logger.info("Running %s instances, %s already solved.", len(to_run), len(rows))
+
+    if concurrency <= 1:
+        for job in to_run:
+            rows[job] = run_instance(*job, time_limit=time_limit, **kwargs)
+    else:
+        with ProcessPoolExecutor(max_workers=concurrency) as executor:
+            futures = {
+                executor.submit(
+                    run_instance, *job, time_limit=time_limit, **kwargs
+                ): job
+                for job in to_run
+            }
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    row = future.result()
+                except Exception as e:
+                    # a worker that died, for example out of memory in the solver, breaks the pool: the instances
+                    # left are reported failed rather than losing the summary
+                    logger.error("Instance %s/%s/%s failed: %r", *job, e)
+                    row = dict(zip(("problem", "class", "instance"), job))
+                    row["status"] = f"failed: {e!r}"
+                rows[job] = row
+                logger.info(
+                    "Finished %s/%s/%s: %s",
+                    row["problem"],
+                    row["class"],
+                    row["instance"],
+                    row["status"],
+                )
+
+    return [rows[job] for job in jobs]
+
+
+def format_summary(rows: list) -> str:
+    """Tab separated table of the batch results, with a header line."""
+    lines = ["\t".join(SUMMARY_COLUMNS)]
+    for row in rows:
+        cells = []
+        for column in SUMMARY_COLUMNS:
+            value = row.get(column, "")
+            cells.append(f"{value:.2f}" if isinstance(value, float) else str(value))
+        lines.append("\t".join(cells))
+    return "\n".join(lines) + "\n"
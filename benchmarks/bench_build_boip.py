@@ -0,0 +1,52 @@
+"""
+Time the construction of the Bomip2dkp and Bomip2ap models across sizes of the Part I classes.
+
+The instances are random with the shape of the dataset ones: n binary variables and 2 knapsack constraints for
+2DKP, n jobs, n ** 2 binary variables and 2n assignment constraints for AP. Run from the repository root:
+
+    python -m benchmarks.bench_build_boip --sizes 20 50 100 200
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from parsing import Bomip2ap, Bomip2dkp
+
+
+def random_2dkp(n: int, seed: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    weights = rng.integers(1, 100, (4, n))
+    return n, 25 * n, 25 * n, *weights
+
+
+def random_ap(n: int, seed: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    return n, rng.integers(1, 20, (n, n)), rng.integers(1, 20, (n, n))
+
+
+def best_time(build, data, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        tic = time.perf_counter()
+        build(*data)
+        times.append(time.perf_counter() - tic)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser("Bomip2dkp and Bomip2ap build benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 50, 100, 200])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'n':>6} {'2DKP build time [s]':>20} {'AP build time [s]':>20}")
+    for n in args.sizes:
+        kp = best_time(Bomip2dkp, random_2dkp(n), args.repeat)
+        ap = best_time(Bomip2ap, random_ap(n), args.repeat)
+        print(f"{n:>6} {kp:>20.4f} {ap:>20.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Time the construction of the Bomip2C model across the sizes of the First problem classes.
+
+The instances are random with the shape of the dataset ones: with n continuous and n binary variables and 2n + 1
+rows of coefficients. Run from the repository root:
+
+    python -m benchmarks.bench_build_bomip2c --sizes 20 40 80 160 320
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from parsing import Bomip2C
+
+
+def random_instance(n: int, seed: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    m = 2 * n + 1
+    c1 = -rng.integers(1, 20, n)
+    f1 = -rng.integers(1, 20, n)
+    c2 = -rng.integers(1, 20, n)
+    f2 = -rng.integers(1, 20, n)
+    a = rng.integers(0, 10, (n, m - 1))
+    a_prime = rng.integers(1, 30, n)
+    b = rng.integers(20, 60, m - 1)
+    return m, n, n, c1, f1, c2, f2, a, a_prime, b
+
+
+def main():
+    parser = argparse.ArgumentParser("Bomip2C build benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 40, 80, 160, 320])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'class':>6} {'best build time [s]':>20}")
+    for n in args.sizes:
+        data = random_instance(n)
+        times = []
+        for _ in range(args.repeat):
+            tic = time.perf_counter()
+            Bomip2C(*data)
+            times.append(time.perf_counter() - tic)
+        print(f"{'C' + str(n):>6} {min(times):>20.4f}")
+
+
+if __name__ == "__main__":
+    main()
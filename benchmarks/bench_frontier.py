@@ -0,0 +1,73 @@
+"""
+Time the insertion of points in the frontier archive, against the SelfOrderingDict it replaced.
+
+The points are inserted in random order: most of them lie on a convex nondominated curve, the others are dominated
+by it. SelfOrderingDict sorts all its keys at every insertion, so it's timed on the first --legacy points only.
+Run from the repository root:
+
+    python -m benchmarks.bench_frontier --points 100000
+"""
+
+import argparse
+import time
+from collections import UserDict
+
+import numpy as np
+
+from frontier import Frontier
+from shapes.Point import Point
+
+
+class SelfOrderingDict(UserDict):
+    """Former frontier archive, kept for comparison."""
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.data = {
+            k: self.data[k] for k in sorted(self.data.keys(), key=lambda x: x[0])
+        }
+
+
+def random_points(n: int, dominated=0.2, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    x = rng.permutation(n) / n * 1000
+    y = (1000 - x) ** 2 / 1000
+    # push a share of the points above the curve
+    y += np.where(rng.random(n) < dominated, rng.random(n) * 50 + 1, 0)
+    return [Point((xi, yi)) for xi, yi in zip(x.tolist(), y.tolist())]
+
+
+def time_inserts(archive, points: list) -> float:
+    tic = time.perf_counter()
+    for point in points:
+        archive[point] = 0
+    return time.perf_counter() - tic
+
+
+def main():
+    parser = argparse.ArgumentParser("Frontier insertion benchmark")
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--legacy", type=int, default=2_000)
+    args = parser.parse_args()
+
+    points = random_points(args.points)
+
+    frontier = Frontier()
+    elapsed = time_inserts(frontier, points)
+    print(
+        f"Frontier: {args.points} inserts in {elapsed:.3f}s "
+        f"({elapsed / args.points * 1e6:.2f}us per insert), "
+        f"{len(frontier)} points kept, {frontier.dominated} dominated"
+    )
+
+    legacy = min(args.legacy, args.points)
+    elapsed_frontier = time_inserts(Frontier(), points[:legacy])
+    elapsed_legacy = time_inserts(SelfOrderingDict(), points[:legacy])
+    print(
+        f"First {legacy} inserts: Frontier {elapsed_frontier:.3f}s, "
+        f"SelfOrderingDict {elapsed_legacy:.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
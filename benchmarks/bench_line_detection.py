@@ -0,0 +1,65 @@
+"""
+Measure the size of the Bomip2C model and of its line detection model across the sizes of the First problem classes.
+
+For each size: the time to build the model, to copy it (what find_lexmin and weighted_sum do for every call), the
+memory it holds, and the time to build the line detection model, done once per run. Run from the repository root:
+
+    python -m benchmarks.bench_line_detection --sizes 20 80 320
+"""
+
+import argparse
+import time
+import tracemalloc
+from copy import deepcopy
+
+import pyomo.environ as pyo
+
+from benchmarks.bench_build_bomip2c import random_instance
+from lexmin import line_detection_model
+from parsing import Bomip2C
+
+
+def best_time(function, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        tic = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - tic)
+    return min(times)
+
+
+def memory(function) -> float:
+    """Memory allocated by function and still held by its result, in MB."""
+    tracemalloc.start()
+    result = function()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser("Line detection model benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 80, 320])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'class':>6} {'variables':>10} {'build [s]':>10} {'copy [s]':>10} {'memory [MB]':>12} "
+        f"{'line detection build [s]':>25}"
+    )
+    for n in args.sizes:
+        data = random_instance(n)
+        model = Bomip2C(*data)
+        variables = sum(1 for _ in model.component_data_objects(pyo.Var))
+        build = best_time(lambda: Bomip2C(*data), args.repeat)
+        copy = best_time(lambda: deepcopy(model), args.repeat)
+        size = memory(lambda: Bomip2C(*data))
+        ld_build = best_time(lambda: line_detection_model(model), args.repeat)
+        print(
+            f"{'C' + str(n):>6} {variables:>10} {build:>10.4f} {copy:>10.4f} {size:>12.1f} {ld_build:>25.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
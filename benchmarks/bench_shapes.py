@@ -0,0 +1,91 @@
+"""
+Measure the memory of the points and shapes of the balanced box method and the speed of the operations done on
+many of them: sorting and queueing shapes, which compares their areas, hashing points, and distances computed one
+Point at a time against a PointArray. Run from the repository root:
+
+    python -m benchmarks.bench_shapes --count 100000
+"""
+
+import argparse
+import heapq
+import time
+import tracemalloc
+
+import numpy as np
+
+from shapes.Point import Point
+from shapes.point_array import PointArray, rectangle_areas
+from shapes.rectangle import Rectangle
+from utils import dist
+
+
+def memory_per_object(build, count: int) -> float:
+    tracemalloc.start()
+    objects = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return size / count
+
+
+def timed(function) -> float:
+    tic = time.perf_counter()
+    function()
+    return time.perf_counter() - tic
+
+
+def heap_round_trip(shapes: list):
+    heap = []
+    for shape in shapes:
+        heapq.heappush(heap, shape)
+    while heap:
+        heapq.heappop(heap)
+
+
+def main():
+    parser = argparse.ArgumentParser("Points and shapes benchmark")
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    coords = [tuple(row) for row in rng.uniform(0, 100, (args.count, 2)).tolist()]
+    corners = [((x, y + 1), (x + 1 + y, y)) for x, y in coords]
+
+    points = [Point(c) for c in coords]
+    shapes = [Rectangle(a, b) for a, b in corners]
+    array = PointArray(coords)
+
+    print(
+        f"{'Point':<40} {memory_per_object(lambda: [Point(c) for c in coords], args.count):>10.0f} B"
+    )
+    print(
+        f"{'Rectangle with its corners':<40} "
+        f"{memory_per_object(lambda: [Rectangle(a, b) for a, b in corners], args.count):>10.0f} B"
+    )
+    print(
+        f"{'PointArray row':<40} {memory_per_object(lambda: PointArray(coords), args.count):>10.0f} B"
+    )
+
+    rates = {
+        "sort shapes": timed(lambda: sorted(shapes)),
+        "heap push and pop shapes": timed(lambda: heap_round_trip(shapes)),
+        "hash points": timed(lambda: set(points)),
+        "distances, Point loop": timed(
+            lambda: [dist(p, points[0], "M") for p in points]
+        ),
+        "distances, PointArray": timed(lambda: array.dist(points[0], "M")),
+        "areas, Rectangle loop": timed(
+            lambda: [Rectangle(a, b).area for a, b in corners]
+        ),
+        "areas, PointArray": timed(
+            lambda: rectangle_areas(
+                PointArray([a for a, _ in corners]), PointArray([b for _, b in corners])
+            )
+        ),
+    }
+    for name, seconds in rates.items():
+        print(f"{name:<40} {args.count / seconds / 1e6:>10.2f} M/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Run the balanced box method on a slice of the BOMIP instances and check the frontiers against the reference ones.
+
+For every instance the wall time, the iterations, the calls per subproblem and the points found are recorded, and the
+frontier is compared with the reference in the "nondominated frontiers" directory of its part of the dataset, when
+present: every point of each frontier must lie within the tolerance of the other frontier, its points or its connected
+segments (see metrics.epsilons). The results are stored in benchmarks/results/<commit>.json, so that runs of different commits can be
+compared with --compare. Run from the repository root:
+
+    python -m benchmarks.bench_suite --problems "First problem" --classes C20 --limit 2
+    python -m benchmarks.bench_suite --problems AP --compare 1f1c008
+"""
+
+import argparse
+import importlib
+import json
+import math
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+import batch
+import metrics
+import tracing
+
+RESULTS_PATH = Path(__file__).parent / "results"
+
+
+def commit_id() -> str:
+    """Short hash of HEAD, with a -dirty suffix if the tracked files have changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "diff", "--quiet", "HEAD", "--"],
+            capture_output=True,
+            cwd=Path(__file__).parent,
+        ).returncode
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("-dirty" if dirty else "")
+
+
+def compare_frontiers(found, reference, tol=1e-3) -> dict:
+    """
+    Check that each frontier is within tolerance of the other: every point of each frontier must lie on the boundary
+    of the region dominated by the other, within the tolerance on both objectives (see metrics.epsilons).
+
+    :param found: see metrics.as_array,
+        frontier of a minimization problem.
+    :param reference: see metrics.as_array,
+        frontier of a minimization problem.
+    :param tol: float (optional),
+        tolerance relative to the largest range of the reference objectives.
+    :return: dict,
+        "ok", the number of points of each frontier farther than the tolerance, the largest distance and the
+        additive epsilon indicator of the found frontier.
+    """
+    found, reference = metrics.as_array(found), metrics.as_array(reference)
+    span = max(*np.ptp(reference[:, :2], axis=0), 1.0) if len(reference) else 1.0
+    missed = np.abs(metrics.epsilons(found, reference))
+    extra = np.abs(metrics.epsilons(reference, found))
+    max_distance = float(max(missed.max(initial=0.0), extra.max(initial=0.0)))
+    epsilon = metrics.additive_epsilon(found, reference)
+    return {
+        "ok": bool(max_distance <= tol * span and epsilon <= tol * span),
+        "missed": int(np.sum(missed > tol * span)),
+        "extra": int(np.sum(extra > tol * span)),
+        "max_distance": max_distance,
+        "epsilon": epsilon,
+    }
+
+
+def run(jobs: list, output: Path, tol: float, **kwargs) -> list:
+    rows = []
+    for problem, problem_class, instance in jobs:
+        module = importlib.import_module(batch.PROBLEMS[problem])
+        module.SOLUTIONS_PATH = output / "solutions"
+        tracing.TRACES_PATH = output / "traces"
+
+        row = batch.run_instance(problem, problem_class, instance, **kwargs)
+        reference = batch.reference_path(problem, problem_class, instance)
+        solution = batch.solution_path(problem, problem_class, instance)
+        if reference is None:
+            row["reference"] = "missing"
+        elif not row["status"].startswith("solved"):
+            row["reference"] = "not checked"
+        else:
+            sense = batch.SENSES[batch.PROBLEMS[problem]]
+            check = compare_frontiers(
+                metrics.read_frontier(solution, sense),
+                metrics.read_frontier(reference, sense),
+                tol,
+            )
+            row["reference"] = "ok" if check.pop("ok") else "mismatch"
+            row.update(check)
+        rows.append(row)
+        print(
+            f"{problem}/{problem_class}/{instance}: {row['status']}, {row.get('time', math.nan):.2f}s, "
+            f"{row.get('iterations')} iterations, {row.get('points')} points, reference {row['reference']}"
+        )
+    return rows
+
+
+def compare_runs(rows: list, baseline: dict):
+    """Print the time of each instance against the baseline run."""
+    base = {(r["problem"], r["class"], r["instance"]): r for r in baseline["rows"]}
+    print(f"Against {baseline['commit']}:")
+    for row in rows:
+        old = base.get((row["problem"], row["class"], row["instance"]))
+        if old is None or "time" not in old or "time" not in row:
+            continue
+        print(
+            f"  {row['problem']}/{row['class']}/{row['instance']}: {old['time']:.2f}s -> {row['time']:.2f}s "
+            f"({row['time'] / max(old['time'], 1e-9):.2f}x), iterations {old.get('iterations')} -> "
+            f"{row.get('iterations')}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser("Balanced box benchmark suite")
+    parser.add_argument("--problems", nargs="+", default=list(batch.PROBLEMS))
+    parser.add_argument("--classes", nargs="+", default=None)
+    parser.add_argument("--instances", nargs="+", default=None)
+    parser.add_argument(
+        "--limit", type=int, default=None, help="Instances per class at most."
+    )
+    parser.add_argument("--time_limit", type=float, default=None)
+    parser.add_argument("--persistent", action="store_true")
+    parser.add_argument("--warmstart", action="store_true")
+    parser.add_argument("--lexicographic", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--tol",
+        type=float,
+        default=1e-3,
+        help="Tolerance of the reference check, relative to the range of the objectives.",
+    )
+    parser.add_argument(
+        "--compare", type=str, default=None, help="Commit of a stored run to compare."
+    )
+    args = parser.parse_args()
+
+    jobs = []
+    for problem in args.problems:
+        per_class = {}
+        for job in batch.discover_instances(problem):
+            if args.classes is not None and job[1] not in args.classes:
+                continue
+            if args.instances is not None and job[2] not in args.instances:
+                continue
+            per_class.setdefault(job[1], []).append(job)
+        for class_jobs in per_class.values():
+            jobs += class_jobs[: args.limit]
+
+    commit = commit_id()
+    baseline = None
+    if args.compare is not None:
+        with open(RESULTS_PATH / f"{args.compare}.json") as bfile:
+            baseline = json.load(bfile)
+    with tempfile.TemporaryDirectory() as output:
+        rows = run(
+            jobs,
+            Path(output),
+            args.tol,
+            time_limit=args.time_limit,
+            persistent=args.persistent or None,
+            warmstart=args.warmstart or None,
+            lexicographic=args.lexicographic or None,
+            workers=args.workers,
+        )
+
+    RESULTS_PATH.mkdir(parents=True, exist_ok=True)
+    result = {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "solvers": {
+            name: importlib.import_module(name).SOLVER
+            for name in sorted({batch.PROBLEMS[problem] for problem in args.problems})
+        },
+        "options": {
+            "persistent": args.persistent,
+            "warmstart": args.warmstart,
+            "lexicographic": args.lexicographic,
+            "workers": args.workers,
+            "time_limit": args.time_limit,
+        },
+        "rows": rows,
+    }
+    with open(RESULTS_PATH / f"{commit}.json", "w") as rfile:
+        json.dump(result, rfile, indent=2)
+    print(f"Results stored in {RESULTS_PATH / f'{commit}.json'}")
+
+    if baseline is not None:
+        compare_runs(rows, baseline)
+
+
+if __name__ == "__main__":
+    main()
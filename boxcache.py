@@ -0,0 +1,182 @@
+import os
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+
+from shapes.Point import Point
+from shapes.shapee import Shape
+from warmstart import box_bounds
+
+CACHE_SIZE = int(os.getenv("LEXMIN_CACHE_SIZE", default=10000))
+
+
+class LexminCache:
+    """
+    Results of the lexmins solved so far, to answer the ones they imply without calling the solver.
+
+    A lexmin is solved on the region of the objective space given by box_bounds. If the lexmin of a region lies in
+    a smaller region, it is the lexmin of the smaller region too, and a region inside one proven infeasible is
+    infeasible. The regions are compared within Point.precision, the precision at which points are told apart.
+
+    The regions of each objective order are indexed on their lexmin, sorted on the first objective, so that a
+    lookup only checks the regions whose lexmin lies in the new one. The infeasible regions are sorted on their
+    lower bound on the first objective, the ones starting after the new region are skipped. Given a frontier, a
+    lookup also answers from it, see frontier_lexmin.
+
+    The cache keeps at most maxsize regions, dropping the least recently used ones.
+
+    :param maxsize: int (optional),
+        number of regions kept.
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        # (objective order, bounds) -> Point, None if infeasible
+        self._entries = OrderedDict()
+        # objective order -> sorted (lexmin coordinates, bounds)
+        self._lexmins = {}
+        # objective order -> sorted bounds
+        self._infeasible = {}
+        self.hits = 0
+        self.frontier_hits = 0
+        self.infeasible_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(objective_order: tuple, shape: Shape) -> tuple:
+        bounds = tuple(
+            round(bound, Point.precision)
+            for bound in box_bounds(shape, objective_order)
+        )
+        return tuple(objective_order), bounds
+
+    @staticmethod
+    def _encloses(outer: tuple, inner: tuple) -> bool:
+        z1_lb, z1_ub, z2_lb, z2_ub = outer
+        in_z1_lb, in_z1_ub, in_z2_lb, in_z2_ub = inner
+        return (
+            z1_lb <= in_z1_lb
+            and in_z1_ub <= z1_ub
+            and z2_lb <= in_z2_lb
+            and in_z2_ub <= z2_ub
+        )
+
+    @staticmethod
+    def _inside(point: Point, bounds: tuple) -> bool:
+        x, y = point.rounded_data
+        z1_lb, z1_ub, z2_lb, z2_ub = bounds
+        return z1_lb <= x <= z1_ub and z2_lb <= y <= z2_ub
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _find(self, order: tuple, bounds: tuple) -> tuple:
+        """Key of a region implying the lexmin of bounds, None if there is none."""
+        if (order, bounds) in self._entries:
+            return order, bounds
+
+        z1_lb, z1_ub, z2_lb, z2_ub = bounds
+        lexmins = self._lexmins.get(order, [])
+        start = bisect_left(lexmins, ((z1_lb,),))
+        stop = bisect_right(lexmins, ((z1_ub, float("inf")),))
+        for (x, y), entry_bounds in lexmins[start:stop]:
+            if z2_lb <= y <= z2_ub and self._encloses(entry_bounds, bounds):
+                return order, entry_bounds
+
+        infeasible = self._infeasible.get(order, [])
+        stop = bisect_right(infeasible, (z1_lb,) + (float("inf"),) * 3)
+        for entry_bounds in infeasible[:stop]:
+            if self._encloses(entry_bounds, bounds):
+                return order, entry_bounds
+        return None
+
+    def lookup(self, objective_order: tuple, shape: Shape, frontier=None) -> tuple:
+        """
+        Find the lexmin of shape implied by the regions solved so far, or by frontier.
+
+        :param frontier: Frontier (optional),
+            nondominated points found so far.
+        :return: tuple,
+            (True, Point) if the lexmin is known, (True, None) if the region is known to be infeasible, (False, None)
+            if the solver has to be called.
+        """
+        order, bounds = self.key(objective_order, shape)
+        found = self._find(order, bounds)
+        if found is None:
+            point = (
+                None if frontier is None else frontier_lexmin(frontier, order, bounds)
+            )
+            if point is not None:
+                self.frontier_hits += 1
+                return True, point
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(found)
+        point = self._entries[found]
+        if point is None:
+            self.infeasible_hits += 1
+        else:
+            self.hits += 1
+        return True, point
+
+    def add(self, objective_order: tuple, shape: Shape, point: Point = None):
+        """
+        Store the lexmin of shape, None if the region is infeasible.
+        """
+        key = self.key(objective_order, shape)
+        if key in self._entries:
+            self._unindex(key, self._entries[key])
+        self._entries[key] = point
+        self._entries.move_to_end(key)
+        self._index(key, point)
+        while len(self._entries) > self.maxsize:
+            self._unindex(*self._entries.popitem(last=False))
+            self.evictions += 1
+
+    def _index(self, key: tuple, point: Point):
+        order, bounds = key
+        if point is None:
+            insort(self._infeasible.setdefault(order, []), bounds)
+        else:
+            insort(self._lexmins.setdefault(order, []), (point.rounded_data, bounds))
+
+    def _unindex(self, key: tuple, point: Point):
+        order, bounds = key
+        if point is None:
+            entries, item = self._infeasible[order], bounds
+        else:
+            entries, item = self._lexmins[order], (point.rounded_data, bounds)
+        del entries[bisect_left(entries, item)]
+
+    def counters(self) -> dict:
+        return {
+            "hits": self.hits,
+            "frontier hits": self.frontier_hits,
+            "infeasible hits": self.infeasible_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def frontier_lexmin(frontier, objective_order: tuple, bounds: tuple) -> Point:
+    """
+    Lexmin of a region read from the frontier. A nondominated point on the lower bound of the region on the first
+    objective of the order, and within the region, is its lexmin: no point of the region has a lower first objective,
+    and a point with the same one and a lower second objective would dominate it.
+
+    :param frontier: Frontier,
+        nondominated points found so far, with their connected segments.
+    :param bounds: tuple,
+        (z1_lb, z1_ub, z2_lb, z2_ub), see box_bounds.
+    :return: Point or None,
+        None if the frontier doesn't give the lexmin.
+    """
+    first = objective_order[0]
+    lower_bound = bounds[2 * (first - 1)]
+    if lower_bound == float("-inf"):
+        return None
+    point = frontier.at(first, lower_bound)
+    if point is None or not LexminCache._inside(point, bounds):
+        return None
+    return point
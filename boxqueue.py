@@ -0,0 +1,115 @@
+import heapq
+from itertools import count
+
+from shapes.Point import Point
+from shapes.shapee import Shape
+
+
+class BoxQueue:
+    """
+    Priority queue of the shapes left to explore, largest area first.
+
+    Shapes of equal area are popped in insertion order, so that the shapes themselves are never compared. The
+    pending shapes are indexed on their type and rounded corners: pushing a shape already waiting is a no-op, and
+    shapes can be dropped lazily, leaving their heap entry to be skipped when popped.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._index = {}
+        self._counter = count()
+        self.duplicates = 0
+        self.pruned = 0
+
+    @staticmethod
+    def key(shape: Shape) -> tuple:
+        return (
+            type(shape).__name__,
+            shape.topleft.rounded_data,
+            shape.botright.rounded_data,
+        )
+
+    def push(self, shape: Shape, splitting_direction=0) -> bool:
+        """
+        Add a shape to explore.
+
+        :param shape: Shape,
+            shape to explore.
+        :param splitting_direction: int (optional),
+            direction used when the shape is split.
+        :return: bool,
+            False if the same shape is already waiting.
+        """
+        key = self.key(shape)
+        if key in self._index:
+            self.duplicates += 1
+            return False
+        # the last item marks whether the entry is still pending
+        entry = [-shape.area, next(self._counter), shape, splitting_direction, True]
+        self._index[key] = entry
+        heapq.heappush(self._heap, entry)
+        return True
+
+    def pop(self) -> tuple:
+        """
+        Remove the largest shape.
+
+        :return: tuple,
+            (Shape, splitting direction).
+        """
+        while self._heap:
+            _, _, shape, splitting_direction, pending = heapq.heappop(self._heap)
+            if pending:
+                del self._index[self.key(shape)]
+                return shape, splitting_direction
+        raise IndexError("pop from an empty BoxQueue")
+
+    def largest_area(self) -> float:
+        """Area of the largest shape waiting, 0 if there is none."""
+        while self._heap and not self._heap[0][-1]:
+            heapq.heappop(self._heap)
+        return -self._heap[0][0] if self._heap else 0.0
+
+    def largest(self, n: int, kind: type = Shape) -> list:
+        """The n largest shapes of type kind waiting, largest first, left in the queue."""
+        entries = (
+            entry for entry in self._index.values() if isinstance(entry[2], kind)
+        )
+        return [entry[2] for entry in heapq.nsmallest(n, entries)]
+
+    def items(self) -> list:
+        """(Shape, splitting direction) waiting, in the order they would be popped."""
+        return [(entry[2], entry[3]) for entry in sorted(self._index.values())]
+
+    def remove(self, shape: Shape):
+        entry = self._index.pop(self.key(shape))
+        entry[-1] = False
+
+    def prune(self, point: Point) -> int:
+        """
+        Drop the shapes dominated by point: the ones where no point can be nondominated, since point is at least as
+        good as their ideal corner (topleft[0], botright[1]).
+
+        :return: int,
+            number of shapes dropped.
+        """
+        x, y = point.rounded_data
+        dominated = [
+            key
+            for key, (_, _, shape, _, _) in self._index.items()
+            if x <= shape.topleft.rounded_data[0]
+            and y <= shape.botright.rounded_data[1]
+        ]
+        for key in dominated:
+            self._index.pop(key)[-1] = False
+        self.pruned += len(dominated)
+        return len(dominated)
+
+    def __contains__(self, shape: Shape):
+        return self.key(shape) in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def __bool__(self):
+        return bool(self._index)
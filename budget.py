@@ -0,0 +1,150 @@
+import math
+import os
+import time
+from collections import deque
+from typing import Callable
+
+from boxqueue import BoxQueue
+from frontier import Frontier
+from utils import SolveStats, get_logger
+
+logger = get_logger(__name__)
+
+SNAPSHOT_INTERVAL = float(os.getenv("SNAPSHOT_INTERVAL", default=60))
+GAIN_WINDOW = float(os.getenv("GAIN_WINDOW", default=30))
+
+
+class Budget:
+    """
+    Limits of an anytime search, checked between two iterations, with the quality of the frontier found so far.
+
+    The quality is the hypervolume of the frontier with respect to the nadir of its ends, relative to the area of
+    the box of the ends, and the area of the largest shape left in the queue. The search can be stopped when the
+    relative hypervolume gained per second over the last window seconds drops under min_gain.
+
+    :param time_limit: float (optional),
+        seconds from the start of the search.
+    :param max_solves: int (optional),
+        number of solver calls, see backends.solve.
+    :param max_iterations: int (optional),
+        number of iterations.
+    :param min_gain: float (optional),
+        relative hypervolume gained per second under which the search stops.
+    :param window: float (optional),
+        seconds over which the gain is measured.
+    :param snapshot_interval: float (optional),
+        seconds between two snapshots, 0 for none.
+    :param snapshot: Callable (optional),
+        called with the frontier, the seconds elapsed and the iterations for each snapshot.
+    """
+
+    def __init__(
+        self,
+        time_limit=None,
+        max_solves=None,
+        max_iterations=None,
+        min_gain=None,
+        window=GAIN_WINDOW,
+        snapshot_interval=SNAPSHOT_INTERVAL,
+        snapshot: Callable = None,
+    ):
+        self.time_limit = time_limit
+        self.max_solves = max_solves
+        self.max_iterations = max_iterations
+        self.min_gain = min_gain
+        self.window = window
+        self.snapshot_interval = snapshot_interval
+        self.snapshot = snapshot
+
+        self.tic = time.perf_counter()
+        self.solves = 0
+        self.box_area = None
+        self.largest_box = 0.0
+        self._seen = 0  # records of the stats already counted
+        self._last_snapshot = self.tic
+        self._history = deque()  # (time, relative hypervolume)
+
+    def deadline(self):
+        """Wall clock time, as time.time(), at which the time limit is reached, None without time limit."""
+        if self.time_limit is None:
+            return None
+        return time.time() + self.time_limit - (time.perf_counter() - self.tic)
+
+    def start(self, frontier: Frontier):
+        """Take the ends of the frontier, the only points it has, as reference of the quality."""
+        points = list(frontier)
+        z_T, z_B = points[0], points[-1]
+        frontier.reference = (z_B[0], z_T[1])
+        self.box_area = (z_B[0] - z_T[0]) * (z_T[1] - z_B[1])
+
+    def quality(self, frontier: Frontier) -> dict:
+        """
+        :return: dict,
+            hypervolume, hypervolume relative to the box of the ends of the frontier and largest area in the queue
+            at the last check.
+        """
+        relative = frontier.hypervolume / self.box_area if self.box_area else math.nan
+        return {
+            "hypervolume": frontier.hypervolume,
+            "relative_hypervolume": relative,
+            "largest_box": self.largest_box,
+        }
+
+    def check(
+        self, frontier: Frontier, queue: BoxQueue, stats: SolveStats, iteration: int
+    ):
+        """
+        Take a snapshot if one is due and tell whether the search has to stop.
+
+        :param iteration: int,
+            iterations done.
+        :return: str or None,
+            why the search has to stop: "time limit", "solve limit", "iteration limit" or "low gain".
+        """
+        now = time.perf_counter()
+        for _, _, _, stages in stats.records[self._seen :]:
+            self.solves += len(stages)
+        self._seen = len(stats.records)
+
+        self.largest_box = queue.largest_area()
+        quality = self.quality(frontier)
+        if (
+            self.snapshot_interval
+            and now - self._last_snapshot >= self.snapshot_interval
+        ):
+            self._last_snapshot = now
+            logger.info(
+                "%.1fs, %s iterations, %s solves: %s points, hypervolume %.2f%% of the box, largest box left %.4g",
+                now - self.tic,
+                iteration,
+                self.solves,
+                len(frontier),
+                100 * quality["relative_hypervolume"],
+                quality["largest_box"],
+            )
+            if self.snapshot is not None:
+                self.snapshot(frontier, now - self.tic, iteration)
+
+        if not queue:
+            return None
+        if self.time_limit is not None and now - self.tic > self.time_limit:
+            return "time limit"
+        if self.max_solves is not None and self.solves >= self.max_solves:
+            return "solve limit"
+        if self.max_iterations is not None and iteration >= self.max_iterations:
+            return "iteration limit"
+        if self.min_gain is not None and self._low_gain(
+            now, quality["relative_hypervolume"]
+        ):
+            return "low gain"
+        return None
+
+    def _low_gain(self, now: float, relative: float) -> bool:
+        self._history.append((now, relative))
+        # keep the last sample older than the window as the start of the window
+        while len(self._history) > 1 and self._history[1][0] <= now - self.window:
+            self._history.popleft()
+        start, start_relative = self._history[0]
+        if now <= start or now - start < self.window:
+            return False
+        return (relative - start_relative) / (now - start) < self.min_gain
@@ -0,0 +1,152 @@
+import os
+import pickle
+import time
+from pathlib import Path
+
+from boxqueue import BoxQueue
+from frontier import Frontier
+from utils import SolveStats, get_logger
+from warmstart import SolutionStore
+
+logger = get_logger(__name__)
+
+CHECKPOINT_INTERVAL = float(os.getenv("CHECKPOINT_INTERVAL", default=300))
+CHECKPOINTS_PATH = Path(os.getenv("CHECKPOINTS_PATH", default="./checkpoints"))
+# bumped when the content of the checkpoints changes, older ones are then ignored
+FORMAT_VERSION = 1
+
+
+class Checkpoint:
+    """
+    Snapshot of the state of a search, to resume it once its process died: the shapes left in the queue with their
+    splitting direction, the frontier points with their connected flags, the solutions behind them, the iterations
+    done, the solve stats and the time elapsed. Resuming from it explores the same shapes in the same order as
+    the search that saved it, so that it finds the same frontier.
+
+    The state is pickled in a temporary file renamed over the previous checkpoint, so that a crash while saving
+    leaves the previous one intact. A Checkpoint without path does nothing, so the search loops can call it
+    unconditionally.
+
+    :param path: Path (optional),
+        path of the checkpoint file.
+    :param interval: float (optional),
+        seconds between two saves, see due.
+    """
+
+    def __init__(self, path: Path = None, interval=CHECKPOINT_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self._last = time.perf_counter()
+
+    @classmethod
+    def for_instance(
+        cls, problem: str, problem_class: str, instance: str, interval=None
+    ):
+        """Checkpoint in CHECKPOINTS_PATH/problem/problem_class/<instance>.pkl."""
+        return cls(
+            CHECKPOINTS_PATH / problem / problem_class / f"{Path(instance).stem}.pkl",
+            CHECKPOINT_INTERVAL if interval is None else interval,
+        )
+
+    def due(self) -> bool:
+        """Whether interval seconds passed since the last save, never if the interval is 0."""
+        return (
+            self.path is not None
+            and self.interval > 0
+            and time.perf_counter() - self._last >= self.interval
+        )
+
+    def save(
+        self,
+        frontier: Frontier,
+        queue: BoxQueue,
+        iteration: int,
+        stats: SolveStats,
+        solutions: SolutionStore,
+        elapsed: float,
+        running=(),
+    ):
+        """
+        Save the state of a search between two iterations.
+
+        :param iteration: int,
+            number of the next iteration.
+        :param solutions: SolutionStore or None,
+            solutions behind the frontier points.
+        :param elapsed: float,
+            seconds of search so far, the ones of the searches resumed before included.
+        :param running: list (optional),
+            (Shape, splitting direction) being explored, not in the queue anymore, put back in it on resume.
+        """
+        if self.path is None:
+            return
+
+        state = {
+            "version": FORMAT_VERSION,
+            "frontier": list(frontier.items()),
+            "dominated": frontier.dominated,
+            "queue": list(running) + queue.items(),
+            "duplicates": queue.duplicates,
+            "pruned": queue.pruned,
+            "iteration": iteration,
+            "stats": stats,
+            "solutions": None if solutions is None else solutions.solutions,
+            "elapsed": elapsed,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        with open(temporary, "wb") as cfile:
+            pickle.dump(state, cfile, protocol=pickle.HIGHEST_PROTOCOL)
+            cfile.flush()
+            os.fsync(cfile.fileno())
+        os.replace(temporary, self.path)
+        self._last = time.perf_counter()
+        logger.debug("Checkpoint of iteration %s saved in %s", iteration, self.path)
+
+    def load(self):
+        """
+        :return: dict or None,
+            state saved, see save, None if there is no checkpoint to resume from.
+        """
+        if self.path is None or not self.path.exists():
+            return None
+        with open(self.path, "rb") as cfile:
+            state = pickle.load(cfile)
+        if state.get("version") != FORMAT_VERSION:
+            logger.warning("Ignoring the checkpoint %s of an older version.", self.path)
+            return None
+        logger.info(
+            "Resuming from the checkpoint of iteration %s, %s points and %s shapes left.",
+            state["iteration"],
+            len(state["frontier"]),
+            len(state["queue"]),
+        )
+        return state
+
+    def remove(self):
+        """Remove the checkpoint, once the search it belongs to is complete."""
+        if self.path is not None and self.path.exists():
+            self.path.unlink()
+
+
+def restore(state: dict, solutions: SolutionStore = None) -> tuple:
+    """
+    Rebuild the frontier and the queue of a saved search.
+
+    :param state: dict,
+        see Checkpoint.load.
+    :param solutions: SolutionStore (optional),
+        store in which the saved solutions are put back.
+    :return: tuple,
+        (Frontier, BoxQueue).
+    """
+    frontier = Frontier(dict(state["frontier"]))
+    frontier.dominated = state["dominated"]
+    queue = BoxQueue()
+    for shape, splitting_direction in state["queue"]:
+        queue.push(shape, splitting_direction)
+    queue.duplicates = state["duplicates"]
+    queue.pruned = state["pruned"]
+    if solutions is not None and state["solutions"] is not None:
+        solutions.solutions.update(state["solutions"])
+    return frontier, queue
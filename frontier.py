@@ -0,0 +1,225 @@
+import logging
+from bisect import bisect_left
+from collections.abc import MutableMapping
+
+from shapes.Point import Point
+from shapes.point_array import PointArray
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class Frontier(MutableMapping):
+    """
+    Nondominated frontier of a biobjective minimization problem: maps each point to its connected flag, 1 if the
+    segment between the point and the next one is part of the frontier.
+
+    The points are kept sorted on the first objective, and since none dominates another the second objective
+    decreases along them. Both are compared on Point.rounded_data, so that points closer than Point.precision are
+    the same point. Setting a point dominated by the frontier leaves the frontier unchanged, while the points it
+    dominates are removed.
+
+    Given a reference point, the hypervolume of the frontier is kept up to date as points are set: the area
+    between the frontier and the reference point, under the connected segments and under the staircase of the
+    other points.
+
+    The callables in observers are called with each point set and its flag, and with each point deleted and None,
+    to follow the changes of the frontier as they happen.
+
+    :param points: dict (optional),
+        point -> connected flag.
+    :param reference: tuple (optional),
+        reference point of the hypervolume, dominated by all the points of the frontier.
+    """
+
+    def __init__(self, points=None, reference=None):
+        self._keys = []  # rounded coordinates of the points, sorted
+        self._points = []
+        self._flags = []
+        self.dominated = 0
+        self._reference = None
+        self._hypervolume = 0.0
+        self.observers = []
+        if points is not None:
+            self.update(points)
+        self.reference = reference
+
+    @property
+    def reference(self):
+        return self._reference
+
+    @reference.setter
+    def reference(self, reference):
+        self._reference = None if reference is None else tuple(reference)
+        self._hypervolume = self._gaps(0, len(self._points))
+
+    @property
+    def hypervolume(self) -> float:
+        """Hypervolume of the frontier with respect to the reference point, 0 without reference."""
+        return self._hypervolume
+
+    def _gaps(self, start: int, stop: int) -> float:
+        """Hypervolume between the points start to stop - 1 and the points following them."""
+        if self._reference is None:
+            return 0.0
+        ref_x, ref_y = self._reference
+        area = 0.0
+        for i in range(max(start, 0), min(stop, len(self._points))):
+            x, y = self._points[i][0], self._points[i][1]
+            if i + 1 == len(self._points):
+                area += (ref_x - x) * (ref_y - y)
+                continue
+            next_x, next_y = self._points[i + 1][0], self._points[i + 1][1]
+            if self._flags[i] == 1:
+                area += (next_x - x) * (ref_y - (y + next_y) / 2)
+            else:
+                area += (next_x - x) * (ref_y - y)
+        return area
+
+    @staticmethod
+    def _as_point(point) -> Point:
+        return point if isinstance(point, Point) else Point(point)
+
+    def _find(self, key: tuple) -> int:
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return i
+        return -1
+
+    def add(self, point, connected=0) -> bool:
+        """
+        Set the connected flag of point, adding it to the frontier. The point is found with a binary search, while
+        inserting it and removing the points it dominates shifts the lists, linear in the number of points.
+
+        :param point: Point or tuple,
+            point in the objective space.
+        :param connected: int (optional),
+            1 if the segment to the next point is part of the frontier.
+        :return: bool,
+            False if the point is dominated and wasn't added.
+        """
+        point = self._as_point(point)
+        key = point.rounded_data
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            self._hypervolume -= self._gaps(i, i + 1)
+            self._flags[i] = connected
+            self._hypervolume += self._gaps(i, i + 1)
+            self._notify(point, connected)
+            return True
+
+        # the previous point has the lowest second objective among the ones with a lower first objective
+        if i > 0 and self._keys[i - 1][1] <= key[1]:
+            logger.debug("%s is dominated by %s", point, self._points[i - 1])
+            self.dominated += 1
+            return False
+
+        # the points dominated by the new one follow it
+        j = i
+        while j < len(self._keys) and self._keys[j][1] >= key[1]:
+            j += 1
+        if j > i:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s dominates %s", point, self._points[i:j])
+            self.dominated += j - i
+
+        self._hypervolume -= self._gaps(i - 1, j)
+        self._keys[i:j] = [key]
+        self._points[i:j] = [point]
+        self._flags[i:j] = [connected]
+        self._hypervolume += self._gaps(i - 1, i + 1)
+        self._notify(point, connected)
+        return True
+
+    def _notify(self, point: Point, connected):
+        for observer in self.observers:
+            observer(point, connected)
+
+    def __setitem__(self, point, connected):
+        self.add(point, connected)
+
+    def __getitem__(self, point):
+        i = self._find(self._as_point(point).rounded_data)
+        if i < 0:
+            raise KeyError(point)
+        return self._flags[i]
+
+    def __delitem__(self, point):
+        i = self._find(self._as_point(point).rounded_data)
+        if i < 0:
+            raise KeyError(point)
+        self._hypervolume -= self._gaps(i - 1, i + 1)
+        point = self._points[i]
+        del self._keys[i], self._points[i], self._flags[i]
+        self._hypervolume += self._gaps(i - 1, i)
+        self._notify(point, None)
+
+    def __contains__(self, point):
+        return self._find(self._as_point(point).rounded_data) >= 0
+
+    def __iter__(self):
+        return iter(self._points)
+
+    def __len__(self):
+        return len(self._points)
+
+    def __repr__(self):
+        return f"Frontier({dict(zip(self._points, self._flags))})"
+
+    def to_array(self) -> PointArray:
+        """Points of the frontier, sorted on the first objective."""
+        return PointArray(self._points)
+
+    def neighbours(self, point) -> tuple:
+        """
+        Points of the frontier right before and after point on the first objective, point may not be in the
+        frontier.
+
+        :return: tuple,
+            (previous Point, next Point), None past the ends of the frontier.
+        """
+        key = self._as_point(point).rounded_data
+        i = bisect_left(self._keys, key)
+        j = i + 1 if i < len(self._keys) and self._keys[i] == key else i
+        previous = self._points[i - 1] if i > 0 else None
+        following = self._points[j] if j < len(self._points) else None
+        return previous, following
+
+    def at(self, objective: int, value: float) -> Point:
+        """
+        Point of the frontier whose objective is value: a point of the frontier, or the point of a connected segment
+        crossing value, compared at Point.precision.
+
+        :param objective: int,
+            1 or 2.
+        :return: Point or None
+        """
+        value = round(value, Point.precision)
+        axis = objective - 1
+        # the first objective increases along the frontier, the second one decreases
+        sign = 1 if axis == 0 else -1
+        lo, hi = 0, len(self._keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if sign * self._keys[mid][axis] < sign * value:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self._keys) and self._keys[lo][axis] == value:
+            return self._points[lo]
+        if 0 < lo < len(self._keys) and self._flags[lo - 1] == 1:
+            start, end = self._points[lo - 1], self._points[lo]
+            ratio = (value - start[axis]) / (end[axis] - start[axis])
+            crossing = [start[0] + ratio * (end[0] - start[0])]
+            crossing.append(start[1] + ratio * (end[1] - start[1]))
+            crossing[axis] = value
+            return Point(tuple(crossing))
+        return None
+
+    def segments(self) -> list:
+        """Connected segments of the frontier as (Point, Point)."""
+        return [
+            (self._points[i], self._points[i + 1])
+            for i in range(len(self._points) - 1)
+            if self._flags[i] == 1
+        ]
@@ -0,0 +1,250 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+import batch
+import metrics
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+SOLUTIONS_PATH = Path(os.getenv("SOLUTIONS_PATH", default="./my_solutions"))
+DIFF_COLUMNS = (
+    "problem",
+    "class",
+    "instance",
+    "status",
+    "points",
+    "reference_points",
+    "missing",
+    "extra",
+    "segments",
+    "epsilon",
+)
+
+
+def match(points: np.ndarray, other: np.ndarray, tol: float) -> np.ndarray:
+    """
+    Match the points of a frontier with the ones of another, within tol on both objectives.
+
+    :param points: np.ndarray,
+        frontier, see metrics.as_array.
+    :param other: np.ndarray,
+        frontier, see metrics.as_array.
+    :return: np.ndarray,
+        for each point, the index of the closest point of other within tol, -1 if there is none.
+    """
+    result = np.full(len(points), -1)
+    if not len(points) or not len(other):
+        return result
+    # the points of other within tol on the first objective of each point are other[low:high]
+    low = np.searchsorted(other[:, 0], points[:, 0] - tol, side="left")
+    high = np.searchsorted(other[:, 0], points[:, 0] + tol, side="right")
+    best = np.full(len(points), np.inf)
+    for offset in range(int((high - low).max(initial=0))):
+        candidate = low + offset
+        inside = candidate < high
+        index = np.minimum(candidate, len(other) - 1)
+        distance = np.abs(other[index, :2] - points[:, :2]).max(axis=1)
+        closer = inside & (distance <= tol) & (distance < best)
+        best[closer] = distance[closer]
+        result[closer] = index[closer]
+    return result
+
+
+def diff_frontiers(found, reference, tol=1e-3) -> dict:
+    """
+    Point by point difference between a frontier and its reference.
+
+    :param found: see metrics.as_array,
+        frontier of a minimization problem.
+    :param reference: see metrics.as_array,
+        frontier of a minimization problem.
+    :param tol: float (optional),
+        tolerance on both objectives, relative to the largest range of the reference objectives.
+    :return: dict,
+        the reference points without a found point within tolerance ("missing"), the found points without a
+        reference point ("extra"), the segments between two matched consecutive points connected in one frontier
+        and not in the other ("segments"), and the additive epsilon indicator of found.
+    """
+    found, reference = metrics.as_array(found), metrics.as_array(reference)
+    span = max(*np.ptp(reference[:, :2], axis=0), 1.0) if len(reference) else 1.0
+    tol *= span
+
+    to_found = match(reference, found, tol)
+    to_reference = match(found, reference, tol)
+    # a segment of the reference is compared when its ends are matched with consecutive found points
+    compared = (to_found[:-1] >= 0) & (to_found[1:] == to_found[:-1] + 1)
+    segments = 0
+    if len(found):
+        flags = found[np.maximum(to_found[:-1], 0), 2]
+        segments = np.count_nonzero(compared & (reference[:-1, 2] != flags))
+    return {
+        "points": len(found),
+        "reference_points": len(reference),
+        "missing": int(np.count_nonzero(to_found < 0)),
+        "extra": int(np.count_nonzero(to_reference < 0)),
+        "segments": int(segments),
+        "epsilon": metrics.additive_epsilon(found, reference),
+    }
+
+
+def diff_file(job: tuple) -> dict:
+    """
+    :param job: tuple,
+        (problem, problem_class, instance, solution path, reference path or None, "min" or "max" sense, tol).
+    :return: dict,
+        see diff_frontiers, with the instance and its status: "ok", "different" or "no reference".
+    """
+    problem, problem_class, instance, path, reference_path, sense, tol = job
+    row = {"problem": problem, "class": problem_class, "instance": instance}
+    found = metrics.read_frontier(path, sense)
+    if reference_path is None:
+        row.update(status="no reference", points=len(found))
+        return row
+    row.update(diff_frontiers(found, metrics.read_frontier(reference_path, sense), tol))
+    different = row["missing"] or row["extra"] or row["segments"]
+    row["status"] = "different" if different else "ok"
+    return row
+
+
+def solution_tree(
+    solutions_path: Path,
+    references_path: Path = None,
+    problem: str = None,
+    problem_class: str = None,
+    tol=1e-3,
+) -> list:
+    """
+    Jobs of diff_file for the solution files <problem>/<class>/*dat.txt of a solutions directory.
+
+    :param references_path: Path (optional),
+        directory of the reference files <problem>/<class>/*out.txt, the ones of the dataset by default, see
+        batch.reference_path.
+    :return: list
+    """
+    jobs = []
+    paths = sorted(
+        Path(solutions_path).glob("*/*/*dat.txt"),
+        key=lambda path: [
+            batch._natural_key(part) for part in (path.parent.parent, path.parent, path)
+        ],
+    )
+    for path in paths:
+        instance, instance_class, instance_problem = (
+            path.name,
+            path.parent.name,
+            path.parent.parent.name,
+        )
+        if problem is not None and instance_problem != problem:
+            continue
+        if problem_class is not None and instance_class != problem_class:
+            continue
+        module = batch.PROBLEMS.get(instance_problem)
+        sense = batch.SENSES[module] if module is not None else "min"
+        if references_path is not None:
+            reference = (
+                Path(references_path)
+                / instance_problem
+                / instance_class
+                / instance.replace("dat", "out")
+            )
+            reference = reference if reference.exists() else None
+        elif module is not None:
+            reference = batch.reference_path(instance_problem, instance_class, instance)
+        else:
+            reference = None
+        jobs.append(
+            (instance_problem, instance_class, instance, path, reference, sense, tol)
+        )
+    return jobs
+
+
+def diff_tree(jobs: list, workers=1) -> list:
+    """
+    Run diff_file on the jobs with a pool of processes.
+
+    :param workers: int (optional),
+        number of processes, the files are compared in this one if 1.
+    :return: list,
+        a row per job, in the order of jobs.
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        return [diff_file(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(diff_file, jobs, chunksize=max(1, len(jobs) // (4 * workers)))
+        )
+
+
+def format_diff(rows: list) -> str:
+    """Tab separated table of the differences, with a header line."""
+    lines = ["\t".join(DIFF_COLUMNS)]
+    for row in rows:
+        cells = []
+        for column in DIFF_COLUMNS:
+            value = row.get(column, "")
+            cells.append(f"{value:.4g}" if isinstance(value, float) else str(value))
+        lines.append("\t".join(cells))
+    return "\n".join(lines) + "\n"
+
+
+parser = argparse.ArgumentParser("Frontier diff")
+parser.add_argument(
+    "--solutions",
+    type=str,
+    default=str(SOLUTIONS_PATH),
+    help="Directory of the solution files, <problem>/<class>/*dat.txt.",
+)
+parser.add_argument(
+    "--references",
+    type=str,
+    default=None,
+    help="Directory of the reference files, <problem>/<class>/*out.txt, the ones of the dataset by default.",
+)
+parser.add_argument("-problem", type=str, default=None)
+parser.add_argument("-problem_class", type=str, default=None)
+parser.add_argument(
+    "--tol",
+    type=float,
+    default=1e-3,
+    help="Tolerance on the objectives, relative to the largest range of the reference objectives.",
+)
+parser.add_argument(
+    "--workers",
+    type=int,
+    default=os.cpu_count(),
+    help="Number of processes comparing the files.",
+)
+parser.add_argument(
+    "--output",
+    type=str,
+    default=None,
+    help="Write the table of the differences to this file.",
+)
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    jobs = solution_tree(
+        args.solutions, args.references, args.problem, args.problem_class, args.tol
+    )
+    rows = diff_tree(jobs, args.workers)
+    table = format_diff(rows)
+    sys.stdout.write(table)
+    if args.output is not None:
+        with open(args.output, "w") as ofile:
+            ofile.write(table)
+
+    different = sum(row["status"] == "different" for row in rows)
+    logger.info(
+        "%s files compared, %s different, %s without reference.",
+        len(rows),
+        different,
+        sum(row["status"] == "no reference" for row in rows),
+    )
+    sys.exit(1 if different else 0)
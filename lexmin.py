@@ -1,16 +1,65 @@
 import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from os import getenv
 from copy import deepcopy
+from typing import Callable
 
 import pyomo.environ as pyo
+from pyomo.solvers.plugins.solvers.persistent_solver import PersistentSolver
 
+from backends import lexicographic_solver, solve, solve_lexicographic
+from boxcache import CACHE_SIZE, LexminCache
 from shapes.rectangle import Rectangle
+from shapes.triangle import Triangle
 from shapes.shapee import Shape
 from shapes.Point import Point
-from utils import get_logger
+from utils import SolveStats, get_logger
+from warmstart import SolutionStore, apply_start, warm_start_capable
 
 logger = get_logger(__name__)
 
+# Worker processes solving the independent subproblems of a batch, see BoxSolver.
+WS_WORKERS = int(getenv("WS_WORKERS", default=1))
+
+# State of a worker process: its own box solver, built once in _init_pool_worker.
+_pool_worker = {}
+
+
+def _init_pool_worker(solver_cls, model, solver_factory, warmstart):
+    _pool_worker["solver"] = solver_cls.from_factory(model, solver_factory, warmstart)
+
+
+def _ld_task(triangle: Triangle) -> tuple:
+    """Check a triangle on the worker's solver, returning the connected flag with the solve stats."""
+    solver = _pool_worker["solver"]
+    solver.stats = SolveStats()
+    return solver.line_detector(triangle), solver.stats
+
+
+def _ws_task(rectangle: Rectangle, starts: dict = None) -> tuple:
+    """
+    Solve the weighted sum of a rectangle on the worker's solver, returning the result with the solution found and
+    the solve stats.
+    """
+    solver = _pool_worker["solver"]
+    solver.stats = SolveStats()
+    if solver.solutions is not None and starts:
+        solver.solutions.solutions.update(starts)
+
+    z_star, improving = solver.weighted_sum_step(rectangle)
+
+    found = {}
+    if solver.solutions is not None and z_star in solver.solutions:
+        found[z_star] = solver.solutions.solutions[z_star]
+    return (z_star, improving), found, solver.stats
+
+
+def _record(stats: SolveStats, build_time: float, solve_time: float, stages: list):
+    if stats is not None:
+        stats.record("find_lexmin", build_time, solve_time, stages)
+
 
 def find_lexmin(
     model: pyo.ConcreteModel,
@@ -18,6 +67,9 @@ def find_lexmin(
     opt: pyo.SolverFactory,
     shape: Shape = Rectangle(),
     verbose=False,
+    stats: SolveStats = None,
+    solutions: SolutionStore = None,
+    lexicographic=False,
 ) -> Point:
     """
     Finds the lexmin of a biobjective minimization problem's model wrote in Pyomo where both objectives are defined as
@@ -32,14 +84,24 @@ def find_lexmin(
         Rectange in which the optimization is constrained.
     :param verbose: bool (optional),
         Print the output of the solver.
+    :param stats: SolveStats (optional),
+        Where to record the build and solve times of the call.
+    :param solutions: SolutionStore (optional),
+        Solutions behind the known frontier points. If given, a stored solution lying in shape is used as MIP start,
+        the first stage optimum is used as start for the second stage and the solution found is stored.
+    :param lexicographic: bool (optional),
+        Solve both objectives in a single call when the solver has hierarchical objectives (Gurobi). With the other
+        solvers the first stage optimum is the incumbent of the second stage, whose objective is bounded by its
+        value there.
     :return: Point
     """
+    tic = time.perf_counter()
     model_copy = deepcopy(model)
     model_copy.name = "Lexmin"
+    stages = []
 
     if objective_order == (1, 2):
-        model_copy.objective1.activate()
-        model_copy.objective2.deactivate()
+        first, second = model_copy.objective1, model_copy.objective2
 
         model_copy.ztop_cstr_y = pyo.Constraint(
             expr=model_copy.objective2.expr <= shape.topleft[1]
@@ -54,24 +116,8 @@ def find_lexmin(
             expr=model_copy.objective1.expr >= shape.topleft[0]
         )
 
-        logger.info(f"Solving the first problem in lexmin with order {objective_order}")
-        opt.solve(model_copy, tee=verbose)
-
-        model_copy.objective_constraint = pyo.Constraint(
-            expr=model_copy.objective1.expr <= pyo.value(model_copy.objective1)
-        )
-        logger.debug(f"Additional constraint z1 <= {pyo.value(model_copy.objective1)}")
-
-        model_copy.objective1.deactivate()
-        model_copy.objective2.activate()
-        logger.info(
-            f"Solving the second problem in lexmin with order {objective_order}"
-        )
-        res = opt.solve(model_copy, tee=verbose)
-
     elif objective_order == (2, 1):
-        model_copy.objective2.activate()
-        model_copy.objective1.deactivate()
+        first, second = model_copy.objective2, model_copy.objective1
 
         # if isinstance(shape, Rectangle):
         model_copy.ztop_cstr_y = pyo.Constraint(
@@ -85,29 +131,118 @@ def find_lexmin(
             expr=model_copy.objective2.expr >= shape.botright[1]
         )
 
-        logger.info(f"Solving the first problem in lexmin with order {objective_order}")
-        opt.solve(model_copy, tee=verbose)
+    else:
+        raise ValueError("The objective order provided isn't accepted")
+
+    first.activate()
+    second.deactivate()
+    start_kwds = apply_start(opt, model_copy, solutions, shape, objective_order, stats)
+    lex_opt = lexicographic_solver(opt) if lexicographic else None
+
+    if lex_opt is not None:
+        if lex_opt is not opt:
+            lex_opt.set_instance(model_copy)
+        logger.info(
+            "Solving the lexmin with order %s in a single call", objective_order
+        )
+        build_time = time.perf_counter() - tic
+        tic = time.perf_counter()
+        optimal = solve_lexicographic(
+            lex_opt, model_copy, (first, second), verbose, stages, **start_kwds
+        )
+        solve_time = time.perf_counter() - tic
+
+    else:
+        logger.info(
+            "Solving the first problem in lexmin with order %s", objective_order
+        )
+        build_time = time.perf_counter() - tic
+        tic = time.perf_counter()
+        optimal = solve(opt, model_copy, verbose, stages, **start_kwds)
+        solve_time = time.perf_counter() - tic
+        if not optimal:
+            _record(stats, build_time, solve_time, stages)
+            raise ValueError("Solution not found.")
 
         model_copy.objective_constraint = pyo.Constraint(
-            expr=model_copy.objective2.expr <= pyo.value(model_copy.objective2)
+            expr=first.expr <= pyo.value(first)
+        )
+        logger.debug(
+            "Additional constraint z%s <= %s", objective_order[0], pyo.value(first)
         )
-        logger.debug(f"Additional constraint z2 <= {pyo.value(model_copy.objective2)}")
 
-        model_copy.objective2.deactivate()
-        model_copy.objective1.activate()
+        # the first stage optimum, loaded in the model, is feasible for the second stage
+        second_stage_kwds = {}
+        if (solutions is not None or lexicographic) and warm_start_capable(opt):
+            second_stage_kwds["warmstart"] = True
+            if stats is not None:
+                stats.count("second stage warm start supplied")
+        if lexicographic:
+            model_copy.cutoff_constraint = pyo.Constraint(
+                expr=second.expr <= pyo.value(second)
+            )
 
+        first.deactivate()
+        second.activate()
         logger.info(
-            f"Solving the second problem in lexmin with order {objective_order}"
+            "Solving the second problem in lexmin with order %s", objective_order
         )
-        res = opt.solve(model_copy, tee=verbose)
+        tic = time.perf_counter()
+        optimal = solve(opt, model_copy, verbose, stages, **second_stage_kwds)
+        solve_time += time.perf_counter() - tic
 
-    else:
-        raise ValueError("The objective order provided isn't accepted")
+    _record(stats, build_time, solve_time, stages)
 
-    if res.Solver.Termination_condition != "optimal":
+    if not optimal:
         raise ValueError("Solution not found.")
 
-    return Point((pyo.value(model_copy.objective1), pyo.value(model_copy.objective2)))
+    point = Point((pyo.value(model_copy.objective1), pyo.value(model_copy.objective2)))
+    if solutions is not None:
+        solutions.save(point, model_copy)
+    return point
+
+
+def explore_weighted_sum(
+    rectangle: Rectangle, solve_rectangles: Callable, z_cap=None
+) -> list:
+    """
+    Finds the supported points of a rectangle with a work queue of rectangles. The weighted sum of the objectives,
+    weighted by the slope between the corners of a rectangle, is minimized in it; if the optimum lies below the
+    segment between the corners, the rectangles between each corner and the optimum are queued.
+
+    The queue is processed in waves: the rectangles of a wave are independent, so that they can be solved
+    concurrently.
+
+    :param rectangle: Rectangle,
+        rectangle in which the supported points are searched.
+    :param solve_rectangles: Callable,
+        called with a list of rectangles, returns for each the optimum (Point or None if not found) and whether it
+        lies below the segment between the corners.
+    :param z_cap: list (optional),
+        points found so far.
+    :return: list[Point] sorted on the first objective.
+    """
+    if z_cap is None:
+        z_cap = [rectangle.topleft, rectangle.botright]
+    seen = set(z_cap)
+    pending = [rectangle]
+    while pending:
+        wave, pending = pending, []
+        for current, (z_star, improving) in zip(wave, solve_rectangles(wave)):
+            if z_star is None:
+                continue
+            if z_star not in seen:
+                seen.add(z_star)
+                z_cap.append(z_star)
+            if improving:
+                try:
+                    pending.append(Rectangle(current.topleft, z_star))
+                    pending.append(Rectangle(z_star, current.botright))
+                except ValueError:
+                    logger.warning("Solution not found in weighted sum method.")
+
+    z_cap.sort(key=lambda x: x[0])
+    return z_cap
 
 
 def weighted_sum(
@@ -115,8 +250,40 @@ def weighted_sum(
     rectangle: Rectangle,
     opt: pyo.SolverFactory,
     z_cap=None,
+    stats: SolveStats = None,
+    solutions: SolutionStore = None,
 ):
+    """
+    Finds the supported points of the model in the rectangle, see explore_weighted_sum, on a copy of the model made
+    for every rectangle.
+
+    :return: list[Point] sorted on the first objective.
+    """
+
+    def solve_rectangles(rectangles: list) -> list:
+        return [
+            weighted_sum_step(model, current, opt, stats, solutions)
+            for current in rectangles
+        ]
+
+    return explore_weighted_sum(rectangle, solve_rectangles, z_cap)
+
+
+def weighted_sum_step(
+    model: pyo.ConcreteModel,
+    rectangle: Rectangle,
+    opt: pyo.SolverFactory,
+    stats: SolveStats = None,
+    solutions: SolutionStore = None,
+) -> tuple:
+    """
+    Minimizes the weighted sum of the objectives in the rectangle, on a copy of the model.
+
+    :return: tuple,
+        the optimum (Point or None if not found) and whether it lies below the segment between the corners.
+    """
     EPS_WS = float(getenv("EPS_WS", default=1e-4))
+    tic = time.perf_counter()
     model_copy = deepcopy(model)
     model_copy.name = "WeightedSum"
 
@@ -150,78 +317,433 @@ def weighted_sum(
         expr=model_copy.objective1.expr >= rectangle.topleft[0]
     )
 
-    logger.info(f"Solving the weighted sum model.")
-    opt.solve(model_copy)
+    start_kwds = apply_start(opt, model_copy, solutions, rectangle, stats=stats)
+
+    logger.info("Solving the weighted sum model.")
+    build_time = time.perf_counter() - tic
+    tic = time.perf_counter()
+    stages = []
+    optimal = solve(opt, model_copy, details=stages, **start_kwds)
+    if stats is not None:
+        stats.record("weighted_sum", build_time, time.perf_counter() - tic, stages)
+
+    if not optimal:
+        return None, False
+    try:
+        z_star = Point(
+            (pyo.value(model_copy.objective1), pyo.value(model_copy.objective2))
+        )
+        value = pyo.value(model_copy.weighted_obj)
+    except ValueError:
+        logger.warning("Solution not found in weighted sum method.")
+        return None, False
+    if solutions is not None and z_star not in solutions:
+        solutions.save(z_star, model_copy)
+    improving = value < lambda1 * z1[0] + lambda2 * z1[1] - EPS_WS
+    if improving and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s < %s", value, lambda1 * z1[0] + lambda2 * z1[1])
+        logger.debug("%s < %s", value, lambda1 * z2[0] + lambda2 * z2[1])
+    return z_star, improving
+
+
+def line_detection_model(model: pyo.ConcreteModel) -> pyo.ConcreteModel:
+    """
+    Builds the auxiliary model of the line detector: two copies of the model, first and second, whose integer
+    variables are equal, and gamma bounding how far the objectives of first (second) are from the topleft (botright)
+    corner of a triangle. The corners are mutable parameters, so that the model is built once and reused for every
+    triangle.
+
+    :param model: pyo.ConcreteModel,
+        biobjective model with model.objective1 and model.objective2.
+    :return: pyo.ConcreteModel
+    """
+    ld_model = pyo.ConcreteModel(name="LineDetector")
+    ld_model.first = model.clone()
+    ld_model.second = model.clone()
+    for obj in ld_model.component_data_objects(pyo.Objective):
+        obj.deactivate()
+
+    ld_model.shared = pyo.ConstraintList()
+    for var, other in zip(
+        ld_model.first.component_data_objects(pyo.Var),
+        ld_model.second.component_data_objects(pyo.Var),
+    ):
+        if not var.is_continuous():
+            ld_model.shared.add(var == other)
+
+    ld_model.gamma = pyo.Var(domain=pyo.NonNegativeReals)
+    ld_model.dummy_obj = pyo.Objective(expr=ld_model.gamma)
+
+    ld_model.topleft_x = pyo.Param(mutable=True, initialize=0)
+    ld_model.topleft_y = pyo.Param(mutable=True, initialize=0)
+    ld_model.botright_x = pyo.Param(mutable=True, initialize=0)
+    ld_model.botright_y = pyo.Param(mutable=True, initialize=0)
+
+    first, second = ld_model.first, ld_model.second
+    ld_model.cstr_obj_1_1 = pyo.Constraint(
+        expr=first.objective1.expr <= ld_model.topleft_x + ld_model.gamma
+    )
+    ld_model.cstr_obj_2_1 = pyo.Constraint(
+        expr=first.objective2.expr <= ld_model.topleft_y + ld_model.gamma
+    )
+    ld_model.cstr_obj_1_2 = pyo.Constraint(
+        expr=second.objective1.expr <= ld_model.botright_x + ld_model.gamma
+    )
+    ld_model.cstr_obj_2_2 = pyo.Constraint(
+        expr=second.objective2.expr <= ld_model.botright_y + ld_model.gamma
+    )
+    return ld_model
 
-    if z_cap is None:
-        z_cap = [z1, z2]
-    if model_copy.solutions.solutions:
-        try:
-            z_star = Point(
-                (pyo.value(model_copy.objective1), pyo.value(model_copy.objective2))
-            )
-            if z_star not in z_cap:
-                z_cap.append(z_star)
-            if (
-                pyo.value(model_copy.weighted_obj)
-                < lambda1 * z1[0] + lambda2 * z1[1] - EPS_WS
-            ):
-                logger.debug(
-                    f"{pyo.value(model_copy.weighted_obj)} < {lambda1 * z1[0] + lambda2 * z1[1]}"
-                )
-                logger.debug(
-                    f"{pyo.value(model_copy.weighted_obj)} < {lambda1 * z2[0] + lambda2 * z2[1]}"
-                )
-
-                r1 = Rectangle(z1, z_star)
-                r2 = Rectangle(z_star, z2)
-                z_cap = weighted_sum(model, r1, opt, z_cap=z_cap)
-                z_cap = weighted_sum(model, r2, opt, z_cap=z_cap)
-        except ValueError:
-            logging.warning("Solution not found in weighted sum method.")
 
-    z_cap.sort(key=lambda x: x[0])
-    return z_cap
+def set_triangle(ld_model: pyo.ConcreteModel, triangle):
+    """Set the corners of the triangle in the line detection model."""
+    ld_model.topleft_x.value = triangle.topleft[0]
+    ld_model.topleft_y.value = triangle.topleft[1]
+    ld_model.botright_x.value = triangle.botright[0]
+    ld_model.botright_y.value = triangle.botright[1]
 
 
-def line_detector(model, opt, triangle):
-    model_copy = deepcopy(model)
-    model_copy.name = "LineDetector"
-    model_copy.gamma = pyo.Var(domain=pyo.NonNegativeReals)
-    model_copy.dummy_obj = pyo.Objective(expr=model_copy.gamma)
+def shared_assignment(ld_model: pyo.ConcreteModel, first: dict, second: dict):
+    """
+    Assignment of the integer variables common to two stored solutions of the model, see SolutionStore.
+
+    :param ld_model: pyo.ConcreteModel,
+        line detection model of the model, see line_detection_model.
+    :return: list or None,
+        (integer variable of ld_model.first, value), None if the solutions differ on an integer variable.
+    """
+    assignment = []
+    for var in ld_model.first.component_data_objects(pyo.Var):
+        if var.is_continuous():
+            continue
+        name = var.getname(fully_qualified=True, relative_to=ld_model.first)
+        if name not in first or name not in second:
+            return None
+        value = round(first[name])
+        if value != round(second[name]):
+            return None
+        assignment.append((var, value))
+    return assignment
+
+
+def line_detector(
+    model,
+    opt,
+    triangle,
+    stats: SolveStats = None,
+    ld_model: pyo.ConcreteModel = None,
+    assignment: list = None,
+):
+    """
+    Checks if the corners of the triangle are connected by a line of nondominated points: if an assignment of the
+    integer variables reaches both corners.
+
+    :param ld_model: pyo.ConcreteModel (optional),
+        line detection model of the model, see line_detection_model. Built for the call if not given.
+    :param assignment: list (optional),
+        (integer variable of ld_model.first, value), see shared_assignment. The variables are fixed, leaving an LP,
+        and the MIP is only solved if the corners aren't connected with this assignment.
+    :return: bool
+    """
+    tic = time.perf_counter()
+    if ld_model is None:
+        ld_model = line_detection_model(model)
+    set_triangle(ld_model, triangle)
+    if isinstance(opt, PersistentSolver):
+        # the persistent interface doesn't follow the parameters in the constraints
+        for cstr in (
+            ld_model.cstr_obj_1_1,
+            ld_model.cstr_obj_2_1,
+            ld_model.cstr_obj_1_2,
+            ld_model.cstr_obj_2_2,
+        ):
+            opt.remove_constraint(cstr)
+            opt.add_constraint(cstr)
+
+    routine = "line_detector"
+    if assignment:
+        routine = "line_detector_lp"
+        _fix(opt, assignment)
+    logger.info("Solving the line detector model.")
+    build_time = time.perf_counter() - tic
+    tic = time.perf_counter()
+    stages = []
+    try:
+        optimal = solve(opt, ld_model, details=stages)
+    finally:
+        if assignment:
+            _fix(opt, [(var, None) for var, _ in assignment])
+    if stats is not None:
+        stats.record(routine, build_time, time.perf_counter() - tic, stages)
+
+    connected = optimal and pyo.value(ld_model.gamma) <= 1e-6
+    logger.debug("Optimal? %s\nConnected? %s", optimal, connected)
+
+    if assignment and not connected:
+        # another assignment of the integer variables may reach both corners
+        return line_detector(model, opt, triangle, stats, ld_model)
+    return connected
 
-    for cstr in model_copy.component_objects(pyo.Constraint):
-        cstr.activate()
 
-    model_copy.cstr_obj_1_1 = pyo.Constraint(
-        expr=model_copy.objective1.expr <= triangle.topleft[0] + model_copy.gamma
-    )
+def _fix(opt, assignment: list):
+    """Fix the variables of assignment to their value, unfix the ones whose value is None."""
+    for var, value in assignment:
+        if value is None:
+            var.unfix()
+        else:
+            var.fix(value)
+        if isinstance(opt, PersistentSolver):
+            opt.update_var(var)
 
-    model_copy.cstr_obj_2_1 = pyo.Constraint(
-        expr=model_copy.objective2.expr <= triangle.topleft[1] + model_copy.gamma
-    )
 
-    model_copy.cstr_obj_1_2 = pyo.Constraint(
-        expr=model_copy.objective1_2.expr <= triangle.botright[0] + model_copy.gamma
-    )
+class BoxSolver:
+    """
+    Solve the subproblems of the balanced box method on a copy of the model made for every call.
 
-    model_copy.cstr_obj_2_2 = pyo.Constraint(
-        expr=model_copy.objective2_2.expr <= triangle.botright[1] + model_copy.gamma
-    )
+    :param model: pyo.ConcreteModel,
+        biobjective model with model.objective1 and model.objective2.
+    :param opt: pyo.SolverFactory,
+        solver for the subproblems.
+    :param warmstart: bool (optional),
+        keep the solutions behind the frontier points and use them as MIP starts.
+    :param lexicographic: bool (optional),
+        solve the lexmins in a single call where the solver allows it, see find_lexmin.
+    :param cache_size: int (optional),
+        number of lexmin regions kept to answer the lexmins they imply, 0 to solve every lexmin, see LexminCache.
+    :param solver_factory: Callable (optional),
+        picklable, returns a new solver instance. Needed to solve the weighted sums in worker processes.
+    :param ws_workers: int (optional),
+        worker processes solving the independent subproblems of a batch concurrently, each with its own model and
+        solver: the rectangles of a weighted sum wave (see explore_weighted_sum) and the triangles of
+        line_detectors. Processes rather than threads, since the solver interfaces redirect the output streams of
+        the whole process while they solve.
+    """
 
-    model_copy.objective1.deactivate()
-    model_copy.objective2.deactivate()
-    model_copy.dummy_obj.activate()
+    def __init__(
+        self,
+        model: pyo.ConcreteModel,
+        opt: pyo.SolverFactory,
+        warmstart=False,
+        lexicographic=False,
+        cache_size=CACHE_SIZE,
+        solver_factory: Callable[[], pyo.SolverFactory] = None,
+        ws_workers=WS_WORKERS,
+    ):
+        self.model = model
+        self.opt = opt
+        self.stats = SolveStats()
+        self.solutions = SolutionStore() if warmstart else None
+        self.lexicographic = lexicographic
+        self.cache = LexminCache(cache_size) if cache_size > 0 else None
+        # frontier of the search, read by the cache, see LexminCache.lookup
+        self.frontier = None
+        self.solver_factory = solver_factory
+        self.ws_workers = ws_workers if solver_factory is not None else 1
+        self._pool = None
+        self.ld_model = None
+        # connected flags of the triangles checked ahead, see prefetch_line_detectors
+        self._connected = {}
+
+    @classmethod
+    def from_factory(
+        cls,
+        model: pyo.ConcreteModel,
+        solver_factory: Callable[[], pyo.SolverFactory],
+        warmstart=False,
+    ) -> "BoxSolver":
+        """Solver of a weighted sum worker process."""
+        return cls(model, solver_factory(), warmstart, cache_size=0, ws_workers=1)
+
+    def find_lexmin(
+        self, objective_order: tuple, shape: Shape = Rectangle(), verbose=False
+    ) -> Point:
+        """
+        Finds the lexmin of the model in the given shape, from the cache if the regions solved so far or the frontier
+        imply it.
+
+        :raise ValueError: if the shape has no feasible point.
+        """
+        if self.cache is None:
+            return self._find_lexmin(objective_order, shape, verbose)
+
+        frontier_hits = self.cache.frontier_hits
+        known, point = self.cache.lookup(objective_order, shape, self.frontier)
+        if known:
+            if point is None:
+                self.stats.count("lexmin cache infeasible hit")
+                raise ValueError("Solution not found.")
+            if self.cache.frontier_hits > frontier_hits:
+                self.stats.count("lexmin frontier hit")
+            else:
+                self.stats.count("lexmin cache hit")
+            return point
 
-    logger.info(f"Solving the line detector model.")
-    res = opt.solve(model_copy)
+        try:
+            point = self._find_lexmin(objective_order, shape, verbose)
+        except ValueError:
+            # only a proven infeasibility is cached, not a solve stopped early
+            if self._proven_infeasible():
+                self.cache.add(objective_order, shape)
+            raise
+        self.cache.add(objective_order, shape, point)
+        return point
+
+    def _proven_infeasible(self) -> bool:
+        """Whether the last lexmin solved stopped on an infeasible first stage."""
+        if not self.stats.records:
+            return False
+        routine, _, _, stages = self.stats.records[-1]
+        return (
+            routine == "find_lexmin"
+            and bool(stages)
+            and stages[0]["outcome"] == "infeasible"
+        )
 
-    connected = (
-        res.Solver.Termination_condition == "optimal"
-        and pyo.value(model_copy.gamma) <= 1e-6
-    )
-    logger.debug(
-        f"Solver status: {res.Solver.Termination_condition}\n" f"Connected? {connected}"
-    )
+    def _find_lexmin(
+        self, objective_order: tuple, shape: Shape, verbose=False
+    ) -> Point:
+        return find_lexmin(
+            self.model,
+            objective_order,
+            self.opt,
+            shape,
+            verbose,
+            stats=self.stats,
+            solutions=self.solutions,
+            lexicographic=self.lexicographic,
+        )
 
-    return connected
+    def weighted_sum(self, rectangle: Rectangle, z_cap=None) -> list:
+        """
+        Finds the supported points of the model in the rectangle, see explore_weighted_sum.
+
+        :param rectangle: Rectangle,
+            rectangle in which the supported points are searched.
+        :param z_cap: list (optional),
+            points found so far.
+        :return: list[Point] sorted on the first objective.
+        """
+        return explore_weighted_sum(rectangle, self._solve_rectangles, z_cap)
+
+    def weighted_sum_step(self, rectangle: Rectangle) -> tuple:
+        return weighted_sum_step(
+            self.model, rectangle, self.opt, self.stats, self.solutions
+        )
+
+    def _solve_rectangles(self, rectangles: list) -> list:
+        if self.ws_workers <= 1 or len(rectangles) == 1:
+            return [self.weighted_sum_step(rectangle) for rectangle in rectangles]
+
+        starts = self.solutions.solutions if self.solutions is not None else None
+        results = []
+        for result, found, stats in self._get_pool().map(
+            _ws_task, rectangles, repeat(starts)
+        ):
+            self.stats.merge(stats)
+            if self.solutions is not None:
+                self.solutions.solutions.update(found)
+            results.append(result)
+        return results
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.ws_workers,
+                initializer=_init_pool_worker,
+                initargs=(
+                    type(self),
+                    self._worker_model(),
+                    self.solver_factory,
+                    self.solutions is not None,
+                ),
+            )
+        return self._pool
+
+    def _worker_model(self) -> pyo.ConcreteModel:
+        """Model the worker processes build their solver on."""
+        return self.model
+
+    def close(self):
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def line_detector(self, triangle: Triangle) -> bool:
+        """
+        Checks if the corners of the triangle are connected by a line of nondominated points, see
+        lexmin.line_detector. The flag of a triangle checked ahead is taken from prefetch_line_detectors.
+
+        :param triangle: Triangle
+        :return: bool
+        """
+        key = (triangle.topleft, triangle.botright)
+        if key in self._connected:
+            self.stats.count("line detector prefetched")
+            return self._connected.pop(key)
+        return self._line_detector(triangle)
+
+    def line_detectors(self, triangles: list) -> list:
+        """
+        Checks a batch of triangles, see line_detector. A triangle whose corners come from stored solutions with the
+        same assignment of the integer variables (warmstart) is checked on the LP left once they are fixed; the
+        others are checked on the worker processes, see ws_workers.
+
+        :param triangles: list[Triangle]
+        :return: list[bool],
+            connected flag of each triangle.
+        """
+        flags = [None] * len(triangles)
+        rest = []
+        for i, triangle in enumerate(triangles):
+            assignment = self._shared_assignment(triangle)
+            if assignment is None:
+                rest.append(i)
+            else:
+                flags[i] = self._line_detector(triangle, assignment)
+
+        if self.ws_workers > 1 and len(rest) > 1:
+            results = self._get_pool().map(_ld_task, [triangles[i] for i in rest])
+            for i, (connected, stats) in zip(rest, results):
+                self.stats.merge(stats)
+                flags[i] = connected
+        else:
+            for i in rest:
+                flags[i] = self._line_detector(triangles[i])
+        return flags
+
+    def prefetch_line_detectors(self, triangles: list):
+        """Check a batch of triangles ahead, for the next calls to line_detector on them."""
+        keys = [(triangle.topleft, triangle.botright) for triangle in triangles]
+        pending = [
+            (key, triangle)
+            for key, triangle in zip(keys, triangles)
+            if key not in self._connected
+        ]
+        flags = self.line_detectors([triangle for _, triangle in pending])
+        for (key, _), connected in zip(pending, flags):
+            self._connected[key] = connected
+
+    def _shared_assignment(self, triangle: Triangle):
+        if self.solutions is None:
+            return None
+        first = self.solutions.solutions.get(triangle.topleft)
+        second = self.solutions.solutions.get(triangle.botright)
+        if first is None or second is None:
+            return None
+        ld_model, _ = self._line_detection()
+        return shared_assignment(ld_model, first, second)
+
+    def _line_detection(self) -> tuple:
+        """Line detection model, built on the first call, and its solver."""
+        if self.ld_model is None:
+            tic = time.perf_counter()
+            self.ld_model = line_detection_model(self.model)
+            self.stats.record("setup", time.perf_counter() - tic, 0.0)
+        return self.ld_model, self.opt
+
+    def _line_detector(self, triangle: Triangle, assignment: list = None) -> bool:
+        ld_model, ld_opt = self._line_detection()
+        return line_detector(
+            self.model, ld_opt, triangle, self.stats, ld_model, assignment
+        )
@@ -0,0 +1,304 @@
+from collections.abc import Mapping
+
+import numpy as np
+
+from frontier import Frontier
+from shapes.Point import Point
+
+# Rows of candidate points compared to a frontier at once in _epsilon, bounding the memory used.
+CHUNK_SIZE = 4096
+_NUMBER_START = set("+-.0123456789")
+
+
+def as_array(frontier) -> np.ndarray:
+    """
+    Frontier as an array of rows (x, y, connected flag), sorted on the first objective. Without flags the points
+    aren't connected, and the last point never is.
+
+    :param frontier: Frontier, dict or array-like,
+        Frontier or dict point -> connected flag, or sequence of (x, y) or (x, y, flag).
+    :return: np.ndarray,
+        shape (n, 3).
+    """
+    if isinstance(frontier, Mapping):
+        frontier = [(point[0], point[1], flag) for point, flag in frontier.items()]
+    if not len(frontier):
+        return np.empty((0, 3))
+    array = np.asarray(frontier, dtype=float).reshape(len(frontier), -1)
+    if array.shape[1] == 2:
+        array = np.column_stack([array, np.zeros(len(array))])
+    array = array[np.lexsort((array[:, 1], array[:, 0]))]
+    if len(array):
+        array[-1, 2] = 0
+    return array
+
+
+def read_frontier(path, sense="min") -> np.ndarray:
+    """
+    Read a frontier file: lines of two objective values and an optional connected flag, up to the footer.
+
+    :param sense: str (optional),
+        "max" if the values are the ones of maximized objectives, negated to compare them as minimization ones.
+    :return: np.ndarray,
+        see as_array.
+    """
+    with open(path) as ffile:
+        lines = ffile.read().splitlines()
+    # the lines of values are the ones starting as a number, between the header and the footer
+    start = 0
+    while start < len(lines) and not _numeric(lines[start]):
+        start += 1
+    stop = start
+    while stop < len(lines) and (_numeric(lines[stop]) or not lines[stop].strip()):
+        stop += 1
+
+    if not any(line.strip() for line in lines[start:stop]):
+        array = np.empty((0, 3))
+    else:
+        try:
+            array = np.loadtxt(lines[start:stop], ndmin=2)[:, :3]
+        except ValueError:
+            array = np.empty((0, 0))
+        if array.shape[1] < 2:
+            # lines of different lengths
+            array = _parse_rows(lines)
+    if array.shape[1] == 2:
+        array = np.column_stack([array, np.zeros(len(array))])
+    if sense == "max":
+        array[:, :2] *= -1
+    return as_array(array)
+
+
+def _numeric(line: str) -> bool:
+    return line.lstrip()[:1] in _NUMBER_START
+
+
+def _parse_rows(lines: list) -> np.ndarray:
+    """Rows of values of the lines of a frontier file of irregular layout, one at a time."""
+    rows = []
+    for line in lines:
+        values = line.split()
+        try:
+            row = [float(value) for value in values[:3]]
+        except ValueError:
+            if rows:
+                break
+            continue
+        if len(row) < 2:
+            continue
+        rows.append(row + [0.0] * (3 - len(row)))
+    return np.array(rows, dtype=float).reshape(-1, 3)
+
+
+def _nondominated(array: np.ndarray) -> np.ndarray:
+    """Rows of a sorted frontier array not dominated by the ones before them."""
+    best = np.minimum.accumulate(np.concatenate([[np.inf], array[:-1, 1]]))
+    return array[array[:, 1] < best]
+
+
+def hypervolume(frontier, reference_point) -> float:
+    """
+    Area dominated by the frontier and dominating the reference point, under the connected segments and under the
+    staircase of the other points. The points must dominate the reference point, dominated points are ignored.
+
+    :param frontier: see as_array.
+    :param reference_point: tuple,
+        (x, y).
+    :return: float
+    """
+    array = _nondominated(as_array(frontier))
+    if not len(array):
+        return 0.0
+    ref_x, ref_y = reference_point
+    x, y, flags = array.T
+    next_x = np.append(x[1:], ref_x)
+    next_y = np.append(y[1:], y[-1])
+    height = np.where(flags == 1, ref_y - (y + next_y) / 2, ref_y - y)
+    return float(np.sum((next_x - x) * height))
+
+
+def _epsilon(candidates: np.ndarray, array: np.ndarray) -> np.ndarray:
+    """
+    Smallest additive epsilon for which the frontier array, moved by -epsilon on both objectives, weakly dominates
+    each candidate point: the minimum over its points and connected segments of max(a_x - c_x, a_y - c_y).
+    """
+    if not len(array):
+        return np.full(len(candidates), np.inf)
+
+    points = array[:, :2]
+    segments = np.flatnonzero(array[:-1, 2] == 1)
+    start, delta = points[segments], points[segments + 1] - points[segments]
+    # the first difference grows and the second decreases along a segment, they are equal at t
+    span = delta[:, 0] - delta[:, 1]
+    start, delta, span = start[span > 0], delta[span > 0], span[span > 0]
+
+    result = np.empty(len(candidates))
+    for i in range(0, len(candidates), CHUNK_SIZE):
+        chunk = candidates[i : i + CHUNK_SIZE, None, :]
+        eps = np.max(points[None] - chunk, axis=2).min(axis=1)
+        if len(span):
+            diff = start[None] - chunk
+            t = np.clip((diff[..., 1] - diff[..., 0]) / span, 0, 1)
+            along = diff + t[..., None] * delta[None]
+            eps = np.minimum(eps, np.max(along, axis=2).min(axis=1))
+        result[i : i + CHUNK_SIZE] = eps
+    return result
+
+
+def _vertices(array: np.ndarray) -> np.ndarray:
+    """Corners of the boundary of the region dominated by a frontier: its points and the corners of its steps."""
+    steps = np.flatnonzero(array[:-1, 2] == 0)
+    corners = np.column_stack([array[steps + 1, 0], array[steps, 1]])
+    return np.concatenate([array[:, :2], corners])
+
+
+def _candidates(reference: np.ndarray, vertices: np.ndarray) -> np.ndarray:
+    """
+    Points of the reference frontier where the epsilon to a frontier with the given vertices can be the largest:
+    the reference points, and the points of the connected reference segments on the diagonal of a vertex. Between
+    two of them the epsilon is linear along a segment.
+    """
+    if len(reference) < 2 or not len(vertices):
+        return reference[:, :2]
+    diagonal = reference[:, 0] - reference[:, 1]
+    vertex_diagonal = vertices[:, 0] - vertices[:, 1]
+    k = np.searchsorted(diagonal, vertex_diagonal, side="right") - 1
+    inside = (k >= 0) & (k < len(reference) - 1)
+    k, vertex_diagonal = k[inside], vertex_diagonal[inside]
+    connected = (reference[k, 2] == 1) & (diagonal[k + 1] > diagonal[k])
+    k, vertex_diagonal = k[connected], vertex_diagonal[connected]
+    t = (vertex_diagonal - diagonal[k]) / (diagonal[k + 1] - diagonal[k])
+    breakpoints = reference[k, :2] + t[:, None] * (
+        reference[k + 1, :2] - reference[k, :2]
+    )
+    return np.concatenate([reference[:, :2], breakpoints])
+
+
+def epsilons(approximation, reference) -> np.ndarray:
+    """
+    Additive epsilon needed by the approximation to weakly dominate each point of the reference frontier.
+
+    :param approximation: see as_array.
+    :param reference: see as_array.
+    :return: np.ndarray,
+        an epsilon per reference point, in the order of as_array(reference).
+    """
+    return _epsilon(as_array(reference)[:, :2], as_array(approximation))
+
+
+def additive_epsilon(approximation, reference) -> float:
+    """
+    Additive epsilon indicator: smallest epsilon such that the approximation, moved by -epsilon on both objectives,
+    weakly dominates the whole reference frontier, connected segments included. Both frontiers are of a
+    minimization problem, the segments of the approximation dominate as much as their points.
+
+    :param approximation: see as_array.
+    :param reference: see as_array.
+    :return: float,
+        0 or less if the approximation weakly dominates the reference.
+    """
+    array, reference = as_array(approximation), as_array(reference)
+    if not len(reference):
+        return -np.inf
+    candidates = _candidates(reference, _vertices(array))
+    return float(_epsilon(candidates, array).max())
+
+
+def coverage(approximation, reference, tol=1e-6) -> float:
+    """
+    Fraction of the reference points weakly dominated by the approximation, its points or connected segments, within
+    tol on both objectives.
+
+    :param approximation: see as_array.
+    :param reference: see as_array.
+    :param tol: float (optional),
+        tolerance on the objectives.
+    :return: float
+    """
+    reference = as_array(reference)
+    if not len(reference):
+        return 1.0
+    return float(np.mean(epsilons(approximation, reference) <= tol))
+
+
+class IncrementalIndicators:
+    """
+    Additive epsilon indicator and coverage of a Frontier being built, against a reference frontier, updated with
+    each point set in it instead of recomputed. The hypervolume is kept by the Frontier itself.
+
+    As long as the region dominated by the frontier grows, the epsilon of each candidate point of the reference
+    (see _candidates) is the minimum of its epsilon to the elements new with each point. When a point may cut a
+    connected segment off the frontier, being set as not connected in its middle or taking the place of a
+    connected point, or a flag goes back from connected, the indicators are recomputed.
+
+    :param reference: see as_array,
+        reference frontier.
+    :param tol: float (optional),
+        tolerance of the coverage.
+    """
+
+    def __init__(self, reference, tol=1e-6):
+        self.reference = as_array(reference)
+        self.tol = tol
+        self._flags = {}
+        self._dominated = 0
+        self._candidates = self.reference[:, :2]
+        self._eps = np.full(len(self._candidates), np.inf)
+
+    @property
+    def epsilon(self) -> float:
+        return float(self._eps.max()) if len(self._eps) else -np.inf
+
+    @property
+    def coverage(self) -> float:
+        if not len(self.reference):
+            return 1.0
+        return float(np.mean(self._eps[: len(self.reference)] <= self.tol))
+
+    def reset(self, frontier: Frontier):
+        """Recompute the indicators of the whole frontier."""
+        array = as_array(frontier)
+        self._flags = {point.rounded_data: frontier[point] for point in frontier}
+        self._dominated = frontier.dominated
+        self._candidates = _candidates(self.reference, _vertices(array))
+        self._eps = _epsilon(self._candidates, array)
+
+    def update(self, frontier: Frontier, point):
+        """
+        Account for a point just set in the frontier.
+
+        :param frontier: Frontier,
+            frontier the point was set in.
+        :param point: Point or tuple,
+            point set.
+        """
+        removed = frontier.dominated > self._dominated
+        self._dominated = frontier.dominated
+        if point not in frontier:
+            return
+
+        key = Point(point).rounded_data
+        flag = frontier[point]
+        previous, following = frontier.neighbours(point)
+        cut = (
+            flag == 0
+            and following is not None
+            and (removed or previous is not None and frontier[previous] == 1)
+        )
+        if cut or flag < self._flags.get(key, 0):
+            self.reset(frontier)
+            return
+        self._flags[key] = flag
+
+        rows = [(point[0], point[1], flag)]
+        if previous is not None:
+            rows.insert(0, (previous[0], previous[1], frontier[previous]))
+        if following is not None:
+            rows.append((following[0], following[1], 0))
+        local = as_array(rows)
+
+        self._eps = np.minimum(self._eps, _epsilon(self._candidates, local))
+        new = _candidates(self.reference, _vertices(local))[len(self.reference) :]
+        if len(new):
+            self._candidates = np.concatenate([self._candidates, new])
+            self._eps = np.concatenate([self._eps, _epsilon(new, as_array(frontier))])
@@ -0,0 +1,237 @@
+import importlib
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import backends
+from boxqueue import BoxQueue
+from budget import Budget
+from checkpoint import Checkpoint, restore
+from frontier import Frontier
+from tracing import Tracer
+from shapes.rectangle import Rectangle
+from utils import SolveStats, get_logger
+from warmstart import SolutionStore
+
+logger = get_logger(__name__)
+
+# State of a worker process: the search module and the box solver built once in _init_worker.
+_worker = {}
+
+
+def _init_worker(
+    module_name, problem, instance_path, persistent, warmstart, lexicographic
+):
+    module = importlib.import_module(module_name)
+    model = module.load_model(problem, instance_path)
+    _worker["module"] = module
+    _worker["solver"] = module.make_box_solver(
+        model, persistent, warmstart, lexicographic
+    )
+
+
+def _run(task, *args, starts=None, deadline=None):
+    """
+    Run a task on the worker's solver, returning its result with the solutions found, the solve stats and the wall
+    time of the task. Its solves stop at deadline, see backends.set_deadline.
+    """
+    backends.set_deadline(deadline)
+    tic = time.perf_counter()
+    solver = _worker["solver"]
+    solver.stats = SolveStats()
+    if solver.solutions is not None and starts:
+        solver.solutions.solutions.update(starts)
+
+    result = task(solver, *args)
+
+    found = {}
+    if solver.solutions is not None:
+        points = [result] if task is _lexmin else [p for p, _ in result[0]]
+        found = {
+            p: solver.solutions.solutions[p] for p in points if p in solver.solutions
+        }
+    return result, found, solver.stats, time.perf_counter() - tic
+
+
+def _lexmin(solver, objective_order):
+    return solver.find_lexmin(objective_order)
+
+
+def _process(solver, shape, splitting_direction):
+    return _worker["module"].process_shape(solver, shape, splitting_direction)
+
+
+def explore_parallel(
+    module_name: str,
+    problem: str,
+    instance_path: Path,
+    workers: int,
+    persistent=False,
+    warmstart=False,
+    lexicographic=False,
+    budget: Budget = None,
+    tracer: Tracer = None,
+    checkpoint: Checkpoint = None,
+    state: dict = None,
+    writer=None,
+):
+    """
+    Run the balanced box method with a pool of worker processes, each holding its own model and solver.
+
+    The coordinator keeps the queue of shapes and the frontier: it hands the largest shapes to the idle workers
+    and merges their results, the latest result setting the connected flag of a point as in the serial loop.
+    Since the exploration of a shape only depends on the shape, a search that completes finds the frontier of the
+    serial loop, points and connected flags, see tests/test_parallel.py. A search stopped early by the budget
+    explores the shapes in another order and may not.
+
+    :param module_name: str,
+        module of the search (BOIP or BOMIP) exposing load_model, make_box_solver and process_shape.
+    :param problem: str,
+        name of the problem.
+    :param instance_path: Path,
+        path of the instance.
+    :param workers: int,
+        number of worker processes.
+    :param persistent: bool (optional),
+        use a PersistentBoxSolver in the workers.
+    :param warmstart: bool (optional),
+        use the solutions behind the frontier points as MIP starts.
+    :param lexicographic: bool (optional),
+        solve each lexmin in a single call where the solver allows it.
+    :param budget: Budget (optional),
+        limits of the search: once reached no more shapes are handed to the workers, the running ones are
+        completed. At most budget.max_iterations shapes are explored.
+    :param tracer: Tracer (optional),
+        where to trace the tasks, one line per shape explored.
+    :param checkpoint: Checkpoint (optional),
+        where to save the state of the search, with the shapes being explored.
+    :param state: dict (optional),
+        state of a search to go on with, see Checkpoint.load.
+    :param writer: printer.StreamWriter (optional),
+        writer logging the changes of the frontier as the workers find its points.
+    :return: tuple,
+        Frontier, number of iterations, SolveStats of all the workers and why the search stopped early, None if
+        it didn't.
+    """
+    budget = budget or Budget()
+    max_iterations = budget.max_iterations
+    stats = SolveStats()
+    store = SolutionStore() if warmstart else None
+    tracer = tracer or Tracer()
+    checkpoint = checkpoint or Checkpoint()
+
+    def collect(future, iteration=0, shape=None, direction=None):
+        result, found, task_stats, elapsed = future.result()
+        stats.merge(task_stats)
+        if store is not None:
+            store.solutions.update(found)
+        if shape is None:
+            tracer.trace(iteration, None, None, task_stats.records, elapsed)
+        else:
+            tracer.trace(
+                iteration, shape, direction, task_stats.records, elapsed, *result
+            )
+        return result
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(
+            module_name,
+            problem,
+            instance_path,
+            persistent,
+            warmstart,
+            lexicographic,
+        ),
+    ) as executor:
+        if state is None:
+            top = executor.submit(_run, _lexmin, (1, 2))
+            bottom = executor.submit(_run, _lexmin, (2, 1))
+            z_T, z_B = collect(top), collect(bottom)
+            logger.debug("Found z_T: %s and z_B: %s.", z_T, z_B)
+
+            solutions_dict = Frontier({z_T: 0, z_B: 0})
+            queue = BoxQueue()
+            queue.push(Rectangle(z_T, z_B))
+            processed = 0
+        else:
+            stats = state["stats"]
+            solutions_dict, queue = restore(state, store)
+            processed = state["iteration"] - 1
+        if writer is not None:
+            writer.watch(solutions_dict)
+        budget.start(solutions_dict)
+        deadline = budget.deadline()
+        running = {}
+
+        stopped = None
+        while queue or running:
+            if stopped is None:
+                stopped = budget.check(solutions_dict, queue, stats, processed)
+            while (
+                stopped is None
+                and queue
+                and len(running) < workers
+                and (
+                    max_iterations is None or processed + len(running) < max_iterations
+                )
+            ):
+                shape, direction = queue.pop()
+                starts = {}
+                if store is not None:
+                    for corner in (shape.topleft, shape.botright):
+                        if corner in store:
+                            starts[corner] = store.solutions[corner]
+                future = executor.submit(
+                    _run, _process, shape, direction, starts=starts, deadline=deadline
+                )
+                running[future] = shape, direction
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                shape, direction = running.pop(future)
+                processed += 1
+                points, shapes = collect(future, processed, shape, direction)
+                logger.info("Iteration: %s", processed, extra={"iteration": processed})
+
+                # the latest result sets the flag, as in the serial loop of process_shape's module
+                for point, connected in points:
+                    dominated = solutions_dict.dominated
+                    solutions_dict[point] = connected
+                    if solutions_dict.dominated > dominated and point in solutions_dict:
+                        queue.prune(point)
+                for shape, direction in shapes:
+                    queue.push(shape, direction)
+
+            if checkpoint.due():
+                checkpoint.save(
+                    solutions_dict,
+                    queue,
+                    processed + 1,
+                    stats,
+                    store,
+                    time.perf_counter() - budget.tic,
+                    running=list(running.values()),
+                )
+
+    if stopped is not None:
+        checkpoint.save(
+            solutions_dict,
+            queue,
+            processed + 1,
+            stats,
+            store,
+            time.perf_counter() - budget.tic,
+        )
+    logger.info(
+        "%s duplicate shapes skipped, %s dominated shapes dropped.",
+        queue.duplicates,
+        queue.pruned,
+    )
+    if stopped is not None:
+        logger.warning("Search stopped early: %s.", stopped)
+    return solutions_dict, processed + 1, stats, stopped
@@ -1,6 +1,12 @@
+import os
+from hashlib import sha256
 from pathlib import Path
 import numpy as np
 import pyomo.environ as pyo
+from pyomo.core.expr.numeric_expr import LinearExpression
+
+# Directory of the compiled .npz instances, an empty string disables the cache.
+CACHE_PATH = os.getenv("INSTANCE_CACHE", default="./.instance_cache")
 
 
 def split_numeric(line: str, ntype=int) -> list[int]:
@@ -19,7 +25,133 @@ def to_array(lines: list[str], shape=None, ntype=int) -> np.array:
     return as_array
 
 
-class Bomip2dkp:
+def read_array(line: str, ntype=int) -> np.array:
+    """Parse a line of numbers as a 1-d array."""
+    return np.array(line.split(), dtype=ntype)
+
+
+def read_matrix(lines: list[str], ntype=int) -> np.array:
+    """Parse each line of numbers as a row of a 2-d array."""
+    return np.array([line.split() for line in lines], dtype=ntype)
+
+
+def load_instance(instance_path: Path, parser, cache_path=CACHE_PATH) -> dict:
+    """
+    Read the arrays of an instance, from the compiled cache if the file was already parsed.
+
+    The cache holds one .npz file per parser and content hash of the instance, so an edited instance is parsed again.
+
+    :param instance_path: Path,
+        path for the instance.
+    :param parser: Callable,
+        turns the lines of the file into a dict of arrays.
+    :param cache_path: str (optional),
+        directory of the cache, an empty string disables it.
+    :return: dict,
+        name -> np.array.
+    """
+    with open(instance_path, "rb") as bfile:
+        raw = bfile.read()
+
+    if cache_path:
+        key = sha256(raw).hexdigest()
+        cache_file = Path(cache_path) / f"{parser.__qualname__}-{key}.npz"
+        if cache_file.exists():
+            with np.load(cache_file) as data:
+                return {name: data[name] for name in data.files}
+
+    arrays = parser(raw.decode().splitlines())
+
+    if cache_path:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "wb") as cfile:
+            np.savez(cfile, **arrays)
+        os.replace(tmp_file, cache_file)
+    return arrays
+
+
+def linear_expression(
+    coeffs: np.array, variables: pyo.Var, extra_coeffs=(), extra_vars=()
+) -> LinearExpression:
+    """
+    Build sum(coeffs[i] * variables[i]) as a single linear expression, skipping the zero coefficients.
+
+    :param coeffs: np.array,
+        coefficients of the variables, variables[i] gets coeffs[i].
+    :param variables: pyo.Var,
+        variable indexed by 0, ..., len(coeffs) - 1.
+    :param extra_coeffs: list (optional),
+        coefficients of additional terms.
+    :param extra_vars: list (optional),
+        variables of additional terms.
+    :return: LinearExpression
+    """
+    nonzero = np.flatnonzero(coeffs)
+    return LinearExpression(
+        constant=0,
+        linear_coefs=coeffs[nonzero].tolist() + list(extra_coeffs),
+        linear_vars=[variables[i] for i in nonzero.tolist()] + list(extra_vars),
+    )
+
+
+class BiobjectiveIP(pyo.ConcreteModel):
+    def __init__(
+        self,
+        c1: np.array,
+        c2: np.array,
+        a: np.array,
+        lower: np.array = None,
+        upper: np.array = None,
+    ):
+        """
+        Biobjective integer program with binary variables, built from arrays:
+
+            min (c1 x, c2 x)  s.t.  lower <= a x <= upper,  x binary.
+
+        The model is the same for every solver backend: the constraints and objectives are single linear
+        expressions of the nonzero coefficients, built without rules over Params.
+
+        :param c1: np.array,
+            coefficients of the variables in the first objective.
+        :param c2: np.array,
+            coefficients of the variables in the second objective.
+        :param a: np.array,
+            (number of constraints, number of variables) matrix of the coefficients of the constraints.
+        :param lower: np.array (optional),
+            lower bounds of the constraints, -inf for none, none by default.
+        :param upper: np.array (optional),
+            upper bounds of the constraints, inf for none, none by default.
+        """
+        super().__init__()
+        self.c1 = np.asarray(c1)
+        self.c2 = np.asarray(c2)
+        self.a = np.asarray(a).reshape(-1, len(self.c1))
+        rows = len(self.a)
+        self.lower = np.full(rows, -np.inf) if lower is None else np.asarray(lower)
+        self.upper = np.full(rows, np.inf) if upper is None else np.asarray(upper)
+
+        self.variables_idx = pyo.RangeSet(0, len(self.c1) - 1)
+        self.x = pyo.Var(self.variables_idx, domain=pyo.Boolean)
+
+        def cstr_rule(model, i):
+            lhs = linear_expression(model.a[i], model.x)
+            lower, upper = model.lower[i], model.upper[i]
+            if lower == upper:
+                return lhs == upper.item()
+            return (
+                lower.item() if np.isfinite(lower) else None,
+                lhs,
+                upper.item() if np.isfinite(upper) else None,
+            )
+
+        self.cstr = pyo.Constraint(range(rows), rule=cstr_rule)
+
+        self.objective1 = pyo.Objective(expr=linear_expression(self.c1, self.x))
+        self.objective2 = pyo.Objective(expr=linear_expression(self.c2, self.x))
+
+
+class Bomip2dkp(BiobjectiveIP):
     def __init__(
         self,
         num_binaries: int,
@@ -31,7 +163,9 @@ class Bomip2dkp:
         weights_2nd_cstr: list[int],
     ):
         """
-        Class for representing a Biobjective Knapsack problem.
+        Biobjective two dimensional knapsack problem. The profits are maximized, the objectives of the model are
+        their opposites.
+
         :param num_binaries: int,
             number of variables.
         :param rhs_1st_cstr: int,
@@ -47,47 +181,24 @@ class Bomip2dkp:
         :param weights_2nd_cstr: list[int],
             list of all the second constraint coefficients.
         """
-        self.num_binaries = num_binaries
-        self.rhs_1st_cstr = rhs_1st_cstr
-        self.rhs_2nd_cstr = rhs_2nd_cstr
-        self.objective1 = objective1
-        self.objective2 = objective2
-        self.weights_1st_cstr = weights_1st_cstr
-        self.weights_2nd_cstr = weights_2nd_cstr
-
-    def to_pyomo(self) -> pyo.ConcreteModel:
-        """
-        Write the problem as pyomo model.
-        :return: pyo.ConcreteModel
-        """
-        model = pyo.ConcreteModel()
-
-        model.variables_idx = pyo.RangeSet(0, self.num_binaries - 1)
-
-        model.x = pyo.Var(model.variables_idx, domain=pyo.Boolean)
-
-        model.cstr1coeff = pyo.Param(
-            model.variables_idx, initialize=self.weights_1st_cstr
-        )
-        model.rhs1 = pyo.Param(initialize=self.rhs_1st_cstr)
-        model.cstr2coeff = pyo.Param(
-            model.variables_idx, initialize=self.weights_2nd_cstr
+        super().__init__(
+            -np.asarray(objective1)[:num_binaries],
+            -np.asarray(objective2)[:num_binaries],
+            np.stack([weights_1st_cstr, weights_2nd_cstr])[:, :num_binaries],
+            upper=np.array([rhs_1st_cstr, rhs_2nd_cstr]),
         )
-        model.rhs2 = pyo.Param(initialize=self.rhs_2nd_cstr)
-        model.obj1coeff = pyo.Param(model.variables_idx, initialize=self.objective1)
-        model.obj2coeff = pyo.Param(model.variables_idx, initialize=self.objective2)
 
-        model.constraint1 = pyo.Constraint(
-            expr=pyo.summation(model.cstr1coeff, model.x) <= model.rhs1
-        )
-        model.constraint2 = pyo.Constraint(
-            expr=pyo.summation(model.cstr2coeff, model.x) <= model.rhs2
-        )
-
-        model.objective1 = pyo.Objective(expr=pyo.summation(model.obj1coeff, model.x))
-        model.objective2 = pyo.Objective(expr=pyo.summation(model.obj2coeff, model.x))
-
-        return model
+    @staticmethod
+    def parse(content: list[str]) -> dict:
+        return {
+            "num_binaries": int(content[0]),
+            "rhs_1st_cstr": int(content[1]),
+            "rhs_2nd_cstr": int(content[2]),
+            "objective1": read_array(content[3]),
+            "objective2": read_array(content[4]),
+            "weights_1st_cstr": read_array(content[5]),
+            "weights_2nd_cstr": read_array(content[6]),
+        }
 
     @classmethod
     def from_file(cls, instance_path: Path):
@@ -96,63 +207,64 @@ class Bomip2dkp:
 
         :param instance_path: Path,
             path for the instance.
-        :return: Bomip2dpk
+        :return: Bomip2dkp
         """
-        with open(instance_path) as tfile:
-            content = tfile.readlines()
-
-        num_binaries = int(content[0])
-        rhs_1st_cstr = int(content[1])
-        rhs_2nd_cstr = int(content[2])
-        objective1 = split_numeric(content[3])
-        objective2 = split_numeric(content[4])
-        weights_1st_cstr = split_numeric(content[5])
-        weights_2nd_cstr = split_numeric(content[6])
+        data = load_instance(instance_path, cls.parse)
 
         return cls(
-            num_binaries,
-            rhs_1st_cstr,
-            rhs_2nd_cstr,
-            objective1,
-            objective2,
-            weights_1st_cstr,
-            weights_2nd_cstr,
+            int(data["num_binaries"]),
+            int(data["rhs_1st_cstr"]),
+            int(data["rhs_2nd_cstr"]),
+            data["objective1"],
+            data["objective2"],
+            data["weights_1st_cstr"],
+            data["weights_2nd_cstr"],
         )
 
 
-class Bomip2ap(pyo.ConcreteModel):
-    def __init__(self, num_jobs: int, obj1_weights: np.array, obj2_weights: np.array):
-        super().__init__()
-        self.num_jobs = pyo.Param(initialize=num_jobs)
-        self.obj1_weights = pyo.Param(initialize=obj1_weights)
-        self.obj2_weights = pyo.Param(initialize=obj2_weights)
-
-        self.jobs = pyo.RangeSet(0, self.num_jobs - 1)
-        self.x = pyo.Var(self.jobs, self.jobs, within=pyo.Boolean)
+def assignment_matrix(num_jobs: int) -> np.array:
+    """
+    Constraints of an assignment problem on the variables x[i * num_jobs + j]: each i is assigned to one j (the
+    first num_jobs rows), and each j to one i.
+    """
+    identity = np.eye(num_jobs, dtype=int)
+    ones = np.ones((1, num_jobs), dtype=int)
+    return np.concatenate([np.kron(identity, ones), np.kron(ones, identity)])
 
-        def cstr_rule(model, i):
-            return sum(model.x[i, j] for j in model.jobs) == 1
 
-        def cstr_rule2(model, j):
-            return sum(model.x[i, j] for i in model.jobs) == 1
-
-        self.cstr1 = pyo.Constraint(self.jobs, rule=cstr_rule)
-        self.cstr2 = pyo.Constraint(self.jobs, rule=cstr_rule2)
+class Bomip2ap(BiobjectiveIP):
+    def __init__(self, num_jobs: int, obj1_weights: np.array, obj2_weights: np.array):
+        """
+        Biobjective assignment problem, x[i * num_jobs + j] is 1 if i is assigned to j.
 
-        self.objective1 = pyo.Objective(expr=pyo.summation(obj1_weights, self.x))
+        :param obj1_weights: np.array,
+            (num_jobs, num_jobs) costs of the assignments in the first objective.
+        :param obj2_weights: np.array,
+            (num_jobs, num_jobs) costs of the assignments in the second objective.
+        """
+        ones = np.ones(2 * num_jobs)
+        super().__init__(
+            np.asarray(obj1_weights).ravel(),
+            np.asarray(obj2_weights).ravel(),
+            assignment_matrix(num_jobs),
+            lower=ones,
+            upper=ones,
+        )
+        self.num_jobs = num_jobs
 
-        self.objective2 = pyo.Objective(expr=pyo.summation(obj2_weights, self.x))
+    @staticmethod
+    def parse(content: list[str]) -> dict:
+        num_jobs = int(content[0])
+        return {
+            "num_jobs": num_jobs,
+            "obj1": read_array(content[1]).reshape(num_jobs, num_jobs),
+            "obj2": read_array(content[2]).reshape(num_jobs, num_jobs),
+        }
 
     @classmethod
     def from_file(cls, instance_path: Path):
-        with open(instance_path) as tfile:
-            content = tfile.readlines()
-
-        num_jobs = int(content[0])
-        obj1 = to_array(content[1], shape=(num_jobs, num_jobs))
-        obj2 = to_array(content[2], shape=(num_jobs, num_jobs))
-
-        return cls(num_jobs, obj1, obj2)
+        data = load_instance(instance_path, cls.parse)
+        return cls(int(data["num_jobs"]), data["obj1"], data["obj2"])
 
 
 class Bomip2C(pyo.ConcreteModel):
@@ -165,10 +277,16 @@ class Bomip2C(pyo.ConcreteModel):
         f1: list[int],
         c2: list[int],
         f2: list[int],
-        a: dict[tuple[int, int], int],
+        a: np.array,
         a_prime: list[int],
         b: list[int],
     ):
+        """
+        Biobjective mixed integer program of the first problem class.
+
+        :param a: np.array,
+            (num_continuous, m - 1) matrix of the coefficients of the continuous variables in the constraints.
+        """
         super().__init__()
         self.m = pyo.Param(initialize=m)
         self.num_binaries = pyo.Param(initialize=num_binaries)
@@ -179,39 +297,37 @@ class Bomip2C(pyo.ConcreteModel):
         self.nb_to_m_idx = pyo.RangeSet(self.num_binaries + 1, self.m - 2)
         self.zero_to_m_idx = pyo.RangeSet(0, self.m - 2)
 
+        a = np.asarray(a)
         self.c1 = pyo.Param(self.continouos_idx, initialize=c1)
         self.f1 = pyo.Param(self.binary_idx, initialize=f1)
         self.c2 = pyo.Param(self.continouos_idx, initialize=c2)
         self.f2 = pyo.Param(self.binary_idx, initialize=f2)
-        self.a = pyo.Param(self.continouos_idx, self.zero_to_m_idx, initialize=a)  #
+        # kept as an array: a Param with (num_continuous * (m - 1)) entries dominates the build time
+        self.a = a
         self.a_prime = pyo.Param(self.binary_idx, initialize=a_prime)
         self.b = pyo.Param(self.zero_to_m_idx, initialize=b)
 
         self.x = pyo.Var(self.binary_idx, domain=pyo.Boolean)
         self.y = pyo.Var(self.continouos_idx, domain=pyo.NonNegativeReals)
 
+        # row j of a.T holds the coefficients of the continuous variables in the j-th constraint
+        cstr_coeffs = a.T
+        a_prime = np.asarray(a_prime)
+        b = np.asarray(b)
+
         def first_cstr_rule(model, j):
-            lhs = (
-                sum(
-                    [
-                        self.a.extract_values()[i, j] * model.y[i]
-                        for i in self.continouos_idx
-                    ]
-                )
-                + self.a_prime[j] * model.x[j]
+            lhs = linear_expression(
+                cstr_coeffs[j],
+                model.y,
+                extra_coeffs=[a_prime[j]],
+                extra_vars=[model.x[j]],
             )
-            return lhs <= self.b[j]
+            return lhs <= b[j]
 
         self.first_cstr = pyo.Constraint(self.binary_idx, rule=first_cstr_rule)
 
         def second_cstr_rule(model, j):
-            lhs = sum(
-                [
-                    self.a.extract_values()[i, j] * model.y[i]
-                    for i in self.continouos_idx
-                ]
-            )
-            return lhs <= self.b[j]
+            return linear_expression(cstr_coeffs[j], model.y) <= b[j]
 
         self.second_cstr = pyo.Constraint(self.nb_to_m_idx, rule=second_cstr_rule)
 
@@ -227,74 +343,39 @@ class Bomip2C(pyo.ConcreteModel):
             expr=pyo.summation(self.c2, self.y) + pyo.summation(self.f2, self.x)
         )
 
-        # Line detection part
-        # line detection constraints
-        self.y2 = pyo.Var(self.continouos_idx, domain=pyo.NonNegativeReals)
-
-        def first_cstr_rule2(model, j):
-            lhs = (
-                sum(
-                    [
-                        self.a.extract_values()[i, j] * model.y2[i]
-                        for i in self.continouos_idx
-                    ]
-                )
-                + self.a_prime[j] * model.x[j]
-            )
-            return lhs <= self.b[j]
-
-        self.first_cstr2 = pyo.Constraint(self.binary_idx, rule=first_cstr_rule2)
-
-        def second_cstr_rule2(model, j):
-            lhs = sum(
-                [
-                    self.a.extract_values()[i, j] * model.y2[i]
-                    for i in self.continouos_idx
-                ]
-            )
-            return lhs <= self.b[j]
-
-        self.second_cstr2 = pyo.Constraint(self.nb_to_m_idx, rule=second_cstr_rule2)
-
-        self.first_cstr2.deactivate()
-        self.second_cstr2.deactivate()
-
-        # line detection objectives
-        self.objective1_2 = pyo.Objective(
-            expr=pyo.summation(self.c1, self.y2) + pyo.summation(self.f1, self.x)
-        )
-
-        self.objective2_2 = pyo.Objective(
-            expr=pyo.summation(self.c2, self.y2) + pyo.summation(self.f2, self.x)
-        )
-
-        self.objective1_2.deactivate()
-        self.objective2_2.deactivate()
-
-    @classmethod
-    def from_file(cls, instance_path: Path):
-        with open(instance_path) as tfile:
-            content = tfile.readlines()
-
+    @staticmethod
+    def parse(content: list[str]) -> dict:
         m = int(content[0])
         num_continuous = int(content[1])
-        num_binaries = int(content[2])
-
-        c1 = split_numeric(content[3])
-        f1 = split_numeric(content[4])
-        c2 = split_numeric(content[5])
-        f2 = split_numeric(content[6])
-
-        a = {}
-        for i in range(num_continuous):
-            for j in range(m - 1):
-                a[i, j] = split_numeric(content[7 + i])[j]
-
         checkpoint = 7 + num_continuous
-        a_prime = split_numeric(content[checkpoint])
-        b = split_numeric(content[checkpoint + 1])
+        return {
+            "m": m,
+            "num_binaries": int(content[2]),
+            "num_continuous": num_continuous,
+            "c1": read_array(content[3]),
+            "f1": read_array(content[4]),
+            "c2": read_array(content[5]),
+            "f2": read_array(content[6]),
+            "a": read_matrix(content[7:checkpoint])[:, : m - 1],
+            "a_prime": read_array(content[checkpoint]),
+            "b": read_array(content[checkpoint + 1]),
+        }
 
-        return cls(m, num_binaries, num_continuous, c1, f1, c2, f2, a, a_prime, b)
+    @classmethod
+    def from_file(cls, instance_path: Path):
+        data = load_instance(instance_path, cls.parse)
+        return cls(
+            int(data["m"]),
+            int(data["num_binaries"]),
+            int(data["num_continuous"]),
+            data["c1"].tolist(),
+            data["f1"].tolist(),
+            data["c2"].tolist(),
+            data["f2"].tolist(),
+            data["a"],
+            data["a_prime"].tolist(),
+            data["b"].tolist(),
+        )
 
 
 class Bomip2buflp(pyo.ConcreteModel):
@@ -329,42 +410,22 @@ class Bomip2buflp(pyo.ConcreteModel):
 
         self.objective2 = pyo.Objective(expr=pyo.summation(c2, self.y))
 
-        # part for line detection
-        self.y2 = pyo.Var(self.zones, self.facilities, within=pyo.NonNegativeReals)
-
-        def first_cstr_rule2(model, i):
-            return sum(model.y2[i, j] for j in model.facilities) == 1
-
-        self.cstr1_2 = pyo.Constraint(self.zones, rule=first_cstr_rule2)
-
-        def second_cstr_rule2(model, i, j):
-            return model.y2[i, j] <= model.x[j]
-
-        self.cstr2_2 = pyo.Constraint(
-            self.zones, self.facilities, rule=second_cstr_rule2
-        )
-
-        self.objective1_2 = pyo.Objective(
-            expr=pyo.summation(c1, self.y2) + pyo.summation(f, self.x)
-        )
-
-        self.objective2_2 = pyo.Objective(expr=pyo.summation(c2, self.y2))
-
-        self.cstr1_2.deactivate()
-        self.cstr2_2.deactivate()
-        self.objective1_2.deactivate()
-        self.objective2_2.deactivate()
-
-    @classmethod
-    def from_file(cls, instance_path: Path):
-        with open(instance_path) as tfile:
-            content = tfile.readlines()
-
+    @staticmethod
+    def parse(content: list[str]) -> dict:
         nf = int(content[0])
         nd = int(content[1])
+        # nd rows of transportation costs, the fixed costs, then nd rows of the second objective
+        return {
+            "nf": nf,
+            "nd": nd,
+            "c1": read_matrix(content[2 : 2 + nd], ntype=float),
+            "f": read_array(content[2 + nd]),
+            "c2": read_matrix(content[3 + nd : 3 + 2 * nd], ntype=float),
+        }
 
-        c1 = to_array(content[2:52], ntype=float)
-        f = split_numeric(content[52])
-        c2 = to_array(content[53:103], ntype=float)
-
-        return cls(nf, nd, c1, c2, f)
+    @classmethod
+    def from_file(cls, instance_path: Path):
+        data = load_instance(instance_path, cls.parse)
+        return cls(
+            int(data["nf"]), int(data["nd"]), data["c1"], data["c2"], data["f"].tolist()
+        )
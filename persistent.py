@@ -0,0 +1,285 @@
+import math
+import time
+from os import getenv
+from typing import Callable
+
+import pyomo.environ as pyo
+from pyomo.solvers.plugins.solvers.persistent_solver import PersistentSolver
+
+from backends import lexicographic_solver, solve, solve_lexicographic
+from boxcache import CACHE_SIZE
+from lexmin import WS_WORKERS, BoxSolver, line_detection_model
+from shapes.rectangle import Rectangle
+from shapes.shapee import Shape
+from shapes.Point import Point
+from utils import get_logger
+from warmstart import apply_start, warm_start_capable
+
+logger = get_logger(__name__)
+
+
+class PersistentBoxSolver(BoxSolver):
+    """
+    Solve the subproblems of the balanced box method on a model built once per run.
+
+    The box bounds are mutable parameters bounding two auxiliary variables equal to the objectives, so that between
+    two subproblems only the bounds (and the active objective) change. With a persistent solver interface
+    (gurobi_persistent or an APPSI solver such as appsi_highs) only these deltas are sent to the solver.
+
+    :param model: pyo.ConcreteModel,
+        biobjective model with model.objective1 and model.objective2.
+    :param solver_factory: Callable,
+        returns a new solver instance. Line detection gets its own instance since it works on a different model.
+    :param warmstart: bool (optional),
+        keep the solutions behind the frontier points and use them as MIP starts.
+    :param lexicographic: bool (optional),
+        solve the lexmins in a single call where the solver allows it, see lexmin.find_lexmin.
+    :param cache_size: int (optional),
+        number of lexmin regions kept, see BoxSolver.
+    :param ws_workers: int (optional),
+        worker processes solving the weighted sums, each building its own box model, see BoxSolver.
+    """
+
+    def __init__(
+        self,
+        model: pyo.ConcreteModel,
+        solver_factory: Callable[[], pyo.SolverFactory],
+        warmstart=False,
+        lexicographic=False,
+        cache_size=CACHE_SIZE,
+        ws_workers=WS_WORKERS,
+    ):
+        tic = time.perf_counter()
+        super().__init__(
+            model.clone(),
+            solver_factory(),
+            warmstart,
+            lexicographic,
+            cache_size,
+            solver_factory,
+            ws_workers,
+        )
+        self.source_model = model
+        self.model.name = "PersistentBox"
+        self._build_box_model(self.model)
+        if isinstance(self.opt, PersistentSolver):
+            self.opt.set_instance(self.model)
+
+        self.ld_opt = None
+        self.stats.record("setup", time.perf_counter() - tic, 0.0)
+
+    @classmethod
+    def from_factory(
+        cls,
+        model: pyo.ConcreteModel,
+        solver_factory: Callable[[], pyo.SolverFactory],
+        warmstart=False,
+    ) -> "PersistentBoxSolver":
+        return cls(model, solver_factory, warmstart, cache_size=0, ws_workers=1)
+
+    def _worker_model(self) -> pyo.ConcreteModel:
+        return self.source_model
+
+    @staticmethod
+    def _build_box_model(model: pyo.ConcreteModel):
+        for obj in model.component_data_objects(pyo.Objective):
+            obj.deactivate()
+
+        model.z1_lb = pyo.Param(mutable=True, initialize=-math.inf)
+        model.z1_ub = pyo.Param(mutable=True, initialize=math.inf)
+        model.z2_lb = pyo.Param(mutable=True, initialize=-math.inf)
+        model.z2_ub = pyo.Param(mutable=True, initialize=math.inf)
+
+        model.z1 = pyo.Var(bounds=(model.z1_lb, model.z1_ub))
+        model.z2 = pyo.Var(bounds=(model.z2_lb, model.z2_ub))
+        model.z1_def = pyo.Constraint(expr=model.z1 == model.objective1.expr)
+        model.z2_def = pyo.Constraint(expr=model.z2 == model.objective2.expr)
+
+        model.lambda1 = pyo.Param(mutable=True, initialize=1)
+        model.lambda2 = pyo.Param(mutable=True, initialize=1)
+        model.weighted_obj = pyo.Objective(
+            expr=model.lambda1 * model.z1 + model.lambda2 * model.z2
+        )
+        model.weighted_obj.deactivate()
+
+        model.objective1.activate()
+
+    def _set_box(
+        self, z1_lb=-math.inf, z1_ub=math.inf, z2_lb=-math.inf, z2_ub=math.inf
+    ):
+        self.model.z1_lb.value = z1_lb
+        self.model.z1_ub.value = z1_ub
+        self.model.z2_lb.value = z2_lb
+        self.model.z2_ub.value = z2_ub
+        if isinstance(self.opt, PersistentSolver):
+            self.opt.update_var(self.model.z1)
+            self.opt.update_var(self.model.z2)
+
+    def _set_objective(self, objective: pyo.Objective):
+        for obj in (
+            self.model.objective1,
+            self.model.objective2,
+            self.model.weighted_obj,
+        ):
+            obj.deactivate()
+        objective.activate()
+        if isinstance(self.opt, PersistentSolver):
+            self.opt.set_objective(objective)
+
+    def _find_lexmin(
+        self, objective_order: tuple, shape: Shape, verbose=False
+    ) -> Point:
+        """
+        Finds the lexmin of the model in the given shape, see lexmin.find_lexmin.
+
+        :param objective_order: tuple,
+            Order in which to solve the objectives. Can be (1, 2) or (2, 1).
+        :param shape: Shape,
+            Rectange in which the optimization is constrained.
+        :param verbose: bool (optional),
+            Print the output of the solver.
+        :return: Point
+        """
+        tic = time.perf_counter()
+        stages = []
+        if objective_order == (1, 2):
+            first, second = self.model.objective1, self.model.objective2
+            first_var, second_var = self.model.z1, self.model.z2
+            first_ub, second_ub = self.model.z1_ub, self.model.z2_ub
+            self._set_box(
+                z1_lb=shape.topleft[0], z1_ub=shape.botright[0], z2_ub=shape.topleft[1]
+            )
+        elif objective_order == (2, 1):
+            first, second = self.model.objective2, self.model.objective1
+            first_var, second_var = self.model.z2, self.model.z1
+            first_ub, second_ub = self.model.z2_ub, self.model.z1_ub
+            self._set_box(
+                z1_ub=shape.botright[0], z2_lb=shape.botright[1], z2_ub=shape.topleft[1]
+            )
+        else:
+            raise ValueError("The objective order provided isn't accepted")
+        self._set_objective(first)
+        start_kwds = apply_start(
+            self.opt, self.model, self.solutions, shape, objective_order, self.stats
+        )
+        build_time = time.perf_counter() - tic
+
+        single_call = self.lexicographic and lexicographic_solver(self.opt) is self.opt
+        if single_call:
+            logger.info(
+                "Solving the lexmin with order %s in a single call", objective_order
+            )
+            tic = time.perf_counter()
+            optimal = solve_lexicographic(
+                self.opt, self.model, (first, second), verbose, stages, **start_kwds
+            )
+            solve_time = time.perf_counter() - tic
+        else:
+            logger.info(
+                "Solving the first problem in lexmin with order %s", objective_order
+            )
+            tic = time.perf_counter()
+            optimal = solve(self.opt, self.model, verbose, stages, **start_kwds)
+            solve_time = time.perf_counter() - tic
+
+        if optimal and not single_call:
+            tic = time.perf_counter()
+            first_ub.value = pyo.value(first)
+            logger.debug(
+                "Additional constraint z%s <= %s", objective_order[0], pyo.value(first)
+            )
+            if self.lexicographic:
+                # the first stage optimum bounds the second objective
+                second_ub.value = min(second_ub.value, pyo.value(second))
+            if isinstance(self.opt, PersistentSolver):
+                self.opt.update_var(first_var)
+                self.opt.update_var(second_var)
+            self._set_objective(second)
+            # the first stage optimum, loaded in the model, is feasible for the second stage
+            start_kwds = {}
+            if (
+                self.solutions is not None or self.lexicographic
+            ) and warm_start_capable(self.opt):
+                start_kwds["warmstart"] = True
+                self.stats.count("second stage warm start supplied")
+            build_time += time.perf_counter() - tic
+
+            logger.info(
+                "Solving the second problem in lexmin with order %s", objective_order
+            )
+            tic = time.perf_counter()
+            optimal = solve(self.opt, self.model, verbose, stages, **start_kwds)
+            solve_time += time.perf_counter() - tic
+
+        self.stats.record("find_lexmin", build_time, solve_time, stages)
+
+        if not optimal:
+            raise ValueError("Solution not found.")
+
+        point = Point(
+            (pyo.value(self.model.objective1), pyo.value(self.model.objective2))
+        )
+        if self.solutions is not None:
+            self.solutions.save(point, self.model)
+        return point
+
+    def weighted_sum_step(self, rectangle: Rectangle) -> tuple:
+        """
+        Minimizes the weighted sum of the objectives in the rectangle, see lexmin.weighted_sum_step.
+
+        :param rectangle: Rectangle,
+            rectangle in which the supported point is searched.
+        :return: tuple,
+            the optimum (Point or None if not found) and whether it lies below the segment between the corners.
+        """
+        EPS_WS = float(getenv("EPS_WS", default=1e-4))
+        tic = time.perf_counter()
+        z1 = rectangle.topleft
+        z2 = rectangle.botright
+
+        lambda1 = z1[1] - z2[1]
+        lambda2 = z2[0] - z1[0]
+
+        self.model.lambda1.value = lambda1
+        self.model.lambda2.value = lambda2
+        self._set_box(
+            z1_lb=rectangle.topleft[0],
+            z1_ub=rectangle.botright[0],
+            z2_lb=rectangle.botright[1],
+            z2_ub=rectangle.topleft[1],
+        )
+        self._set_objective(self.model.weighted_obj)
+        start_kwds = apply_start(
+            self.opt, self.model, self.solutions, rectangle, stats=self.stats
+        )
+        build_time = time.perf_counter() - tic
+
+        logger.info("Solving the weighted sum model.")
+        tic = time.perf_counter()
+        stages = []
+        optimal = solve(self.opt, self.model, details=stages, **start_kwds)
+        self.stats.record("weighted_sum", build_time, time.perf_counter() - tic, stages)
+
+        if not optimal:
+            return None, False
+        z_star = Point(
+            (pyo.value(self.model.objective1), pyo.value(self.model.objective2))
+        )
+        if self.solutions is not None and z_star not in self.solutions:
+            self.solutions.save(z_star, self.model)
+        improving = (
+            pyo.value(self.model.weighted_obj)
+            < lambda1 * z1[0] + lambda2 * z1[1] - EPS_WS
+        )
+        return z_star, improving
+
+    def _line_detection(self) -> tuple:
+        """Line detection model of the source model, built on the first call, with its own solver instance."""
+        if self.ld_model is None:
+            tic = time.perf_counter()
+            self.ld_model = line_detection_model(self.source_model)
+            self.ld_opt = self.solver_factory()
+            if isinstance(self.ld_opt, PersistentSolver):
+                self.ld_opt.set_instance(self.ld_model)
+            self.stats.record("setup", time.perf_counter() - tic, 0.0)
+        return self.ld_model, self.ld_opt
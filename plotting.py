@@ -0,0 +1,201 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+import batch
+import metrics
+
+# Figures are drawn on matplotlib.figure.Figure, rendered with Agg, without pyplot: no display is needed and the
+# processes of render_batch don't share any state.
+RESOLUTION = int(os.getenv("PLOT_RESOLUTION", default=200))
+IMAGES_PATH = Path(os.getenv("IMAGES_PATH", default="./images"))
+SCATTER_STYLE = {"s": 4}
+LINE_STYLE = {"linewidth": 1}
+REPORT_COLUMNS = (
+    "problem",
+    "class",
+    "instance",
+    "points",
+    "reference_points",
+    "epsilon",
+    "coverage",
+)
+
+
+def segments(array: np.ndarray) -> np.ndarray:
+    """
+    Connected segments of a frontier.
+
+    :param array: np.ndarray,
+        frontier, see metrics.as_array.
+    :return: np.ndarray,
+        shape (n, 2, 2), the two ends of each segment.
+    """
+    connected = np.flatnonzero(array[:-1, 2] == 1)
+    return np.stack([array[connected, :2], array[connected + 1, :2]], axis=1)
+
+
+def draw_frontier(
+    ax, frontier, label=None, color="C0", scatter_style=None, line_style=None
+):
+    """
+    Draw the points of a frontier and all its connected segments, as a single LineCollection.
+
+    :param ax: matplotlib.axes.Axes,
+        axes to draw on.
+    :param frontier: see metrics.as_array.
+    :param label: str (optional),
+        label of the frontier in the legend.
+    :param color: str (optional),
+        color of the frontier.
+    """
+    array = metrics.as_array(frontier)
+    ax.scatter(
+        array[:, 0],
+        array[:, 1],
+        color=color,
+        label=label,
+        **(SCATTER_STYLE if scatter_style is None else scatter_style),
+    )
+    ax.add_collection(
+        LineCollection(
+            segments(array),
+            colors=color,
+            **(LINE_STYLE if line_style is None else line_style),
+        )
+    )
+    ax.autoscale_view()
+
+
+def plot_frontiers(
+    frontiers: dict, title=None, scatter_style=None, line_style=None, figure=None
+) -> Figure:
+    """
+    Figure with frontiers drawn over each other.
+
+    :param frontiers: dict,
+        label -> frontier, see metrics.as_array.
+    :param title: str (optional),
+        title of the figure.
+    :param figure: Figure (optional),
+        empty figure to draw on, a new one not managed by pyplot by default.
+    :return: Figure
+    """
+    figure = Figure() if figure is None else figure
+    ax = figure.add_subplot()
+    for i, (label, frontier) in enumerate(frontiers.items()):
+        draw_frontier(
+            ax,
+            frontier,
+            label=label,
+            color=f"C{i}",
+            scatter_style=scatter_style,
+            line_style=line_style,
+        )
+    if len(frontiers) > 1:
+        ax.legend()
+    if title is not None:
+        ax.set_title(title)
+    ax.set_xlabel("z1")
+    ax.set_ylabel("z2")
+    return figure
+
+
+def compare(found, reference) -> dict:
+    """
+    :param found: see metrics.as_array,
+        frontier of a minimization problem.
+    :param reference: see metrics.as_array,
+        frontier of a minimization problem.
+    :return: dict,
+        points of both frontiers, additive epsilon indicator and coverage of found with respect to reference.
+    """
+    return {
+        "points": len(found),
+        "reference_points": len(reference),
+        "epsilon": metrics.additive_epsilon(found, reference),
+        "coverage": metrics.coverage(found, reference),
+    }
+
+
+def render(job: tuple) -> dict:
+    """
+    Plot a frontier file over its reference, if there is one, and compare them.
+
+    :param job: tuple,
+        (solution path, reference path or None, image path, "min" or "max" sense of the files, title).
+    :return: dict,
+        see compare with the image path, only the points if there is no reference.
+    """
+    solution_path, reference_path, image_path, sense, title = job
+    sign = -1 if sense == "max" else 1
+    found = metrics.read_frontier(solution_path, sense)
+    frontiers = {}
+    row = {"points": len(found), "image": str(image_path)}
+    if reference_path is not None:
+        # drawn first, under the frontier found
+        reference = metrics.read_frontier(reference_path, sense)
+        frontiers["reference"] = reference * [sign, sign, 1]
+        row.update(compare(found, reference))
+    frontiers["found"] = found * [sign, sign, 1]
+
+    figure = plot_frontiers(frontiers, title=title)
+    Path(image_path).parent.mkdir(parents=True, exist_ok=True)
+    figure.savefig(image_path, dpi=RESOLUTION)
+    return row
+
+
+def render_batch(jobs: list, workers=1) -> list:
+    """
+    Render jobs, see render, with a pool of processes.
+
+    :param workers: int (optional),
+        number of processes, the jobs are rendered in this one if 1.
+    :return: list,
+        a row per job, in the order of jobs.
+    """
+    if workers <= 1:
+        return [render(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(render, jobs, chunksize=max(1, len(jobs) // (4 * workers)))
+        )
+
+
+def instance_jobs(problem: str, problem_class: str = None, images_path=IMAGES_PATH):
+    """
+    Jobs of render for the instances of a problem with a solution file.
+
+    :return: tuple,
+        list of jobs and list of (problem, problem_class, instance) they are for.
+    """
+    jobs, instances = [], []
+    sense = batch.SENSES[batch.PROBLEMS[problem]]
+    for _, instance_class, instance in batch.discover_instances(problem, problem_class):
+        path = batch.solution_path(problem, instance_class, instance)
+        if not path.exists():
+            continue
+        image_path = (
+            Path(images_path) / problem / instance_class / f"{Path(instance).stem}.png"
+        )
+        title = f"{problem} {instance_class} {instance}"
+        reference = batch.reference_path(problem, instance_class, instance)
+        jobs.append((path, reference, image_path, sense, title))
+        instances.append((problem, instance_class, instance))
+    return jobs, instances
+
+
+def format_report(rows: list) -> str:
+    """Tab separated table of the comparisons, with a header line."""
+    lines = ["\t".join(REPORT_COLUMNS)]
+    for row in rows:
+        cells = []
+        for column in REPORT_COLUMNS:
+            value = row.get(column, "")
+            cells.append(f"{value:.4g}" if isinstance(value, float) else str(value))
+        lines.append("\t".join(cells))
+    return "\n".join(lines) + "\n"
@@ -1,7 +1,11 @@
-import matplotlib
+import os
+import time
+from pathlib import Path
 
-matplotlib.use("TkAgg")
-from matplotlib import pyplot as plt
+from frontier import Frontier
+
+# Seconds between two flushes of the log of a StreamWriter to the disk.
+STREAM_SYNC_INTERVAL = float(os.getenv("STREAM_SYNC_INTERVAL", default=1))
 
 
 class Writer:
@@ -9,7 +13,9 @@ class Writer:
         self.problem_type = problem_type
         self.solution_path = solution_path
 
-    def print_solution(self, solutions_dict, tot_time=None, iterations=None):
+    def print_solution(
+        self, solutions_dict, tot_time=None, iterations=None, status=None
+    ):
         if self.problem_type == "max":
             sol_list = [(-x[0], -x[1], solutions_dict[x]) for x in solutions_dict]
         else:
@@ -22,6 +28,104 @@ class Writer:
                 sfile.write(f"Time={tot_time}\n")
             if iterations is not None:
                 sfile.write(f"Iterations={iterations}\n")
+            if status is not None:
+                sfile.write(f"Status={status}\n")
+
+
+def _number(text: str):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+class StreamWriter(Writer):
+    """
+    Writer appending the changes of a frontier to a log as they happen, next to the solution file, so that a
+    search can be watched while it runs.
+
+    Each line of the log is a point set in the frontier with its flag, as in the solution file, or a point removed
+    from it with the flag "-". The lines are buffered and flushed to the disk at most sync_interval seconds after
+    being written. compact turns the log into the solution file: its points, sorted, with the footer.
+
+    :param problem_type: str,
+        "min" or "max", the values of a "max" problem are written negated, as the ones of the solution file.
+    :param solution_path: Path,
+        path of the solution file, the log is <solution_path>.log.
+    :param sync_interval: float (optional),
+        seconds between two flushes of the log.
+    """
+
+    def __init__(self, problem_type, solution_path, sync_interval=STREAM_SYNC_INTERVAL):
+        super().__init__(problem_type, solution_path)
+        self.log_path = Path(f"{solution_path}.log")
+        self.sync_interval = sync_interval
+        self._file = None
+        self._last_sync = time.perf_counter()
+
+    def watch(self, frontier: Frontier):
+        """Start a new log with the points of frontier, then log its changes."""
+        self.close()
+        self._file = open(self.log_path, "w")
+        for point in frontier:
+            self.append(point, frontier[point])
+        frontier.observers.append(self.append)
+        self.sync()
+
+    def append(self, point, connected):
+        """Log a point set with its flag, or removed if connected is None."""
+        if self._file is None:
+            return
+        sign = -1 if self.problem_type == "max" else 1
+        flag = "-" if connected is None else int(connected)
+        self._file.write(f"{sign * point[0]}\t{sign * point[1]}\t{flag}\n")
+        if time.perf_counter() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        """Flush the log to the disk."""
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._last_sync = time.perf_counter()
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def replay(self) -> Frontier:
+        """Frontier rebuilt from the log, in the values of a minimization problem."""
+        sign = -1 if self.problem_type == "max" else 1
+        frontier = Frontier()
+        with open(self.log_path) as lfile:
+            for line in lfile:
+                if not line.endswith("\n"):
+                    # the last line, cut by a crash
+                    break
+                values = line.split()
+                point = (sign * _number(values[0]), sign * _number(values[1]))
+                if values[2] != "-":
+                    frontier[point] = int(values[2])
+                elif point in frontier:
+                    del frontier[point]
+        return frontier
+
+    def compact(self, tot_time=None, iterations=None, status=None) -> Frontier:
+        """
+        Write the solution file from the log, with the footer, and remove the log.
+
+        :return: Frontier,
+            frontier of the log.
+        """
+        self.close()
+        frontier = self.replay()
+        self.print_solution(
+            frontier, tot_time=tot_time, iterations=iterations, status=status
+        )
+        self.log_path.unlink()
+        return frontier
 
 
 class Plotter:
@@ -31,20 +135,34 @@ class Plotter:
         self.scatter_style = scatter_style
 
     def plot_solutions(self, sol_dict, save_path=None):
-        plt.figure()
-        plt.scatter(
-            [x[0] for x in sol_dict], [x[1] for x in sol_dict], **self.scatter_style
-        )
-        keys = list(sol_dict.keys())
-        for item_idx in range(len(sol_dict) - 1):
-            key = keys[item_idx]
-            if sol_dict[key] == 1:
-                next_key = keys[item_idx + 1]
-                plt.plot(
-                    [key[0], next_key[0]], [key[1], next_key[1]], **self.plot_style
-                )
+        """
+        Plot a frontier, saved in save_path if given, shown in a window with pyplot otherwise, which needs an
+        interactive matplotlib backend.
+
+        :param sol_dict: dict,
+            point -> connected flag.
+        :return: matplotlib.figure.Figure
+        """
+        # imported here, so that the writers don't load matplotlib
+        from plotting import plot_frontiers
+
         if save_path is not None:
-            plt.savefig(save_path, dpi=self.resolution)
-        else:
-            plt.show()
-        plt.clf()
+            figure = plot_frontiers(
+                {None: sol_dict},
+                scatter_style=self.scatter_style,
+                line_style=self.plot_style,
+            )
+            figure.savefig(save_path, dpi=self.resolution)
+            return figure
+
+        from matplotlib import pyplot as plt
+
+        figure = plot_frontiers(
+            {None: sol_dict},
+            scatter_style=self.scatter_style,
+            line_style=self.plot_style,
+            figure=plt.figure(),
+        )
+        plt.show()
+        plt.close(figure)
+        return figure
@@ -1,6 +1,7 @@
 import BOIP
 import BOMIP
 import argparse
+import batch
 from utils import get_logger
 
 logger = get_logger(__name__)
@@ -10,47 +11,113 @@ parser.add_argument("-problem", type=str)
 parser.add_argument("-problem_class", type=str)
 parser.add_argument("-instance", type=str)
 
-parser.add_argument("--run_all", action="store_true")
+parser.add_argument(
+    "--run_all",
+    action="store_true",
+    help="Run all the instances found in the dataset, of -problem and -problem_class if given.",
+)
+parser.add_argument(
+    "--persistent",
+    action="store_true",
+    help="Build the model once and solve the subproblems with a persistent solver.",
+)
+parser.add_argument(
+    "--warmstart",
+    action="store_true",
+    help="Use the solutions behind the frontier points as MIP starts.",
+)
+parser.add_argument(
+    "--lexicographic",
+    action="store_true",
+    help="Solve each lexmin in a single call where the solver allows it (Gurobi hierarchical objectives).",
+)
+parser.add_argument(
+    "--workers",
+    type=int,
+    default=None,
+    help="Number of worker processes exploring the boxes in parallel.",
+)
+parser.add_argument(
+    "--concurrency",
+    type=int,
+    default=1,
+    help="Number of instances solved at the same time with --run_all.",
+)
+parser.add_argument(
+    "--time_limit",
+    type=float,
+    default=None,
+    help="Seconds per instance, checked between two iterations of the search and given to the solver.",
+)
+parser.add_argument(
+    "--max_solves",
+    type=int,
+    default=None,
+    help="Solver calls per instance, checked between two iterations of the search.",
+)
+parser.add_argument(
+    "--min_gain",
+    type=float,
+    default=None,
+    help="Stop when the hypervolume gained per second, relative to the box of the ends of the frontier, drops "
+    "under this value (GAIN_WINDOW seconds window).",
+)
+parser.add_argument(
+    "--resume",
+    action="store_true",
+    help="Go on with the search of -instance from its last checkpoint (CHECKPOINTS_PATH), if there is one.",
+)
+parser.add_argument(
+    "--rerun",
+    action="store_true",
+    help="With --run_all, also run the instances whose solution file is complete.",
+)
+parser.add_argument(
+    "--summary",
+    type=str,
+    default=None,
+    help="Write the summary table of --run_all to this file.",
+)
 
-args = parser.parse_args()
+if __name__ == "__main__":
+    args = parser.parse_args()
 
-boip_problems = ["2DKP", "AP"]
-if args.problem in boip_problems:
-    problem_type = BOIP
-    instances = {
-        "class A": ["1dat.txt", "2dat.txt", "3dat.txt", "4dat.txt", "5dat.txt"],
-        "class B": ["6dat.txt", "7dat.txt", "8dat.txt", "9dat.txt", "10dat.txt"],
-        "class C": ["11dat.txt", "12dat.txt", "13dat.txt", "14dat.txt", "15dat.txt"],
-        "class D": ["16dat.txt", "17dat.txt", "18dat.txt", "19dat.txt", "20dat.txt"],
-    }
-else:
-    problem_type = BOMIP
-    if args.problem == "First problem":
-        instances = {
-            # "C20": ["1dat.txt", "2dat.txt", "3dat.txt", "4dat.txt", "5dat.txt"],
-            # "C40": ["6dat.txt", "7dat.txt", "8dat.txt", "9dat.txt", "10dat.txt"],
-            # "C80": ["11dat.txt", "12dat.txt", "13dat.txt", "14dat.txt", "15dat.txt"],
-            "C160": ["16dat.txt", "17dat.txt", "18dat.txt", "19dat.txt", "20dat.txt"],
-            # "C320": ["21dat.txt", "22dat.txt", "23dat.txt", "24dat.txt", "25dat.txt"],
-        }
-    else:
-        instances = {
-            # "C16": ["1dat.txt", "2dat.txt", "3dat.txt", "4dat.txt"],
-            "C25": ["5dat.txt", "6dat.txt", "7dat.txt", "8dat.txt"],
-            # "C50": ["9dat.txt", "10dat.txt", "11dat.txt", "12dat.txt"],
-        }
+    if args.run_all:
+        problems = [args.problem] if args.problem else list(batch.PROBLEMS)
+        jobs = []
+        for problem in problems:
+            jobs += batch.discover_instances(problem, args.problem_class)
 
-if args.run_all:
-    for pclass in instances:
-        for instance in instances[pclass]:
-            logger.info(
-                f"Running problem {args.problem}, class {pclass}, instance {instance}"
-            )
-            problem_type.main(
-                problem=args.problem, problem_class=pclass, instance=instance
-            )
+        rows = batch.run_batch(
+            jobs,
+            concurrency=args.concurrency,
+            time_limit=args.time_limit,
+            resume=not args.rerun,
+            persistent=args.persistent or None,
+            warmstart=args.warmstart or None,
+            lexicographic=args.lexicographic or None,
+            workers=args.workers,
+            max_solves=args.max_solves,
+            min_gain=args.min_gain,
+        )
+        summary = batch.format_summary(rows)
+        logger.info("Summary:\n%s", summary)
+        if args.summary is not None:
+            with open(args.summary, "w") as sfile:
+                sfile.write(summary)
 
-else:
-    problem_type.main(
-        problem=args.problem, problem_class=args.problem_class, instance=args.instance
-    )
+    else:
+        problem_type = BOIP if args.problem in ["2DKP", "AP"] else BOMIP
+        problem_type.main(
+            problem=args.problem,
+            problem_class=args.problem_class,
+            instance=args.instance,
+            persistent=args.persistent or problem_type.PERSISTENT,
+            warmstart=args.warmstart or problem_type.WARMSTART,
+            lexicographic=args.lexicographic or problem_type.LEXICOGRAPHIC,
+            workers=args.workers or problem_type.WORKERS,
+            time_limit=args.time_limit,
+            max_solves=args.max_solves,
+            min_gain=args.min_gain,
+            resume=args.resume,
+        )
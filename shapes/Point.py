@@ -1,12 +1,27 @@
 class Point:
+    """
+    Point of the objective space, immutable. It is compared and hashed on its coordinates rounded to precision
+    decimals, computed once.
+    """
+
+    __slots__ = ("data", "rounded_data")
     precision = 5
 
     def __init__(self, data):
-        self.data = data
-        self.rounded_data = (
+        if type(data) is not tuple or len(data) != 2:
+            data = (data[0], data[1])
+        rounded_data = (
             round(data[0], self.precision),
             round(data[1], self.precision),
         )
+        object.__setattr__(self, "data", data)
+        object.__setattr__(self, "rounded_data", rounded_data)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return type(self), (self.data,)
 
     def __getitem__(self, item):
         return self.data[item]
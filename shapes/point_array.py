@@ -0,0 +1,83 @@
+import numpy as np
+
+from shapes.Point import Point
+
+
+class PointArray:
+    """
+    Points of the objective space stored as the rows of an (n, 2) float array, to compute over many points or
+    shapes at once with NumPy instead of one Point at a time.
+
+    :param points: iterable (optional),
+        Points or (x, y) tuples.
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self, points=()):
+        if isinstance(points, PointArray):
+            values = points.values
+        elif isinstance(points, np.ndarray):
+            values = points
+        else:
+            values = [(point[0], point[1]) for point in points]
+        self.values = np.asarray(values, dtype=float).reshape(-1, 2)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            return Point((float(self.values[item, 0]), float(self.values[item, 1])))
+        return PointArray(self.values[item])
+
+    def __iter__(self):
+        for x, y in self.values.tolist():
+            yield Point((x, y))
+
+    def __repr__(self):
+        return f"PointArray({self.rounded.tolist()})"
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.values[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.values[:, 1]
+
+    @property
+    def rounded(self) -> np.ndarray:
+        """Coordinates rounded as Point.rounded_data."""
+        return np.round(self.values, Point.precision)
+
+    def dist(self, other, name="E") -> np.ndarray:
+        """
+        Distances to other, as utils.dist.
+
+        :param other: Point, tuple or PointArray,
+            a point, or as many points as self.
+        :param name: str (optional),
+            "E" euclidean, "M" manhattan.
+        :return: np.ndarray
+        """
+        other = other.values if isinstance(other, PointArray) else np.asarray(other[:2])
+        delta = np.abs(self.values - other)
+        if name == "E":
+            return np.hypot(delta[:, 0], delta[:, 1])
+        elif name == "M":
+            return delta.sum(axis=1)
+        raise ValueError(f"Unknown distance {name}")
+
+
+def rectangle_areas(topleft: PointArray, botright: PointArray) -> np.ndarray:
+    """Areas of the rectangles of corners topleft[i], botright[i], as Rectangle.area."""
+    return (botright.x - topleft.x) * (topleft.y - botright.y)
+
+
+def triangle_areas(topleft: PointArray, botright: PointArray) -> np.ndarray:
+    """Areas of the triangles of corners topleft[i], botright[i], as Triangle.area."""
+    values = np.concatenate([topleft.values, botright.values], axis=1)
+    if np.isinf(values).any():
+        raise ValueError("Triangle should not be defined for infinite values")
+    return rectangle_areas(topleft, botright) / 2
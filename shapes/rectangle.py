@@ -5,6 +5,8 @@ from typing import Union
 
 
 class Rectangle(Shape):
+    __slots__ = ()
+
     def __init__(
         self,
         topleft: Union[tuple, Point] = Point((-math.inf, math.inf)),
@@ -12,11 +14,7 @@ class Rectangle(Shape):
     ):
         super().__init__(topleft, botright)
 
-    def __lt__(self, other):
-        return self.area < other.area
-
-    @property
-    def area(self):
+    def _compute_area(self):
         x1 = self.topleft[0]
         y1 = self.topleft[1]
 
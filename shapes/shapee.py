@@ -5,6 +5,13 @@ from typing import Union
 
 
 class Shape:
+    """
+    Shape of the objective space between two corners, immutable. Its area is computed on first use and kept, since
+    the queue compares shapes on it.
+    """
+
+    __slots__ = ("topleft", "botright", "_area")
+
     def __init__(
         self,
         topleft: Union[tuple, Point] = Point((-math.inf, math.inf)),
@@ -16,12 +23,19 @@ class Shape:
             botright = Point(botright)
 
         if topleft[0] <= botright[0]:
-            self.topleft = topleft
-            self.botright = botright
+            object.__setattr__(self, "topleft", topleft)
+            object.__setattr__(self, "botright", botright)
+            object.__setattr__(self, "_area", None)
         else:
             logging.warning("Topleft and botright were inverted.")
             raise ValueError("Topleft and botright were inverted.")
 
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return type(self), (self.topleft, self.botright)
+
     def __lt__(self, other):
         return self.area < other.area
 
@@ -32,6 +46,11 @@ class Shape:
 
     @property
     def area(self):
+        if self._area is None:
+            object.__setattr__(self, "_area", self._compute_area())
+        return self._area
+
+    def _compute_area(self):
         raise NotImplementedError
 
     @property
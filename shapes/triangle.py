@@ -3,11 +3,12 @@ import math
 
 
 class Triangle(Shape):
+    __slots__ = ()
+
     def __init__(self, topleft, botright):
         super().__init__(topleft, botright)
 
-    @property
-    def area(self):
+    def _compute_area(self):
         x1 = self.topleft[0]
         y1 = self.topleft[1]
 
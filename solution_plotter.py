@@ -1,70 +1,56 @@
-from printer import Plotter
-from pathlib import Path
+import argparse
 
-home_path = Path("/home/da_orobix/PycharmProjects/BalancedBoxPython")
+import batch
+from plotting import IMAGES_PATH, format_report, instance_jobs, render_batch
+from utils import get_logger
 
-actual_sol_path = (
-    home_path
-    / "BOMIP/Part II- Mixed Integer Programs/nondominated frontiers/Before post-processing/"
-)
-my_sol_path = home_path / "my_solutions"
-my_images = home_path / "images"
-
-problem_name = "First problem"
-instance_name = "C160"
-
-
-for solution_num in range(16, 21):
-    solution_num = str(solution_num)
-    actual_path_full = (
-        actual_sol_path / problem_name / instance_name / (solution_num + "out.txt")
-    )
-    my_path_full = (
-        my_sol_path / problem_name / instance_name / (solution_num + "dat.txt")
-    )
-
-    scatter_style = {
-        "s": 2,
-    }
-    plot_style = {"linewidth": 1}
-    plotter = Plotter(
-        resolution=800, plot_style=plot_style, scatter_style=scatter_style
-    )
-
-    my_solution_dict = {}
-    with open(my_path_full, "r") as rfile:
-        for line in rfile:
-            try:
-                v1, v2, conn = line.split()
-                v1 = float(v1)
-                v2 = float(v2)
-                conn = int(conn)
-                my_solution_dict[(v1, v2)] = conn
-            except ValueError as e:
-                print(e)
-                break
+logger = get_logger(__name__)
 
-    plotter.plot_solutions(
-        my_solution_dict,
-        save_path=my_images
-        / ("_".join([problem_name, instance_name, solution_num + "mine.png"])),
-    )
-
-    their_solution_dict = {}
-    with open(actual_path_full, "r") as rfile:
-        for line in rfile:
-            try:
-                v1, v2, conn = line.split()
-                v1 = float(v1)
-                v2 = float(v2)
-                conn = int(conn)
-                their_solution_dict[(v1, v2)] = conn
-            except ValueError as e:
-                print(e)
-                break
+parser = argparse.ArgumentParser("Frontier plotter")
+parser.add_argument(
+    "-problem",
+    type=str,
+    default=None,
+    help="Problem to plot, all the problems by default.",
+)
+parser.add_argument("-problem_class", type=str, default=None)
+parser.add_argument(
+    "--images",
+    type=str,
+    default=str(IMAGES_PATH),
+    help="Directory of the images, one per instance in <problem>/<class>/.",
+)
+parser.add_argument(
+    "--workers",
+    type=int,
+    default=1,
+    help="Number of processes rendering the images.",
+)
+parser.add_argument(
+    "--report",
+    type=str,
+    default=None,
+    help="Write the comparison of the frontiers with the references to this file.",
+)
 
-    plotter.plot_solutions(
-        their_solution_dict,
-        save_path=my_images
-        / ("_".join([problem_name, instance_name, solution_num + "their.png"])),
-    )
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    problems = [args.problem] if args.problem else list(batch.PROBLEMS)
+    jobs, instances = [], []
+    for problem in problems:
+        problem_jobs, problem_instances = instance_jobs(
+            problem, args.problem_class, args.images
+        )
+        jobs += problem_jobs
+        instances += problem_instances
+
+    logger.info("Plotting %s frontiers in %s.", len(jobs), args.images)
+    rows = render_batch(jobs, args.workers)
+    for (problem, problem_class, instance), row in zip(instances, rows):
+        row.update(problem=problem, **{"class": problem_class}, instance=instance)
+    report = format_report(rows)
+    logger.info("Report:\n%s", report)
+    if args.report is not None:
+        with open(args.report, "w") as rfile:
+            rfile.write(report)
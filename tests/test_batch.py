@@ -0,0 +1,65 @@
+import os
+
+import batch
+from batch import discover_instances, is_complete, read_footer
+
+
+def test_discover_instances(tmp_path):
+    for problem_class, instances in {
+        "class B": ["10dat.txt", "6dat.txt"],
+        "class A": ["2dat.txt", "1dat.txt", "notes.md"],
+    }.items():
+        (tmp_path / "AP" / problem_class).mkdir(parents=True)
+        for instance in instances:
+            (tmp_path / "AP" / problem_class / instance).touch()
+
+    assert discover_instances("AP", dataset_path=tmp_path) == [
+        ("AP", "class A", "1dat.txt"),
+        ("AP", "class A", "2dat.txt"),
+        ("AP", "class B", "6dat.txt"),
+        ("AP", "class B", "10dat.txt"),
+    ]
+    assert discover_instances("AP", "class B", tmp_path) == [
+        ("AP", "class B", "6dat.txt"),
+        ("AP", "class B", "10dat.txt"),
+    ]
+    assert discover_instances("2DKP", dataset_path=tmp_path) == []
+
+
+def test_solution_completeness(tmp_path):
+    path = tmp_path / "1dat.txt"
+    assert not is_complete(path)
+
+    frontier = "0\t2\t1\n1\t1\t0\n2\t0\t0\n"
+    path.write_text(frontier + "Time=1.5\nIterations=4\nStatus=time limit\n")
+    assert read_footer(path) == {
+        "points": 3,
+        "time": 1.5,
+        "iterations": 4,
+        "status": "time limit",
+    }
+    assert not is_complete(path)
+
+    path.write_text(frontier + "Time=2.5\nIterations=6\n")
+    assert is_complete(path)
+
+
+def _crash_on_second(problem, problem_class, instance, **kwargs):
+    if instance == "2dat.txt":
+        os._exit(1)
+    return {
+        "problem": problem,
+        "class": problem_class,
+        "instance": instance,
+        "status": "solved",
+    }
+
+
+def test_run_batch_survives_a_dead_worker(monkeypatch, tmp_path):
+    monkeypatch.setattr(batch, "run_instance", _crash_on_second)
+    monkeypatch.setattr(batch, "solution_path", lambda *job: tmp_path / job[2])
+    jobs = [("AP", "A", "1dat.txt"), ("AP", "A", "2dat.txt")]
+
+    rows = batch.run_batch(jobs, concurrency=2)
+    assert [row["instance"] for row in rows] == ["1dat.txt", "2dat.txt"]
+    assert rows[1]["status"].startswith("failed")
@@ -0,0 +1,25 @@
+import numpy as np
+
+from benchmarks.bench_suite import compare_frontiers
+from metrics import read_frontier
+
+reference = [(0, 4, 1), (2, 2, 0), (4, 0, 0)]
+
+
+def test_read_frontier(tmp_path):
+    path = tmp_path / "1out.txt"
+    path.write_text("x y\n4\t0\t0\n0\t4\t1\n2\t2\t0\nTime=1.0\nIterations=3\n")
+    np.testing.assert_array_equal(read_frontier(path), reference)
+    np.testing.assert_array_equal(
+        read_frontier(path, sense="max"), [(-4, 0, 0), (-2, -2, 0), (0, -4, 0)]
+    )
+
+
+def test_compare_frontiers():
+    # a point on the connected segment and float noise are within tolerance
+    found = [(0, 4.0000001, 1), (1, 3, 1), (2, 2, 0), (4, 0, 0)]
+    assert compare_frontiers(found, reference)["ok"]
+
+    check = compare_frontiers([(0, 4, 0), (4, 0, 0)], reference)
+    assert not check["ok"]
+    assert check["missed"] == 1 and check["extra"] == 0
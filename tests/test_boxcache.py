@@ -0,0 +1,64 @@
+from boxcache import LexminCache
+from frontier import Frontier
+from shapes.Point import Point
+from shapes.rectangle import Rectangle
+
+
+def test_enclosing_region():
+    cache = LexminCache()
+    cache.add((1, 2), Rectangle((0, 4), (4, 0)), Point((1, 2)))
+    assert cache.lookup((1, 2), Rectangle((0, 3), (2, 1))) == (True, Point((1, 2)))
+    # the lexmin isn't in the smaller region
+    assert cache.lookup((1, 2), Rectangle((2, 3), (4, 1))) == (False, None)
+    # the region isn't inside the solved one
+    assert cache.lookup((1, 2), Rectangle((0, 5), (2, 1))) == (False, None)
+    assert cache.lookup((2, 1), Rectangle((0, 3), (2, 1))) == (False, None)
+    assert cache.hits == 1 and cache.misses == 3
+
+
+def test_infeasible_region():
+    cache = LexminCache()
+    cache.add((2, 1), Rectangle((0, 4), (4, 2)))
+    assert cache.lookup((2, 1), Rectangle((1, 3), (3, 2))) == (True, None)
+    assert cache.infeasible_hits == 1
+
+
+def test_least_recently_used_dropped():
+    cache = LexminCache(maxsize=2)
+    cache.add((1, 2), Rectangle((0, 4), (1, 3)), Point((0, 4)))
+    cache.add((1, 2), Rectangle((1, 3), (2, 2)), Point((1, 3)))
+    cache.lookup((1, 2), Rectangle((0, 4), (1, 3)))
+    cache.add((1, 2), Rectangle((2, 2), (3, 1)), Point((2, 2)))
+    assert len(cache) == 2 and cache.evictions == 1
+    assert cache.lookup((1, 2), Rectangle((1, 3), (2, 2))) == (False, None)
+    assert cache.lookup((1, 2), Rectangle((0, 4), (1, 3)))[0]
+
+
+def test_index_after_eviction():
+    cache = LexminCache(maxsize=2)
+    cache.add((1, 2), Rectangle((0, 4), (4, 0)), Point((1, 2)))
+    cache.add((1, 2), Rectangle((0, 4), (4, 0)), Point((2, 1)))
+    cache.add((1, 2), Rectangle((5, 4), (9, 0)), Point((6, 2)))
+    cache.add((2, 1), Rectangle((0, 4), (4, 2)))
+    assert len(cache) == 2 and cache.evictions == 1
+    assert cache.lookup((1, 2), Rectangle((0, 3), (4, 1))) == (False, None)
+    assert cache.lookup((1, 2), Rectangle((6, 3), (8, 1))) == (True, Point((6, 2)))
+    assert cache.lookup((2, 1), Rectangle((1, 3), (3, 2))) == (True, None)
+
+
+def test_frontier_lexmin():
+    cache = LexminCache()
+    frontier = Frontier({Point((0, 4)): 1, Point((2, 2)): 0, Point((4, 0)): 0})
+    # on the connected segment, at the lower bound of the first objective
+    assert cache.lookup((1, 2), Rectangle((1, 3), (4, 0)), frontier) == (
+        True,
+        Point((1, 3)),
+    )
+    # (2, 2) is on the lower bound of the second objective
+    assert cache.lookup((2, 1), Rectangle((0, 3), (3, 2)), frontier) == (
+        True,
+        Point((2, 2)),
+    )
+    # no connected segment between (2, 2) and (4, 0)
+    assert cache.lookup((1, 2), Rectangle((3, 2), (4, 0)), frontier) == (False, None)
+    assert cache.frontier_hits == 2 and cache.misses == 1
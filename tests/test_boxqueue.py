@@ -0,0 +1,38 @@
+import pytest
+
+from boxqueue import BoxQueue
+from shapes.Point import Point
+from shapes.rectangle import Rectangle
+from shapes.triangle import Triangle
+
+
+def test_largest_first_and_stable():
+    queue = BoxQueue()
+    queue.push(Rectangle((0, 2), (1, 0)), 0)
+    queue.push(Rectangle((0, 4), (2, 0)), 1)
+    queue.push(Rectangle((2, 2), (3, 0)), 1)
+    assert queue.pop() == (Rectangle((0, 4), (2, 0)), 1)
+    assert queue.pop() == (Rectangle((0, 2), (1, 0)), 0)
+    assert queue.pop() == (Rectangle((2, 2), (3, 0)), 1)
+    assert not queue
+    with pytest.raises(IndexError):
+        queue.pop()
+
+
+def test_duplicates():
+    queue = BoxQueue()
+    assert queue.push(Triangle((0, 2), (1, 0)))
+    assert not queue.push(Triangle((0, 2.000001), (1, 0)))
+    assert queue.push(Rectangle((0, 2), (1, 0)))
+    assert len(queue) == 2 and queue.duplicates == 1
+    assert Triangle((0, 2), (1, 0)) in queue
+
+
+def test_prune():
+    queue = BoxQueue()
+    queue.push(Rectangle((0, 4), (2, 2)))
+    queue.push(Rectangle((2, 2), (4, 1)))
+    assert queue.prune(Point((1, 1))) == 1
+    assert len(queue) == 1
+    assert queue.pop() == (Rectangle((0, 4), (2, 2)), 0)
+    assert not queue
@@ -0,0 +1,53 @@
+import time
+
+from boxqueue import BoxQueue
+from budget import Budget
+from frontier import Frontier
+from shapes.rectangle import Rectangle
+from utils import SolveStats
+
+
+def search_state():
+    frontier = Frontier({(0, 4): 0, (4, 0): 0})
+    queue = BoxQueue()
+    queue.push(Rectangle((0, 4), (4, 0)))
+    return frontier, queue
+
+
+def test_limits():
+    frontier, queue = search_state()
+    stats = SolveStats()
+    budget = Budget(max_solves=3, max_iterations=5)
+    budget.start(frontier)
+    assert budget.check(frontier, queue, stats, 1) is None
+    stats.record("find_lexmin", 0, 0, [{"nodes": 0, "outcome": "optimal"}] * 2)
+    stats.record("weighted_sum", 0, 0, [{"nodes": 0, "outcome": "optimal"}])
+    assert budget.check(frontier, queue, stats, 2) == "solve limit"
+    assert (
+        Budget(max_iterations=5).check(frontier, queue, stats, 5) == "iteration limit"
+    )
+    assert Budget(time_limit=0).check(frontier, queue, stats, 1) == "time limit"
+    # nothing left to explore
+    assert Budget(time_limit=0).check(frontier, BoxQueue(), stats, 1) is None
+
+
+def test_low_gain_and_snapshots():
+    frontier, queue = search_state()
+    snapshots = []
+    budget = Budget(
+        min_gain=1,
+        window=0.01,
+        snapshot_interval=0.01,
+        snapshot=lambda *args: snapshots.append(args),
+    )
+    budget.start(frontier)
+    assert budget.check(frontier, queue, SolveStats(), 1) is None
+    time.sleep(0.02)
+    frontier[(1, 1)] = 0
+    assert budget.quality(frontier)["relative_hypervolume"] == 9 / 16
+    # 9/16 of the box in 0.02s is a fast gain
+    assert budget.check(frontier, queue, SolveStats(), 2) is None
+    time.sleep(0.02)
+    assert budget.check(frontier, queue, SolveStats(), 3) == "low gain"
+    assert len(snapshots) == 2 and snapshots[-1][2] == 3
+    assert budget.largest_box == 16
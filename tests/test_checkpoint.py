@@ -0,0 +1,37 @@
+from boxqueue import BoxQueue
+from checkpoint import Checkpoint, restore
+from frontier import Frontier
+from shapes.rectangle import Rectangle
+from shapes.triangle import Triangle
+from utils import SolveStats
+from warmstart import SolutionStore
+
+
+def test_save_and_restore(tmp_path):
+    frontier = Frontier({(0, 4): 1, (1, 2): 0, (4, 0): 0})
+    queue = BoxQueue()
+    queue.push(Rectangle((1, 2), (4, 0)), 1)
+    queue.push(Triangle((0, 4), (1, 2)), 0)
+    queue.push(Rectangle((0, 4), (0.5, 3)), 0)
+    running = [queue.pop()]
+    stats = SolveStats()
+    stats.record("find_lexmin", 0.1, 0.2)
+    store = SolutionStore()
+    store.solutions[(1, 2)] = {"x[1]": 1.0}
+
+    checkpoint = Checkpoint(tmp_path / "1dat.pkl", interval=0)
+    assert not checkpoint.due()
+    checkpoint.save(frontier, queue, 5, stats, store, 12.5, running=running)
+    assert [path.name for path in tmp_path.iterdir()] == ["1dat.pkl"]
+
+    state = checkpoint.load()
+    assert state["iteration"] == 5 and state["elapsed"] == 12.5
+    assert state["stats"].records == stats.records
+    restored_store = SolutionStore()
+    restored, restored_queue = restore(state, restored_store)
+    assert dict(restored.items()) == dict(frontier.items())
+    assert restored_queue.items() == running + queue.items()
+    assert restored_store.solutions == store.solutions
+
+    checkpoint.remove()
+    assert checkpoint.load() is None
@@ -0,0 +1,43 @@
+import pytest
+
+from frontier import Frontier
+from shapes.Point import Point
+
+
+def test_sorted_and_tolerant():
+    frontier = Frontier({Point((3, 0)): 0, Point((0, 3)): 0})
+    frontier[Point((1, 2))] = 1
+    frontier[(1.000001, 2)] = 0
+    assert list(frontier) == [Point((0, 3)), Point((1, 2)), Point((3, 0))]
+    assert frontier[(1, 2)] == 0
+    assert (2, 2) not in frontier
+
+
+def test_dominance():
+    frontier = Frontier({Point((0, 3)): 0, Point((3, 0)): 0})
+    assert not frontier.add(Point((1, 3)))
+    frontier[Point((1, 2.5))] = 0
+    frontier[Point((2, 2))] = 0
+    assert frontier.add(Point((1, 1)))
+    assert list(frontier) == [Point((0, 3)), Point((1, 1)), Point((3, 0))]
+    assert frontier.dominated == 3
+
+
+def test_neighbours_and_segments():
+    frontier = Frontier({Point((0, 3)): 1, Point((1, 1)): 0, Point((3, 0)): 0})
+    assert frontier.neighbours(Point((1, 1))) == (Point((0, 3)), Point((3, 0)))
+    assert frontier.neighbours(Point((2, 0.5))) == (Point((1, 1)), Point((3, 0)))
+    assert frontier.neighbours(Point((0, 3))) == (None, Point((1, 1)))
+    assert frontier.segments() == [(Point((0, 3)), Point((1, 1)))]
+
+
+def test_hypervolume():
+    frontier = Frontier({(0, 4): 0, (4, 0): 0}, reference=(4, 4))
+    assert frontier.hypervolume == 0
+    frontier[(1, 2)] = 1
+    frontier[(3, 1)] = 0
+    # staircase from (0, 4), trapezoid from (1, 2) to (3, 1), staircase from (3, 1)
+    assert frontier.hypervolume == pytest.approx(0 + 2 * 2.5 + 1 * 3)
+    del frontier[(3, 1)]
+    frontier[(0.5, 0.5)] = 0
+    assert frontier.hypervolume == pytest.approx(3.5 * 3.5)
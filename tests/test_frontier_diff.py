@@ -0,0 +1,26 @@
+import numpy as np
+
+from frontier_diff import diff_file, diff_frontiers, match
+
+
+def test_match_within_tolerance():
+    points = np.array([[0, 4, 0], [1, 2, 0], [3, 1, 0]], dtype=float)
+    other = np.array([[0.05, 4, 0], [1.2, 2, 0], [2.95, 1.02, 0]], dtype=float)
+    assert match(points, other, 0.1).tolist() == [0, -1, 2]
+
+
+def test_diff_frontiers():
+    reference = [(0, 4, 1), (1, 2, 1), (2, 1.5, 0), (4, 0, 0)]
+    found = [(0, 4, 1), (1, 2, 0), (2, 1.5, 0), (3, 1, 0), (4, 0, 0)]
+    diff = diff_frontiers(found, reference, tol=1e-3)
+    assert diff["missing"] == 0 and diff["extra"] == 1
+    # (1, 2) - (2, 1.5) is connected in the reference only
+    assert diff["segments"] == 1
+
+
+def test_diff_file(tmp_path):
+    (tmp_path / "1dat.txt").write_text("-4\t-1\t1\n-1\t-4\t0\nTime=1.0\n")
+    (tmp_path / "1out.txt").write_text("-4\t-1\t1\n-1\t-4\t0\n")
+    job = ("AP", "2", "1dat.txt", tmp_path / "1dat.txt", tmp_path / "1out.txt")
+    assert diff_file(job + ("max", 1e-3))["status"] == "ok"
+    assert diff_file(job[:4] + (None, "max", 1e-3))["status"] == "no reference"
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from frontier import Frontier
+from metrics import (
+    IncrementalIndicators,
+    additive_epsilon,
+    as_array,
+    coverage,
+    hypervolume,
+)
+
+
+def test_additive_epsilon():
+    points = [(0, 4), (4, 0)]
+    # the middle of the connected reference segment is the farthest from the two points
+    assert additive_epsilon(points, [(0, 4, 1), (4, 0, 0)]) == pytest.approx(2)
+    assert additive_epsilon(points, points) == 0
+    assert additive_epsilon([(0, 4, 1), (4, 0, 0)], points) == 0
+    assert coverage(points, [(0, 4, 0), (2, 2, 0), (4, 0, 0)]) == pytest.approx(2 / 3)
+
+
+def test_hypervolume():
+    frontier = Frontier({(0, 4): 1, (2, 2): 0, (4, 0): 0}, reference=(5, 5))
+    assert hypervolume(frontier, (5, 5)) == pytest.approx(frontier.hypervolume)
+    assert hypervolume(as_array(frontier), (5, 5)) == pytest.approx(15)
+
+
+def test_incremental_indicators():
+    rng = np.random.default_rng(0)
+    reference = Frontier()
+    for x in rng.uniform(0, 10, 20):
+        reference[(x, 10 - x - rng.uniform(0, 3))] = int(rng.integers(0, 2))
+
+    frontier = Frontier()
+    indicators = IncrementalIndicators(reference)
+    for x in rng.uniform(0, 10, 30):
+        point = (x, 10 - x - rng.uniform(0, 3))
+        frontier[point] = int(rng.integers(0, 2))
+        indicators.update(frontier, point)
+        assert indicators.epsilon == pytest.approx(
+            additive_epsilon(frontier, reference)
+        )
+        assert indicators.coverage == coverage(frontier, reference)
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+import BOIP
+import BOMIP
+import metrics
+from backends import BACKENDS
+
+pytestmark = pytest.mark.skipif(
+    not BACKENDS["appsi_highs"].available(), reason="appsi_highs isn't available"
+)
+
+
+def write_bomip(path, n=5, seed=1):
+    rng = np.random.default_rng(seed)
+    m = 2 * n + 1
+    rows = [[m], [n], [n]]
+    rows += [-rng.integers(1, 20, n) for _ in range(4)]
+    rows += list(rng.integers(0, 10, (n, m - 1)))
+    rows += [rng.integers(1, 30, n), rng.integers(20, 60, m - 1)]
+    path.write_text("\n".join(" ".join(map(str, row)) for row in rows) + "\n")
+
+
+def write_2dkp(path, n=12, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = [[n], [10 * n], [11 * n]] + [rng.integers(1, 40, n) for _ in range(4)]
+    path.write_text("\n".join(" ".join(map(str, row)) for row in rows) + "\n")
+
+
+@pytest.mark.parametrize(
+    "module, problem, sense, write",
+    [
+        (BOMIP, "First problem", "min", write_bomip),
+        (BOIP, "2DKP", "max", write_2dkp),
+    ],
+)
+def test_parallel_matches_serial(monkeypatch, tmp_path, module, problem, sense, write):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(module, "SOLVER", "appsi_highs")
+    monkeypatch.setattr(module, "DATASET_PATH", tmp_path / "dataset")
+    (tmp_path / "dataset" / problem / "A").mkdir(parents=True)
+    write(tmp_path / "dataset" / problem / "A" / "1dat.txt")
+
+    frontiers = []
+    for workers in (1, 2):
+        monkeypatch.setattr(module, "SOLUTIONS_PATH", tmp_path / f"solutions{workers}")
+        module.main(problem, "A", "1dat.txt", workers=workers)
+        path = tmp_path / f"solutions{workers}" / problem / "A" / "1dat.txt"
+        frontiers.append(metrics.read_frontier(path, sense))
+
+    serial, parallel = frontiers
+    assert len(serial) > 2
+    if sense == "min":
+        # the line detection found connected segments
+        assert serial[:, 2].any()
+    # same points, with the same connected flags
+    np.testing.assert_allclose(parallel, serial)
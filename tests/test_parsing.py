@@ -0,0 +1,74 @@
+import numpy as np
+import pyomo.environ as pyo
+from pyomo.repn import generate_standard_repn
+
+from parsing import Bomip2C, Bomip2ap, Bomip2dkp, linear_expression, load_instance
+
+
+def test_linear_expression_skips_zeros():
+    model = pyo.ConcreteModel()
+    model.y = pyo.Var(range(3))
+    model.x = pyo.Var()
+    expr = linear_expression(np.array([2, 0, 3]), model.y, [4], [model.x])
+    repn = generate_standard_repn(expr)
+    assert [v.name for v in repn.linear_vars] == ["y[0]", "y[2]", "x"]
+    assert list(repn.linear_coefs) == [2, 3, 4]
+
+
+def test_bomip2c_constraints():
+    m, n = 5, 2
+    a = np.array([[1, 0, 2, 3], [0, 4, 5, 6]])
+    model = Bomip2C(m, n, n, [1, 1], [1, 1], [1, 1], [1, 1], a, [7, 8], [9, 9, 9, 9])
+
+    repn = generate_standard_repn(model.first_cstr[1].body)
+    assert {v.name: c for v, c in zip(repn.linear_vars, repn.linear_coefs)} == {
+        "y[1]": 4,
+        "x[1]": 8,
+    }
+    assert list(model.second_cstr.keys()) == [3]
+    repn = generate_standard_repn(model.second_cstr[3].body)
+    assert list(repn.linear_coefs) == [3, 6]
+
+
+def test_load_instance_cache(tmp_path):
+    instance = tmp_path / "dat.txt"
+    instance.write_text("2\n10\n12\n1 2\n3 4\n5 6\n7 8\n")
+    cache = tmp_path / "cache"
+
+    parsed = load_instance(instance, Bomip2dkp.parse, cache_path=cache)
+    assert len(list(cache.glob("*.npz"))) == 1
+    cached = load_instance(instance, Bomip2dkp.parse, cache_path=cache)
+    assert parsed.keys() == cached.keys()
+    for name in parsed:
+        assert np.array_equal(parsed[name], cached[name])
+
+    # an edited instance is parsed again
+    instance.write_text("2\n11\n12\n1 2\n3 4\n5 6\n7 8\n")
+    assert (
+        load_instance(instance, Bomip2dkp.parse, cache_path=cache)["rhs_1st_cstr"] == 11
+    )
+    assert len(list(cache.glob("*.npz"))) == 2
+
+
+def test_array_models():
+    model = Bomip2dkp(3, 5, 6, [1, 2, 3], [3, 0, 1], [2, 3, 4], [1, 1, 5])
+    assert model.cstr[0].upper == 5 and model.cstr[0].lower is None
+    repn = generate_standard_repn(model.cstr[1].body)
+    assert list(repn.linear_coefs) == [1, 1, 5]
+    # profits are maximized, the objectives are their opposites
+    repn = generate_standard_repn(model.objective2.expr)
+    assert [v.name for v in repn.linear_vars] == ["x[0]", "x[2]"]
+    assert list(repn.linear_coefs) == [-3, -1]
+
+    model = Bomip2ap(2, np.array([[1, 2], [3, 4]]), np.array([[4, 3], [2, 1]]))
+    rows = [
+        [v.name for v in generate_standard_repn(model.cstr[i].body).linear_vars]
+        for i in model.cstr
+    ]
+    assert rows == [
+        ["x[0]", "x[1]"],
+        ["x[2]", "x[3]"],
+        ["x[0]", "x[2]"],
+        ["x[1]", "x[3]"],
+    ]
+    assert all(model.cstr[i].equality for i in model.cstr)
@@ -0,0 +1,152 @@
+from functools import partial
+
+import pyomo.environ as pyo
+import pytest
+
+from backends import (
+    PERSISTENT_PREFERENCE,
+    first_available,
+    get_solver,
+    lexicographic_solver,
+    solve,
+    solve_lexicographic,
+)
+from persistent import PersistentBoxSolver
+from shapes.Point import Point
+from shapes.rectangle import Rectangle
+from shapes.triangle import Triangle
+
+SOLVER = first_available(PERSISTENT_PREFERENCE)
+
+pytestmark = pytest.mark.skipif(SOLVER is None, reason="no persistent solver available")
+
+
+def build_model():
+    model = pyo.ConcreteModel()
+
+    model.x = pyo.Var(within=pyo.NonNegativeIntegers)
+    model.y = pyo.Var(within=pyo.NonNegativeReals)
+
+    model.cstr1 = pyo.Constraint(expr=model.x + 1.0001 * model.y >= 2.0001)
+
+    model.objective1 = pyo.Objective(expr=model.x)
+    model.objective2 = pyo.Objective(expr=model.y)
+    return model
+
+
+@pytest.fixture
+def solver():
+    return PersistentBoxSolver(build_model(), lambda: get_solver(SOLVER))
+
+
+def test_lexmin(solver):
+    z_T = solver.find_lexmin((1, 2))
+    z_B = solver.find_lexmin((2, 1))
+    assert z_T == Point((0, 2.0001 / 1.0001))
+    assert z_B == Point((3, 0))
+
+
+def test_lexmin_in_box(solver):
+    z = solver.find_lexmin((1, 2), Rectangle((0.5, 1.5), (3, 0)))
+    assert z == Point((1, 1))
+
+
+def test_lexmin_infeasible_box(solver):
+    with pytest.raises(ValueError):
+        solver.find_lexmin((1, 2), Rectangle((0.2, 0.5), (0.8, 0)))
+
+
+def test_weighted_sum(solver):
+    z_cap = solver.weighted_sum(Rectangle((0, 2.0001 / 1.0001), (3, 0)))
+    assert z_cap[0] == Point((0, 2.0001 / 1.0001))
+    assert z_cap[-1] == Point((3, 0))
+
+
+def test_weighted_sum_workers(solver):
+    rectangle = Rectangle((0, 2.0001 / 1.0001), (3, 0))
+    workers = PersistentBoxSolver(
+        build_model(), partial(get_solver, SOLVER), ws_workers=2
+    )
+    try:
+        assert workers.weighted_sum(rectangle) == solver.weighted_sum(rectangle)
+    finally:
+        workers.close()
+
+
+def test_line_detector(solver):
+    assert not solver.line_detector(Triangle((1, 1), (2, 0.0001)))
+
+
+def test_line_detectors():
+    # x <= 1 if z = 0 and x >= 2 if z = 1: the frontier is connected from (0, 2) to (1, 1), then (2, 0)
+    model = pyo.ConcreteModel()
+    model.x = pyo.Var(within=pyo.NonNegativeReals)
+    model.y = pyo.Var(within=pyo.NonNegativeReals)
+    model.z = pyo.Var(within=pyo.Boolean)
+    model.cstr1 = pyo.Constraint(expr=model.x + model.y >= 2)
+    model.cstr2 = pyo.Constraint(expr=model.x - 1 <= 10 * model.z)
+    model.cstr3 = pyo.Constraint(expr=2 - model.x <= 10 * (1 - model.z))
+    model.objective1 = pyo.Objective(expr=model.x)
+    model.objective2 = pyo.Objective(expr=model.y)
+
+    solver = PersistentBoxSolver(model, lambda: get_solver(SOLVER), warmstart=True)
+    z_T = solver.find_lexmin((1, 2))
+    z = solver.find_lexmin((2, 1), Rectangle((0, 2), (1.5, 0)))
+    z_B = solver.find_lexmin((2, 1))
+    assert solver.line_detectors([Triangle(z_T, z), Triangle(z, z_B)]) == [True, False]
+    # the corners of the first triangle share z = 0
+    assert solver.stats.summary()["line_detector_lp"]["calls"] == 1
+
+
+def test_model_is_built_once(solver):
+    solver.find_lexmin((1, 2))
+    solver.find_lexmin((2, 1))
+    summary = solver.stats.summary()
+    assert summary["setup"]["calls"] == 1
+    assert summary["find_lexmin"]["calls"] == 2
+
+
+def test_lexicographic_lexmin():
+    solver = PersistentBoxSolver(
+        build_model(), lambda: get_solver(SOLVER), lexicographic=True
+    )
+    assert solver.find_lexmin((1, 2)) == Point((0, 2.0001 / 1.0001))
+    assert solver.find_lexmin((2, 1)) == Point((3, 0))
+    assert solver.find_lexmin((1, 2), Rectangle((0.5, 1.5), (3, 0))) == Point((1, 1))
+
+
+def test_hierarchical_lexmin_matches_two_stages():
+    pytest.importorskip("gurobipy")
+    shapes = [Rectangle(), Rectangle((0.5, 1.5), (3, 0)), Rectangle((0, 2), (2, 0.5))]
+    single, staged = (
+        PersistentBoxSolver(
+            build_model(),
+            lambda: get_solver("gurobi_persistent"),
+            lexicographic=lexicographic,
+        )
+        for lexicographic in (True, False)
+    )
+    for shape in shapes:
+        for order in ((1, 2), (2, 1)):
+            assert single.find_lexmin(order, shape) == staged.find_lexmin(order, shape)
+    # a single call per lexmin
+    assert all(
+        len(stages) == 1
+        for routine, _, _, stages in single.stats.records
+        if routine == "find_lexmin"
+    )
+
+
+def test_hierarchical_objectives_restored():
+    pytest.importorskip("gurobipy")
+    model = build_model()
+    model.objective2.deactivate()
+    opt = get_solver("gurobi_persistent")
+    opt.set_instance(model)
+
+    assert solve_lexicographic(opt, model, (model.objective2, model.objective1))
+    assert (pyo.value(model.x), pyo.value(model.y)) == pytest.approx((3, 0))
+    # the single objective of the model is optimized again
+    assert solve(opt, model)
+    assert pyo.value(model.x) == pytest.approx(0)
+    assert lexicographic_solver(get_solver("gurobi")).name == "gurobi_persistent"
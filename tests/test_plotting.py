@@ -0,0 +1,18 @@
+import numpy as np
+
+from plotting import render, segments
+
+
+def test_segments():
+    array = np.array([[0, 4, 1], [1, 2, 0], [2, 1, 1], [4, 0, 0]])
+    assert segments(array).tolist() == [[[0, 4], [1, 2]], [[2, 1], [4, 0]]]
+
+
+def test_render_overlay(tmp_path):
+    (tmp_path / "1dat.txt").write_text("-4\t-1\t1\n-1\t-4\t0\nTime=1.0\n")
+    (tmp_path / "1out.txt").write_text("-4\t-1\t1\n-2\t-2\t1\n-1\t-4\t0\n")
+    image = tmp_path / "images" / "1dat.png"
+    row = render((tmp_path / "1dat.txt", tmp_path / "1out.txt", image, "max", None))
+    assert image.exists()
+    assert row["points"] == 2 and row["reference_points"] == 3
+    assert row["coverage"] == 2 / 3 and row["epsilon"] > 0
@@ -0,0 +1,29 @@
+from frontier import Frontier
+from printer import StreamWriter, Writer
+
+
+def test_stream_writer_compacts_to_solution(tmp_path):
+    frontier = Frontier({(-10, -1): 0, (-1, -10): 0})
+    writer = StreamWriter("max", tmp_path / "1dat.txt", sync_interval=0)
+    writer.watch(frontier)
+    frontier[(-6, -4)] = 1
+    frontier[(-5, -6)] = 0
+    frontier[(-4, -5)] = 0  # dominated
+    frontier[(-6, -4)] = 0
+    frontier[(-7, -3)] = 1
+    del frontier[(-7, -3)]
+    frontier[(-5, -7)] = 1  # dominates (-5, -6)
+
+    lines = open(tmp_path / "1dat.txt.log").read().splitlines()
+    assert lines[:3] == ["10\t1\t0", "1\t10\t0", "6\t4\t1"]
+    assert "7\t3\t-" in lines
+
+    compacted = writer.compact(tot_time=1.5, iterations=4, status=None)
+    assert dict(compacted.items()) == dict(frontier.items())
+    assert not writer.log_path.exists()
+    Writer("max", tmp_path / "expected.txt").print_solution(
+        frontier, tot_time=1.5, iterations=4
+    )
+    assert (tmp_path / "1dat.txt").read_text() == (
+        tmp_path / "expected.txt"
+    ).read_text()
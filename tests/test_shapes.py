@@ -1,5 +1,9 @@
+import pickle
+
 import pytest
 
+from shapes.Point import Point
+from shapes.point_array import PointArray, rectangle_areas, triangle_areas
 from shapes.rectangle import Rectangle
 from shapes.shapee import Shape
 from shapes.triangle import Triangle
@@ -34,3 +38,22 @@ def test_midpoints():
     shap = Shape(p1, p2)
     assert shap.vertical_midpoint == 1.5
     assert shap.horizontal_midpoint == 5
+
+
+def test_immutable_and_picklable():
+    rect = Rectangle(p1, p2)
+    with pytest.raises(AttributeError):
+        rect.topleft = (0, 0)
+    with pytest.raises(AttributeError):
+        rect.topleft.data = (0, 0)
+    copy = pickle.loads(pickle.dumps(rect))
+    assert copy == rect and copy.area == rect.area
+    assert hash(Point((1, 2.000001))) == hash(Point((1, 2)))
+
+
+def test_point_array():
+    array = PointArray([p1, Point(p2)])
+    assert len(array) == 2 and array[1] == Point(p2)
+    assert list(array.dist(p1, "M")) == [0, 5]
+    assert list(rectangle_areas(array[:1], array[1:])) == [Rectangle(p1, p2).area]
+    assert list(triangle_areas(array[:1], array[1:])) == [Triangle(p1, p2).area]
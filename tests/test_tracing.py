@@ -0,0 +1,41 @@
+import json
+
+from shapes.triangle import Triangle
+from tracing import Tracer
+from utils import SolveStats
+
+
+def test_trace_and_summary(tmp_path):
+    stats = SolveStats()
+    stats.record(
+        "find_lexmin", 0.1, 0.2, [{"solve_time": 0.2, "outcome": "optimal", "nodes": 3}]
+    )
+    stats.record(
+        "line_detector",
+        0.1,
+        0.3,
+        [{"solve_time": 0.3, "outcome": "infeasible", "nodes": None}],
+    )
+
+    tracer = Tracer(tmp_path / "1dat.jsonl")
+    tracer.trace(0, None, None, stats.records[:1], 0.3)
+    tracer.trace(1, Triangle((0, 2), (1, 0)), 1, stats.records[1:], 0.4, [], [])
+    tracer.close(stats, iterations=2)
+
+    lines = [json.loads(line) for line in open(tmp_path / "1dat.jsonl")]
+    assert [line["iteration"] for line in lines] == [0, 1]
+    assert "shape" not in lines[0]
+    assert lines[1]["shape"] == "Triangle" and lines[1]["area"] == 1
+    assert lines[1]["calls"][0]["stages"][0]["outcome"] == "infeasible"
+
+    summary = json.load(open(tmp_path / "1dat.summary.json"))
+    assert summary["iterations"] == 2
+    assert summary["routines"]["find_lexmin"]["nodes"] == 3
+    assert summary["routines"]["line_detector"]["outcomes"] == {"infeasible": 1}
+
+
+def test_disabled_tracer(tmp_path):
+    tracer = Tracer()
+    tracer.trace(0, None, None, [], 0.1)
+    tracer.close(SolveStats())
+    assert not list(tmp_path.iterdir())
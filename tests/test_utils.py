@@ -0,0 +1,29 @@
+import json
+import logging
+
+from utils import get_logger, json_handler
+
+
+def test_get_logger_idempotent_and_json_sink(tmp_path):
+    path = tmp_path / "log.jsonl"
+    logger = get_logger("tests.sink", level="DEBUG", json_path=path)
+    assert get_logger("tests.sink", json_path=path) is logger
+    assert len(logger.handlers) == 2
+
+    logger.debug("z1: %s", (1, 2), extra={"iteration": 3})
+    logger.info("written", extra={"iteration": 4})
+    # logged as it is when logger.info is called, not when the sink thread writes it
+    points = [1]
+    logger.info("points: %s", points)
+    points.append(2)
+    logger.setLevel(logging.WARNING)
+    logger.info("disabled")
+    json_handler(path).sink.stop()
+
+    lines = [json.loads(line) for line in open(path)]
+    assert [line["message"] for line in lines] == [
+        "z1: (1, 2)",
+        "written",
+        "points: [1]",
+    ]
+    assert lines[0]["level"] == "DEBUG" and lines[0]["iteration"] == 3
@@ -0,0 +1,40 @@
+import pyomo.environ as pyo
+
+from shapes.Point import Point
+from shapes.rectangle import Rectangle
+from shapes.triangle import Triangle
+from warmstart import SolutionStore
+
+z1, z2 = Point((0, 4)), Point((4, 0))
+
+
+def build_store():
+    model = pyo.ConcreteModel()
+    model.x = pyo.Var(initialize=1)
+    store = SolutionStore()
+    store.save(z1, model)
+    model.x.set_value(2)
+    store.save(z2, model)
+    return store
+
+
+def test_start_from_bottom_corner():
+    _, t_b = Triangle(z1, z2).split_horizontally()
+    assert build_store().start_for(t_b, (1, 2)) == {"x": 2}
+
+
+def test_start_from_top_corner():
+    t_t, _ = Triangle(z1, z2).split_vertically()
+    assert build_store().start_for(t_t, (2, 1)) == {"x": 1}
+
+
+def test_no_start_outside_box():
+    rect = Rectangle((1, 3), (3, 1))
+    assert build_store().start_for(rect) is None
+
+
+def test_load():
+    model = pyo.ConcreteModel()
+    model.x = pyo.Var()
+    SolutionStore.load(model, build_store().start_for(Rectangle(z1, z2)))
+    assert model.x.value in (1, 2)
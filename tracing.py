@@ -0,0 +1,117 @@
+import json
+import os
+from pathlib import Path
+
+from shapes.shapee import Shape
+from utils import SolveStats
+
+TRACE = os.getenv("TRACE", default="1") == "1"
+TRACES_PATH = Path(os.getenv("TRACES_PATH", default="./traces"))
+
+
+class Tracer:
+    """
+    Write a JSON line per iteration of the search: the shape explored, the subproblems solved for it with their
+    build and solve times, node counts and termination conditions, and what the iteration found. close() writes the
+    aggregated SolveStats next to it.
+
+    A Tracer without path does nothing, so the search loops can call it unconditionally.
+
+    :param path: Path (optional),
+        path of the .jsonl file.
+    :param append: bool (optional),
+        append to the file, to go on with the trace of a resumed search.
+    """
+
+    def __init__(self, path: Path = None, append=False):
+        self.path = path
+        self._file = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(path, "a" if append else "w")
+
+    @classmethod
+    def for_instance(
+        cls,
+        problem: str,
+        problem_class: str,
+        instance: str,
+        enabled=TRACE,
+        append=False,
+    ):
+        """Tracer writing in TRACES_PATH/problem/problem_class/<instance>.jsonl, if enabled."""
+        if not enabled:
+            return cls()
+        return cls(
+            TRACES_PATH / problem / problem_class / f"{Path(instance).stem}.jsonl",
+            append,
+        )
+
+    def trace(
+        self,
+        iteration: int,
+        shape: Shape,
+        splitting_direction: int,
+        records: list,
+        elapsed: float,
+        points=(),
+        shapes=(),
+    ):
+        """
+        Write the line of an iteration.
+
+        :param iteration: int,
+            number of the iteration, 0 for the lexmins finding the ends of the frontier.
+        :param shape: Shape or None,
+            shape explored.
+        :param splitting_direction: int or None,
+            direction of the shape.
+        :param records: list,
+            records of SolveStats made during the iteration.
+        :param elapsed: float,
+            wall time of the iteration.
+        :param points: list (optional),
+            (Point, connected flag) found.
+        :param shapes: list (optional),
+            (Shape, splitting direction) to explore found.
+        """
+        if self._file is None:
+            return
+
+        line = {"iteration": iteration, "time": elapsed}
+        if shape is not None:
+            line.update(
+                shape=type(shape).__name__,
+                topleft=list(shape.topleft.rounded_data),
+                botright=list(shape.botright.rounded_data),
+                area=shape.area,
+                direction=splitting_direction,
+            )
+        line["calls"] = [
+            {
+                "routine": routine,
+                "build_time": build_time,
+                "solve_time": solve_time,
+                "stages": stages,
+            }
+            for routine, build_time, solve_time, stages in records
+        ]
+        line["points"] = len(points)
+        line["shapes"] = len(shapes)
+        self._file.write(json.dumps(line) + "\n")
+
+    def close(self, stats: SolveStats, **totals):
+        """
+        Close the trace and write the summary of stats, with totals such as time and iterations, in a .summary.json
+        file.
+        """
+        if self._file is None:
+            return
+
+        self._file.close()
+        self._file = None
+        summary = dict(totals)
+        summary["routines"] = stats.summary()
+        summary["counters"] = dict(stats.counters)
+        with open(self.path.with_suffix(".summary.json"), "w") as sfile:
+            json.dump(summary, sfile, indent=2)
@@ -1,18 +1,16 @@
+import atexit
+import copy
+import json
 import math
-from collections import UserDict
+import os
+import queue
+from collections import Counter
 
 import logging
+from logging.handlers import QueueListener
 from colorlog import ColoredFormatter
 
 
-class SelfOrderingDict(UserDict):
-    def __setitem__(self, key, value):
-        super().__setitem__(key, value)
-        self.data = {
-            k: self.data[k] for k in sorted(self.data.keys(), key=lambda x: x[0])
-        }
-
-
 def dist(z1, z2, name="E"):
     if name == "E":
         return math.sqrt((z1[0] - z2[0]) ** 2 + (z1[1] - z2[1]) ** 2)
@@ -20,11 +18,126 @@ def dist(z1, z2, name="E"):
         return abs(z1[0] - z2[0]) + abs(z1[1] - z2[1])
 
 
+# level of the loggers of the package, and path of a JSON lines file the records are also written in, if set
+LOG_LEVEL = os.getenv("LOG_LEVEL", default="INFO").upper()
+LOG_JSON = os.getenv("LOG_JSON", default="")
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format a record as a JSON object: time, level, logger name and message, the exception if any, and the fields
+    given with extra=.
+    """
+
+    # attributes every record has, the other ones come from extra=
+    _standard = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "name": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in self._standard:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _JsonSink:
+    """
+    Handler of the JSON lines file shared by all the loggers. In the process that opened it the records are put in
+    a queue and formatted and written by a background thread, so that logging doesn't wait on the file. Processes
+    forked from it, which don't have the thread, append to the file themselves.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._pid = os.getpid()
+        self.formatter = JsonFormatter()
+        self._queue = queue.SimpleQueue()
+        self._listener = QueueListener(self._queue, self._file_handler())
+        self._listener.start()
+        self.handler = _SinkHandler(self)
+        atexit.register(self.stop)
+
+    def _file_handler(self) -> logging.Handler:
+        handler = logging.FileHandler(self.path, mode="a")
+        handler.setFormatter(self.formatter)
+        return handler
+
+    def handle(self, record: logging.LogRecord):
+        if os.getpid() == self._pid:
+            self._queue.put_nowait(record)
+        else:
+            handler = self._file_handler()
+            handler.handle(record)
+            handler.close()
+
+    def stop(self):
+        if self._listener is not None and os.getpid() == self._pid:
+            self._listener.stop()
+            self._listener = None
+
+
+class _SinkHandler(logging.Handler):
+    def __init__(self, sink: _JsonSink):
+        super().__init__()
+        self.sink = sink
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            # formatted now, as QueueHandler.prepare does: the arguments may be changed before the background
+            # thread writes the record
+            record = copy.copy(record)
+            record.message = record.getMessage()
+            if record.exc_info:
+                record.exc_text = self.sink.formatter.formatException(record.exc_info)
+            record.msg, record.args, record.exc_info = record.message, None, None
+            self.sink.handle(record)
+        except Exception:
+            self.handleError(record)
+
+
+_sinks = {}
+
+
+def json_handler(path: str) -> logging.Handler:
+    """Handler writing the records as JSON lines in path from a background thread, one per path."""
+    path = str(path)
+    if path not in _sinks:
+        _sinks[path] = _JsonSink(path)
+    return _sinks[path].handler
+
+
 def get_logger(
     name: str,
     message_fmt: str = "[%(blue)s%(asctime)s%(reset)s][%(cyan)s%(name)s%(reset)s][%(log_color)s%(levelname)s%("
     "reset)s] - %(message)s",
+    level: str = LOG_LEVEL,
+    json_path: str = LOG_JSON,
 ) -> logging.Logger:
+    """
+    Logger writing in color on the console, and in json_path if set. Its handlers are only added once, calling it
+    again for the same name returns the same logger unchanged.
+
+    The messages should be given as a format string and its arguments, logger.debug("z1: %s", z1), so that they are
+    only formatted when the level is enabled.
+
+    :param level: str (optional),
+        level of the logger.
+    :param json_path: str (optional),
+        path of a JSON lines file written as well, see json_handler.
+    """
+    logger = logging.getLogger(name)
+    if getattr(logger, "_configured", False):
+        return logger
+
     formatter = ColoredFormatter(
         message_fmt,
         datefmt=None,
@@ -41,8 +154,75 @@ def get_logger(
     )
     handler = logging.StreamHandler()
     handler.setFormatter(formatter)
-    logger = logging.getLogger(name)
     logger.propagate = False
     logger.addHandler(handler)
-    logger.setLevel(logging.INFO)
+    logger.setLevel(level)
+    if json_path:
+        logger.addHandler(json_handler(json_path))
+    logger._configured = True
     return logger
+
+
+class SolveStats:
+    """Collect the time spent building and solving the subproblems of a run."""
+
+    def __init__(self):
+        self.records = []
+        self.counters = Counter()
+
+    def record(self, routine: str, build_time: float, solve_time: float, stages=None):
+        """
+        Record a call to a routine.
+
+        :param stages: list (optional),
+            a dict per solve of the call, see backends.solve.
+        """
+        self.records.append((routine, build_time, solve_time, stages or []))
+
+    def count(self, event: str):
+        self.counters[event] += 1
+
+    def merge(self, other: "SolveStats"):
+        self.records.extend(other.records)
+        self.counters.update(other.counters)
+
+    def summary(self) -> dict:
+        """
+        Aggregate the records per routine.
+
+        :return: dict,
+            routine name -> {"calls", "build_time", "solve_time", "nodes", "outcomes"}, outcomes counting the
+            termination conditions of the solves.
+        """
+        summary = {}
+        for routine, build_time, solve_time, stages in self.records:
+            entry = summary.setdefault(
+                routine,
+                {
+                    "calls": 0,
+                    "build_time": 0.0,
+                    "solve_time": 0.0,
+                    "nodes": 0,
+                    "outcomes": Counter(),
+                },
+            )
+            entry["calls"] += 1
+            entry["build_time"] += build_time
+            entry["solve_time"] += solve_time
+            for stage in stages:
+                entry["nodes"] += stage["nodes"] or 0
+                entry["outcomes"][stage["outcome"]] += 1
+        return summary
+
+    def log_summary(self, logger: logging.Logger):
+        for routine, entry in self.summary().items():
+            logger.info(
+                "%s: %s calls, build time %.3fs, solve time %.3fs, %s nodes",
+                routine,
+                entry["calls"],
+                entry["build_time"],
+                entry["solve_time"],
+                entry["nodes"],
+            )
+        for event, count in self.counters.items():
+            logger.info("%s: %s", event, count)
@@ -0,0 +1,111 @@
+import math
+
+import pyomo.environ as pyo
+
+from shapes.Point import Point
+from shapes.shapee import Shape
+
+
+def box_bounds(shape: Shape, objective_order: tuple = None) -> tuple:
+    """
+    Bounds on the objectives imposed by a shape for a subproblem of the balanced box method.
+
+    :param shape: Shape,
+        shape in which the optimization is constrained.
+    :param objective_order: tuple (optional),
+        (1, 2) or (2, 1) for a lexmin, None for a weighted sum where all the sides of the shape are used.
+    :return: tuple,
+        (z1_lb, z1_ub, z2_lb, z2_ub).
+    """
+    if objective_order == (1, 2):
+        return shape.topleft[0], shape.botright[0], -math.inf, shape.topleft[1]
+    if objective_order == (2, 1):
+        return -math.inf, shape.botright[0], shape.botright[1], shape.topleft[1]
+    if objective_order is None:
+        return shape.topleft[0], shape.botright[0], shape.botright[1], shape.topleft[1]
+    raise ValueError("The objective order provided isn't accepted")
+
+
+class SolutionStore:
+    """
+    Keep the variable assignment behind each frontier point, to be used as a MIP start for the subproblems of the
+    boxes having that point as corner.
+    """
+
+    def __init__(self):
+        self.solutions = {}
+
+    def __len__(self):
+        return len(self.solutions)
+
+    def __contains__(self, point):
+        return point in self.solutions
+
+    def save(self, point: Point, model: pyo.ConcreteModel):
+        """Store the current values of the model's variables as the solution behind point."""
+        self.solutions[point] = {
+            var.name: var.value
+            for var in model.component_data_objects(pyo.Var)
+            if var.value is not None
+        }
+
+    def start_for(self, shape: Shape, objective_order: tuple = None):
+        """
+        Find a stored solution feasible for the subproblem on shape, looking at the corners of the shape.
+
+        :param shape: Shape,
+            shape in which the optimization is constrained.
+        :param objective_order: tuple (optional),
+            see box_bounds.
+        :return: dict or None,
+            variable name -> value.
+        """
+        z1_lb, z1_ub, z2_lb, z2_ub = box_bounds(shape, objective_order)
+        for corner in (shape.botright, shape.topleft):
+            if corner not in self.solutions:
+                continue
+            if z1_lb <= corner[0] <= z1_ub and z2_lb <= corner[1] <= z2_ub:
+                return self.solutions[corner]
+        return None
+
+    @staticmethod
+    def load(model: pyo.ConcreteModel, solution: dict):
+        """Set the variables of model to the values of a stored solution."""
+        for var in model.component_data_objects(pyo.Var):
+            if var.name in solution:
+                var.set_value(solution[var.name], skip_validation=True)
+
+
+def warm_start_capable(opt: pyo.SolverFactory) -> bool:
+    capable = getattr(opt, "warm_start_capable", None)
+    return capable is not None and capable()
+
+
+def apply_start(
+    opt: pyo.SolverFactory,
+    model: pyo.ConcreteModel,
+    solutions: SolutionStore,
+    shape: Shape,
+    objective_order: tuple = None,
+    stats=None,
+) -> dict:
+    """
+    Load in model a stored solution feasible for the subproblem on shape, if any. The stats count the starts supplied
+    to the solver, whether the solver used them isn't reported by every interface.
+
+    :return: dict,
+        keyword arguments to pass to opt.solve.
+    """
+    if solutions is None or not warm_start_capable(opt):
+        return {}
+
+    start = solutions.start_for(shape, objective_order)
+    if start is None:
+        if stats is not None:
+            stats.count("warm start not found")
+        return {}
+
+    SolutionStore.load(model, start)
+    if stats is not None:
+        stats.count("warm start supplied")
+    return {"warmstart": True}